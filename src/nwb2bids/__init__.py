@@ -5,7 +5,10 @@ NWB2BIDS
 Reorganize NWB files into a BIDS directory layout.
 """
 
+from ._core._conversion_service import ConversionJob, ConversionService
 from ._core._convert_nwb_dataset import convert_nwb_dataset
+from ._core._reindex_bids_dataset import reindex_bids_dataset
+from ._core._watch_nwb_dataset import watch_nwb_dataset
 from ._converters._dataset_converter import DatasetConverter
 from ._converters._session_converter import SessionConverter
 from ._converters._run_config import RunConfig
@@ -14,6 +17,10 @@ from .notifications import Notification
 __all__ = [
     # Public methods and classes
     "convert_nwb_dataset",
+    "reindex_bids_dataset",
+    "watch_nwb_dataset",
+    "ConversionService",
+    "ConversionJob",
     "RunConfig",
     "DatasetConverter",
     "SessionConverter",
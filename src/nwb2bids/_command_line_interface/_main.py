@@ -5,8 +5,12 @@ import warnings
 
 import rich_click
 
+from .._converters._dataset_converter import DatasetConverter
 from .._converters._run_config import RunConfig
+from .._core._conversion_service import ConversionService
 from .._core._convert_nwb_dataset import convert_nwb_dataset
+from .._core._reindex_bids_dataset import reindex_bids_dataset
+from .._core._watch_nwb_dataset import watch_nwb_dataset
 from .._tools._pluralize import _pluralize
 from ..notifications import Notification, Severity
 from ..sanitization import SanitizationConfig
@@ -50,7 +54,229 @@ def _nwb2bids_cli():
         "Defaults to `~/.nwb2bids`."
     ),
     required=False,
-    type=rich_click.Path(exists=True, dir_okay=False, readable=True),
+    type=rich_click.Path(exists=True, file_okay=False, readable=True),
+    default=None,
+)
+@rich_click.option(
+    "--no-cache",
+    "no_cache",
+    help=(
+        "Do not persist lightweight per-file information (such as session and subject IDs) or the extracted session "
+        "metadata in the cache directory, nor reuse them from earlier runs to skip reopening NWB files that have "
+        "not changed."
+    ),
+    is_flag=True,
+    default=False,
+)
+@rich_click.option(
+    "--nwb-cache-size",
+    "nwb_cache_size",
+    help=(
+        "The maximum number of NWB files kept open at once while extracting metadata. "
+        "Files beyond this are closed in least-recently-used order (default: 16)."
+    ),
+    required=False,
+    type=rich_click.IntRange(min=1),
+    default=None,
+)
+@rich_click.option(
+    "--nwb-cache-max-memory",
+    "nwb_cache_max_memory",
+    help=(
+        "The resident memory (in bytes) of the process above which open NWB files are closed in least-recently-used "
+        "order while extracting metadata, always keeping the most recent one open. "
+        "Only enforced on systems exposing `/proc/self/statm` (such as Linux)."
+    ),
+    required=False,
+    type=rich_click.IntRange(min=1),
+    default=None,
+)
+@rich_click.option(
+    "--no-cached-namespaces",
+    "no_cached_namespaces",
+    help=(
+        "Do not load the specification namespaces cached within each NWB file when reading it through PyNWB. "
+        "Use when the core NWB schema is sufficient; this skips the step entirely but fails to read files "
+        "containing types from extensions."
+    ),
+    is_flag=True,
+    default=False,
+)
+@rich_click.option(
+    "--extraction-engine",
+    "extraction_engine",
+    help=(
+        "How metadata is extracted from local NWB files. "
+        "'pynwb' reads each file fully through PyNWB (default). "
+        "'h5py' reads only the groups and attributes needed for the BIDS metadata directly through h5py, "
+        "which is much faster for files with many objects. Files using any layout this engine does not handle "
+        "(such as neurodata types from extensions) are read through PyNWB instead."
+    ),
+    required=False,
+    type=rich_click.Choice(["pynwb", "h5py"], case_sensitive=False),
+    default=None,
+)
+@rich_click.option(
+    "--io-profile",
+    "io_profile",
+    help=(
+        "How local HDF5 files are opened for reading. "
+        "'local' uses the default options of HDF5, suited to local disks (default). "
+        "'network' is tuned for network filesystems such as NFS and Lustre; it disables HDF5 file locking (which can "
+        "hang on NFS) and enlarges the raw data chunk cache, page buffer, and metadata block size so that reads "
+        "go out in fewer, larger requests."
+    ),
+    required=False,
+    type=rich_click.Choice(["local", "network"], case_sensitive=False),
+    default=None,
+)
+@rich_click.option(
+    "--jobs",
+    "-j",
+    "jobs",
+    help=(
+        "The number of processes in which the metadata of sessions is extracted in parallel. "
+        "Use 0 for one process per CPU (default: 1, extracting all metadata within the current process)."
+    ),
+    required=False,
+    type=rich_click.IntRange(min=0),
+    default=None,
+)
+@rich_click.option(
+    "--write-jobs",
+    "write_jobs",
+    help=(
+        "The number of threads in which sessions are written to the BIDS dataset concurrently (default: 4). "
+        "Writing is dominated by small file operations, so this mostly hides the latency of network storage, "
+        "except when copying NWB files, which are then also copied this many at a time. "
+        "Dataset-level files (such as `participants.tsv`) are always written once all sessions are done."
+    ),
+    required=False,
+    type=rich_click.IntRange(min=1),
+    default=None,
+)
+@rich_click.option(
+    "--extract-after-discovery",
+    "extract_after_discovery",
+    help=(
+        "Discover all sessions before extracting any metadata, then extract the longest sessions first "
+        "(as estimated from their size and the times recorded on earlier runs). By default, extraction overlaps "
+        "with discovery, in which case sessions are extracted in the order they are discovered."
+    ),
+    is_flag=True,
+    default=False,
+)
+@rich_click.option(
+    "--copy-bandwidth-limit",
+    "copy_bandwidth_limit",
+    help=(
+        "With `--file-mode copy`, the total number of bytes per second at which NWB files are copied, shared by all "
+        "sessions being written concurrently (default: unlimited). Reflinks are not limited, since they copy no data."
+    ),
+    required=False,
+    type=rich_click.IntRange(min=1),
+    default=None,
+)
+@rich_click.option(
+    "--shard",
+    "shard",
+    help=(
+        "Convert only the shard INDEX/COUNT (such as `3/8`, with INDEX from 0) of the local sessions, assigned by "
+        "a stable hash of their session ID. Independent runs of every index (such as the tasks of a SLURM array) "
+        "each convert a disjoint part of the dataset into the same BIDS directory. Instead of the dataset-level "
+        "files, each shard writes a manifest from which these are written by `nwb2bids finalize` once all shards "
+        "are done."
+    ),
+    required=False,
+    type=str,
+    default=None,
+)
+@rich_click.option(
+    "--session-timeout",
+    "session_timeout",
+    help=(
+        "The number of seconds after which the extraction of the metadata of a single session is abandoned. "
+        "When set, metadata is always extracted in worker processes, and any worker that exceeds this timeout "
+        "(such as on a read stuck on an unresponsive network mount) is killed and replaced. "
+        "The session is then reported as an error and skipped, unless `--fail-fast` is set."
+    ),
+    required=False,
+    type=rich_click.FloatRange(min=0, min_open=True),
+    default=None,
+)
+@rich_click.option(
+    "--fail-fast",
+    "fail_fast",
+    help=(
+        "Stop converting after the first session that fails to be read or written. "
+        "By default, such a failure is reported for its session, the remaining sessions are still converted, "
+        "and the dataset-level files only include the sessions that succeeded."
+    ),
+    is_flag=True,
+    default=False,
+)
+@rich_click.option(
+    "--streaming",
+    "streaming",
+    help=(
+        "Write each session as soon as its metadata is extracted, then keep only a small summary of it, so that "
+        "memory stays constant regardless of the number of sessions. Whether the dataset is a derivative and which "
+        "sessions use the `ses-` entity are then decided up front by a lightweight pre-classification pass. "
+        "Only supports local NWB files."
+    ),
+    is_flag=True,
+    default=False,
+)
+@rich_click.option(
+    "--derivative/--no-derivative",
+    "write_as_derivative",
+    help=(
+        "Whether to write the dataset as a BIDS derivative, within the `derivatives/nwb2bids` directory. "
+        "By default, the dataset is written as a derivative if any session contains a units table but no "
+        "electrodes and no raw electrical series in its acquisition (such as spike-sorted data)."
+    ),
+    default=None,
+)
+@rich_click.option(
+    "--resume",
+    "resume",
+    help=(
+        "The ID of an interrupted run to resume. "
+        "Sessions recorded as completed in the journal of that run (in the `.nwb2bids` directory of the BIDS dataset) "
+        "whose NWB files are unchanged and whose output files are all still present are skipped, while still being "
+        "included in the dataset-level files; all other sessions are converted as usual."
+    ),
+    required=False,
+    type=str,
+    default=None,
+    metavar="RUN_ID",
+)
+@rich_click.option(
+    "--include",
+    help=(
+        "Patterns of NWB file paths to include when searching directories; if specified, all other files are skipped. "
+        "Patterns are matched against POSIX paths relative to each given directory, such as `lab_a/sub-01/file.nwb`. "
+        "Patterns are globs by default (`*` within a single directory, `**/` across any number of directories); "
+        "prefix a pattern with `re:` to instead search for a regular expression. "
+        "Directories that cannot contain a match for the literal leading part of every pattern are never entered. "
+        "Explicitly listed NWB files are always included. "
+        "May be specified multiple times."
+    ),
+    required=False,
+    type=str,
+    multiple=True,
+    default=None,
+)
+@rich_click.option(
+    "--exclude",
+    help=(
+        "Patterns of NWB file paths to exclude when searching directories, using the same syntax as `--include`. "
+        "Directories matching any of these patterns are never entered. "
+        "May be specified multiple times."
+    ),
+    required=False,
+    type=str,
+    multiple=True,
     default=None,
 )
 @rich_click.option(
@@ -133,6 +359,33 @@ def _nwb2bids_cli():
     is_flag=True,
     default=False,
 )
+@rich_click.option(
+    "--watch",
+    help=(
+        "Keep watching the NWB paths after converting them, and convert new or changed sessions into the same "
+        "BIDS dataset as their files arrive, until interrupted (CTRL+C). "
+        "Uses inotify where available, and otherwise (or with `--io-profile network`) polls for changes. "
+        "Pass the same `--run-id` to pick up where a previous watch stopped."
+    ),
+    is_flag=True,
+    default=False,
+)
+@rich_click.option(
+    "--settle-seconds",
+    "settle_seconds",
+    help="With `--watch`, how long a file must remain unchanged before it is converted (default: 5).",
+    required=False,
+    type=rich_click.FloatRange(min=0),
+    default=5.0,
+)
+@rich_click.option(
+    "--poll-interval",
+    "poll_interval",
+    help="With `--watch`, how often (in seconds) to poll for changes when inotify is not used (default: 2).",
+    required=False,
+    type=rich_click.FloatRange(min=0, min_open=True),
+    default=2.0,
+)
 def _run_convert_nwb_dataset(
     nwb_paths: tuple[str, ...],
     bids_directory: str | None = None,
@@ -146,6 +399,27 @@ def _run_convert_nwb_dataset(
     space: typing.Literal["AllenCCFv3", "PaxinosWatson"] | None = None,
     probe: str | None = None,
     use_session_labels: bool = False,
+    no_cache: bool = False,
+    include: tuple[str, ...] = (),
+    exclude: tuple[str, ...] = (),
+    nwb_cache_size: int | None = None,
+    nwb_cache_max_memory: int | None = None,
+    extraction_engine: typing.Literal["pynwb", "h5py"] | None = None,
+    no_cached_namespaces: bool = False,
+    io_profile: typing.Literal["local", "network"] | None = None,
+    jobs: int | None = None,
+    write_jobs: int | None = None,
+    extract_after_discovery: bool = False,
+    copy_bandwidth_limit: int | None = None,
+    shard: str | None = None,
+    session_timeout: float | None = None,
+    fail_fast: bool = False,
+    streaming: bool = False,
+    write_as_derivative: bool | None = None,
+    resume: str | None = None,
+    watch: bool = False,
+    settle_seconds: float = 5.0,
+    poll_interval: float = 2.0,
 ) -> None:
     """
     Convert NWB files to BIDS format.
@@ -160,6 +434,10 @@ def _run_convert_nwb_dataset(
         message = "Please provide at least one NWB file or directory to convert."
         raise ValueError(message)
 
+    if resume is not None and run_id is not None and resume != run_id:
+        message = f"The run to resume ('{resume}') must be the same as the run ID ('{run_id}'), if both are given."
+        raise ValueError(message)
+
     handled_nwb_paths = [pathlib.Path(nwb_path) for nwb_path in nwb_paths]
 
     sanitization_config = SanitizationConfig(**{value.replace("-", "_"): True for value in sanitization})
@@ -170,12 +448,30 @@ def _run_convert_nwb_dataset(
         "file_mode": file_mode,
         "cache_directory": cache_directory,
         "sanitization_config": sanitization_config,
-        "run_id": run_id,
+        "run_id": resume if resume is not None else run_id,
         "space": space,
         "archive_target": archive_target,
         "use_session_labels": use_session_labels,
         "probe": probe,
         "silent": silent,
+        "use_cache": not no_cache,
+        "include": include,
+        "exclude": exclude,
+        "nwb_cache_size": nwb_cache_size,
+        "nwb_cache_max_memory": nwb_cache_max_memory,
+        "extraction_engine": extraction_engine,
+        "load_cached_namespaces": not no_cached_namespaces,
+        "io_profile": io_profile,
+        "max_workers": jobs,
+        "max_write_workers": write_jobs,
+        "extract_during_discovery": not extract_after_discovery,
+        "copy_bandwidth_limit": copy_bandwidth_limit,
+        "shard": shard,
+        "session_timeout": session_timeout,
+        "fail_fast": fail_fast,
+        "streaming": streaming,
+        "write_as_derivative": write_as_derivative,
+        "resume": resume is not None,
     }
 
     non_missing_run_config_kwargs = {
@@ -185,11 +481,39 @@ def _run_convert_nwb_dataset(
         or (key == "file_mode" and value != "auto")
         or (key == "use_session_labels" and value is not False)
     }
+    # Zero jobs requests one process per CPU, which the run configuration expresses as None
+    if jobs == 0:
+        non_missing_run_config_kwargs["max_workers"] = None
     run_config = RunConfig(**non_missing_run_config_kwargs)
 
-    dataset_converter = convert_nwb_dataset(nwb_paths=handled_nwb_paths, run_config=run_config)
+    if not watch:
+        dataset_converter = convert_nwb_dataset(nwb_paths=handled_nwb_paths, run_config=run_config)
+        _report_conversion(
+            dataset_converter=dataset_converter, run_config=run_config, sanitization_config=sanitization_config
+        )
+        return
 
-    if silent:
+    try:
+        for dataset_converter in watch_nwb_dataset(
+            nwb_paths=handled_nwb_paths,
+            run_config=run_config,
+            settle_seconds=settle_seconds,
+            poll_interval=poll_interval,
+        ):
+            _report_conversion(
+                dataset_converter=dataset_converter, run_config=run_config, sanitization_config=sanitization_config
+            )
+            if not silent:
+                rich_click.echo(message="\nWatching for new or changed NWB files (press CTRL+C to stop)...\n")
+    except KeyboardInterrupt:
+        pass
+
+
+def _report_conversion(
+    dataset_converter: DatasetConverter, run_config: RunConfig, sanitization_config: SanitizationConfig
+) -> None:
+    """Summarize the outcome of a conversion in the console."""
+    if run_config.silent:
         return
 
     notifications = dataset_converter.notifications
@@ -252,6 +576,158 @@ def _run_convert_nwb_dataset(
     rich_click.echo(message=console_notification)
 
 
+# nwb2bids finalize [OPTIONS]
+@_nwb2bids_cli.command(name="finalize")
+@rich_click.option(
+    "--bids-directory",
+    "-o",
+    help=(
+        "Path to the folder of the BIDS dataset shared by all shards of a sharded conversion "
+        "(default: current working directory)."
+    ),
+    required=False,
+    type=rich_click.Path(exists=True, file_okay=False, writable=True),
+    default=None,
+)
+@rich_click.option(
+    "--additional-metadata-file-path",
+    "additional_metadata_file_path",
+    help=(
+        "Path to a JSON file containing additional metadata to be included in the BIDS dataset. "
+        "This file should contain a dictionary with keys corresponding to BIDS entities."
+    ),
+    required=False,
+    type=rich_click.Path(exists=True, dir_okay=False, readable=True),
+    default=None,
+)
+@rich_click.option(
+    "--archive-target",
+    "archive_target",
+    help=(
+        "The archive that the BIDS dataset is intended for. "
+        "When set, a `.bidsignore` file is created with `dandiset.yaml` listed inside, "
+        "since `dandiset.yaml` is not part of the BIDS specification."
+    ),
+    required=False,
+    type=rich_click.Choice(["dandi", "ember"], case_sensitive=True),
+    default=None,
+)
+def _run_finalize_sharded_dataset(
+    bids_directory: str | None = None,
+    additional_metadata_file_path: str | None = None,
+    archive_target: typing.Literal["dandi", "ember"] | None = None,
+) -> None:
+    """
+    Write the dataset-level files of a BIDS dataset once every shard of a sharded conversion is done.
+    """
+    run_config_kwargs: dict[str, typing.Any] = {
+        "bids_directory": bids_directory,
+        "additional_metadata_file_path": additional_metadata_file_path,
+        "archive_target": archive_target,
+    }
+    non_missing_run_config_kwargs = {key: value for key, value in run_config_kwargs.items() if value is not None}
+    run_config = RunConfig(**non_missing_run_config_kwargs)
+
+    with DatasetConverter.from_shard_manifests(run_config=run_config) as dataset_converter:
+        dataset_converter.write_dataset_files()
+
+    number_of_sessions = len(dataset_converter.session_converters)
+    text = (
+        f"\nBIDS dataset was successfully finalized with {number_of_sessions} "
+        f'{_pluralize(n=number_of_sessions, phrase="session")}!\n'
+    )
+    console_notification = rich_click.style(text=text, fg="green")
+    rich_click.echo(message=console_notification)
+
+
+# nwb2bids reindex [OPTIONS]
+@_nwb2bids_cli.command(name="reindex")
+@rich_click.option(
+    "--bids-directory",
+    "-o",
+    help="Path to the folder of the BIDS dataset to reindex (default: current working directory).",
+    required=False,
+    type=rich_click.Path(exists=True, file_okay=False, writable=True),
+    default=None,
+)
+def _run_reindex_bids_dataset(bids_directory: str | None = None) -> None:
+    """
+    Regenerate `participants.tsv` and the `_sessions.tsv` files of a BIDS dataset from its directory tree.
+
+    No NWB files are read; existing rows and manual edits are kept for all subjects and sessions still present.
+    """
+    bids_directory_path = pathlib.Path(bids_directory) if bids_directory is not None else pathlib.Path.cwd()
+    reindex_bids_dataset(bids_directory=bids_directory_path)
+
+    text = f"\nBIDS dataset at '{bids_directory_path}' was successfully reindexed!\n"
+    console_notification = rich_click.style(text=text, fg="green")
+    rich_click.echo(message=console_notification)
+
+
+# nwb2bids serve [OPTIONS]
+@_nwb2bids_cli.command(name="serve")
+@rich_click.option(
+    "--host",
+    help="The address to listen on over TCP (default: 127.0.0.1, only reachable from this machine).",
+    required=False,
+    type=str,
+    default="127.0.0.1",
+)
+@rich_click.option(
+    "--port",
+    "-p",
+    help="The port to listen on over TCP (default: 8765).",
+    required=False,
+    type=rich_click.IntRange(min=0, max=65535),
+    default=8765,
+)
+@rich_click.option(
+    "--socket",
+    "socket_path",
+    help="Path of a Unix socket to listen on instead of TCP.",
+    required=False,
+    type=rich_click.Path(dir_okay=False),
+    default=None,
+)
+def _run_conversion_service(host: str = "127.0.0.1", port: int = 8765, socket_path: str | None = None) -> None:
+    """
+    Run conversion jobs submitted through a local HTTP API, keeping caches warm between them.
+
+    Submit a job with `POST /jobs` and a JSON body of the form `{"nwb_paths": [...], "run_config": {...}}`,
+    then poll its status and notifications with `GET /jobs/{job_id}`; `GET /jobs` lists all jobs.
+    Jobs run one at a time, in the order they were submitted. On stopping, jobs still queued are cancelled and only
+    the one running is waited for.
+
+    Over TCP, every request must carry the token printed at startup as an `Authorization: Bearer <token>` header.
+    The Unix socket can only be connected to by the user running the service, so it requires no token.
+    """
+    with ConversionService() as conversion_service:
+        server = conversion_service.create_server(
+            host=host, port=port, socket_path=pathlib.Path(socket_path) if socket_path is not None else None
+        )
+        if socket_path is None:
+            address = f"http://{server.server_address[0]}:{server.server_address[1]}"
+        else:
+            address = f"unix://{socket_path}"
+        text = f"\nListening for conversion jobs at {address} (press CTRL+C to stop)...\n"
+        rich_click.echo(message=rich_click.style(text=text, fg="green"))
+        if server.token is not None:
+            rich_click.echo(message=f"Authenticate requests with the header 'Authorization: Bearer {server.token}'\n")
+
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+
+        # Jobs still queued are cancelled on closing the service, but a conversion is never interrupted midway
+        running_job = conversion_service.running_job
+        if running_job is not None:
+            text = f"\nCancelling queued jobs and waiting for the current job ({running_job.job_id}) to finish...\n"
+            rich_click.echo(message=rich_click.style(text=text, fg="yellow"))
+
+
 # nwb2bids tutorial
 @_nwb2bids_cli.group(name="tutorial")
 def _nwb2bids_tutorial_cli():
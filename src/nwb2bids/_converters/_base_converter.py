@@ -1,7 +1,9 @@
 import abc
+import types
 import typing
 
 import pydantic
+import typing_extensions
 
 from ._run_config import RunConfig
 from ..notifications import Notification
@@ -20,3 +22,21 @@ class BaseConverter(pydantic.BaseModel, abc.ABC):
         """
         message = f"The `extract_metadata` method has not been implemented by the `{self.__class__.__name__}` class."
         raise NotImplementedError(message)
+
+    def close(self) -> None:
+        """
+        Release any NWB files and large references held on behalf of this converter.
+
+        Does nothing by default, for converters that hold nothing beyond their own attributes.
+        """
+
+    def __enter__(self) -> typing_extensions.Self:
+        return self
+
+    def __exit__(
+        self,
+        exception_type: type[BaseException] | None,
+        exception: BaseException | None,
+        traceback: types.TracebackType | None,
+    ) -> None:
+        self.close()
@@ -1,4 +1,7 @@
+import os
 import pathlib
+import shutil
+import subprocess
 
 
 def _file_startswith(file_path: pathlib.Path, string: str) -> bool:
@@ -22,26 +25,64 @@ def _file_startswith(file_path: pathlib.Path, string: str) -> bool:
         return first_bytes == string.encode("ascii")
 
 
-def _content_is_retrieved(file_path: pathlib.Path) -> bool:
+def _content_is_retrieved(entry: os.DirEntry) -> bool:
     """
-    Check if a file contents are fetched from the git-annex.
+    Check if a file contents are fetched from the git-annex, reusing the cached stat results of a directory entry.
 
     Parameters
     ----------
-    file_path : pathlib.Path
-        Path to the file to check.
+    entry : os.DirEntry
+        The directory entry of the file to check, as produced by `os.scandir`.
 
     Returns
     -------
     bool
         True if the file is a pointer to annex contents, False otherwise.
     """
-    if not file_path.exists():
+    # Follows symlinks, so a 'broken' symlink (the target does not exist) is also reported as not being a file
+    if not entry.is_file():
         return False
 
-    # Note that if the file path is a 'broken' symlink (the target does not exist)
-    # the call to `.exists()` would actually return False
-    if file_path.is_symlink() and (".git" in file_path.readlink().parts):
+    if entry.is_symlink() and (".git" in pathlib.Path(os.readlink(entry.path)).parts):
         return True
 
-    return not _file_startswith(file_path=file_path, string="/annex")
+    return not _file_startswith(file_path=pathlib.Path(entry.path), string="/annex")
+
+
+def _is_within_git_repository(directory: pathlib.Path) -> bool:
+    """Check if a directory is located within a git repository (including being the root of one)."""
+    absolute_directory = directory.absolute()
+    return any((parent / ".git").exists() for parent in [absolute_directory, *absolute_directory.parents])
+
+
+def _find_retrieved_annexed_file_paths(directory: str) -> set[str] | None:
+    """
+    Ask git-annex once which annexed files beneath a directory have their content present locally.
+
+    This replaces a per-file check (several system calls plus opening each file) with a single query per repository.
+    Nested repositories (such as DataLad subdatasets) are not included and must be queried separately.
+
+    Parameters
+    ----------
+    directory : str
+        The directory to query; may be the root of a repository or any directory within it.
+
+    Returns
+    -------
+    set of str or None
+        The normalized paths (joined onto `directory`) of all annexed files whose content is present.
+        None if the directory is not within a git-annex repository or if git-annex is not available,
+        in which case the per-file check should be used instead.
+    """
+    if shutil.which("git-annex") is None:
+        return None
+
+    result = subprocess.run(args=["git", "-C", directory, "annex", "find", "--print0"], capture_output=True)
+    if result.returncode != 0:
+        return None
+
+    relative_paths = os.fsdecode(result.stdout).split("\0")
+    retrieved_file_paths = {
+        os.path.normpath(os.path.join(directory, relative_path)) for relative_path in relative_paths if relative_path
+    }
+    return retrieved_file_paths
@@ -1,6 +1,15 @@
 import collections
+import concurrent.futures
+import contextlib
+import itertools
 import json
+import math
+import multiprocessing
+import os
+import pathlib
+import time
 import traceback
+import typing
 
 import pandas
 import pydantic
@@ -8,12 +17,142 @@ import typing_extensions
 from tqdm import tqdm
 
 from ._dandi_utils import get_bids_dataset_description
+from ._journal import JournalEntry, _append_journal_entry, _load_journal
 from ._run_config import RunConfig
-from ._session_converter import SessionConverter
+from ._scheduling import StageSchedule, _run_timed
+from ._session_converter import SessionConverter, _configure_nwb_file_cache, _extract_metadata_dictionary_in_worker
+from ._sharding import (
+    ShardManifest,
+    ShardSession,
+    _get_shard_manifest_file_path,
+    _is_derived_session,
+    _is_in_shard,
+    _load_shard_manifests,
+    _read_participant_id,
+)
+from ._streaming import _read_is_derived
+from ._watchdog import SessionTimeoutError, WatchdogExecutor, WorkerProcessError
 from .._converters._base_converter import BaseConverter
+from .._tools import get_file_index, hold_file_lock, write_text_atomically
+from .._tools._session_timings import Stage
 from ..bids_models import BidsSessionMetadata, DatasetDescription
 from ..notifications import Notification
 
+_Submission = tuple[SessionConverter, list[pathlib.Path] | list[pydantic.HttpUrl], concurrent.futures.Future]
+
+
+def _open_executor(
+    executor: concurrent.futures.Executor | None, max_workers: int | None, run_config: RunConfig
+) -> contextlib.AbstractContextManager[concurrent.futures.Executor | None]:
+    """
+    Use the given executor as is, or otherwise open a process pool when more than one worker is requested.
+
+    When a session timeout is set, sessions are always extracted in worker processes, which are killed and replaced
+    whenever a session takes longer than that. Yields None when metadata should instead be extracted within this
+    process. Each worker process configures its cache of NWB files for the run once, as it starts.
+    """
+    if executor is not None:
+        return contextlib.nullcontext(enter_result=executor)
+    if run_config.session_timeout is not None:
+        return WatchdogExecutor(
+            max_workers=max_workers,
+            timeout=run_config.session_timeout,
+            initializer=_configure_nwb_file_cache,
+            initargs=(run_config,),
+        )
+    if max_workers == 1:
+        return contextlib.nullcontext(enter_result=None)
+
+    # Workers are spawned rather than forked, since this process may hold HDF5 files open
+    return concurrent.futures.ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context(method="spawn"),
+        initializer=_configure_nwb_file_cache,
+        initargs=(run_config,),
+    )
+
+
+def _submit(executor: concurrent.futures.Executor, session_converter: SessionConverter) -> _Submission:
+    """Submit the extraction of the metadata of a session, along with the files it was submitted for."""
+    nwbfile_paths = list(session_converter.nwbfile_paths)
+    future = executor.submit(
+        _run_timed,
+        _extract_metadata_dictionary_in_worker,
+        nwbfile_paths=nwbfile_paths,
+        run_config=session_converter.run_config,
+    )
+    return session_converter, nwbfile_paths, future
+
+
+def _cancel(submissions: list[_Submission]) -> None:
+    """Cancel all submitted extractions that have not started yet."""
+    for _, _, future in submissions:
+        future.cancel()
+
+
+def _convert_session(session_converter: SessionConverter) -> float:
+    """Write a single session to the BIDS dataset and release its NWB files, returning the seconds it took."""
+    try:
+        _, seconds = _run_timed(session_converter.convert_to_bids_session)
+    finally:
+        # Nothing else is read from the NWB files of this session once it has been written (or failed to be), while its
+        # metadata is still needed for the journal and the dataset-level files
+        session_converter._close_nwbfiles()
+    return seconds
+
+
+def _merge_with_existing_table(
+    data_frame: pandas.DataFrame, file_path: pathlib.Path, id_column: str, required_column_order: list[str]
+) -> pandas.DataFrame:
+    """
+    Merge a table into the one already written to a TSV file, such as by other converters into the same dataset.
+
+    Rows are matched by their ID; values of this table replace existing ones, while existing rows and columns not in
+    this table (including any added manually) are kept, in their original order. Only the first of any rows repeating
+    an existing ID is kept.
+    """
+    if not file_path.exists():
+        return data_frame
+
+    existing_data_frame = pandas.read_csv(filepath_or_buffer=file_path, sep="\t", dtype="string", keep_default_na=False)
+    if id_column not in existing_data_frame.columns:
+        return data_frame
+    # A table edited by hand may repeat an ID, which could not be matched to a single row
+    existing_data_frame = existing_data_frame.drop_duplicates(subset=id_column, keep="first")
+
+    merged_data_frame = data_frame.set_index(keys=id_column).combine_first(
+        other=existing_data_frame.set_index(keys=id_column)
+    )
+    existing_ids = list(existing_data_frame[id_column])
+    existing_id_set = set(existing_ids)
+    ids = existing_ids + [id_ for id_ in data_frame[id_column] if id_ not in existing_id_set]
+    merged_data_frame = merged_data_frame.reindex(index=ids).reset_index(names=id_column)
+
+    # BIDS Validator is strict regarding column order
+    columns = list(dict.fromkeys([*existing_data_frame.columns, *data_frame.columns]))
+    column_order = [column for column in required_column_order if column in columns] + [
+        column for column in columns if column not in required_column_order
+    ]
+    return merged_data_frame[column_order]
+
+
+def _merge_with_existing_json(dictionary: dict[str, typing.Any], file_path: pathlib.Path) -> dict[str, typing.Any]:
+    """Merge a dictionary into the JSON object already written to a file, replacing existing values unless None."""
+    if not file_path.exists():
+        return dictionary
+
+    try:
+        existing_dictionary = json.loads(file_path.read_text())
+    except json.JSONDecodeError:
+        return dictionary
+    if not isinstance(existing_dictionary, dict):
+        return dictionary
+
+    return {
+        **existing_dictionary,
+        **{key: value for key, value in dictionary.items() if value is not None or key not in existing_dictionary},
+    }
+
 
 class DatasetConverter(BaseConverter):
     session_converters: list[SessionConverter] = pydantic.Field(
@@ -23,6 +162,21 @@ class DatasetConverter(BaseConverter):
         description="The BIDS-compatible dataset description.",
         default=None,
     )
+    # Sessions assigned to other shards, which still count towards dataset-level decisions
+    _other_shard_session_converters: list[SessionConverter] = pydantic.PrivateAttr(default_factory=list)
+    # The order in which the sessions of this shard were discovered among those of all shards
+    _discovery_indices: dict[str, int] = pydantic.PrivateAttr(default_factory=dict)
+    # Whether the dataset is written as a derivative, when decided before the metadata of its sessions is available
+    # (by the shards of a sharded conversion, or by the pre-classification pass of a streaming conversion)
+    _decided_is_derivative: bool | None = pydantic.PrivateAttr(default=None)
+    # Sessions that failed to be read or written, which are left out of all later steps and the dataset-level files
+    _failed_session_ids: set[str] = pydantic.PrivateAttr(default_factory=set)
+    # Sessions already converted by the run being resumed, which are restored from its journal instead of converted
+    _completed_session_ids: set[str] = pydantic.PrivateAttr(default_factory=set)
+    # Summaries of the sessions held only by the metadata needed for the dataset-level files, keyed by session ID
+    _session_summaries: dict[str, ShardSession] = pydantic.PrivateAttr(default_factory=dict)
+    # The longest-first order of the sessions of each stage, along with how long they actually took
+    _stage_schedules: dict[str, StageSchedule] = pydantic.PrivateAttr(default_factory=dict)
 
     @pydantic.computed_field
     @property
@@ -43,6 +197,81 @@ class DatasetConverter(BaseConverter):
         )
         return notifications
 
+    def _get_stage_schedule(self, stage: Stage) -> StageSchedule:
+        if stage not in self._stage_schedules:
+            self._stage_schedules[stage] = StageSchedule.from_run_config(stage=stage, run_config=self.run_config)
+        return self._stage_schedules[stage]
+
+    @property
+    def _successful_session_converters(self) -> list[SessionConverter]:
+        """The session converters that have not failed to be read or written."""
+        return [sc for sc in self.session_converters if sc.session_id not in self._failed_session_ids]
+
+    def _restore_completed_sessions(self, journal_file_path: pathlib.Path, bids_directory: pathlib.Path) -> None:
+        """
+        Replace each session recorded as completed in the journal of the run being resumed by its recorded metadata.
+
+        Sessions whose NWB files have changed or whose output files are missing are converted again instead.
+        Completed sessions that were not discovered again (such as those whose files were moved into the BIDS
+        directory, or those left out of the NWB paths of a partial conversion) are still restored, so that the
+        dataset-level files include them. All sessions keep the order in which they were recorded, and sessions not
+        recorded yet are placed before the next recorded session discovered after them (or last, if there is none).
+        """
+        journal_entries = _load_journal(file_path=journal_file_path)
+
+        def _restore(journal_entry: JournalEntry) -> SessionConverter:
+            restored_session_converter = journal_entry.session.to_session_converter(
+                run_config=self.run_config, sanitization_config=self.run_config.sanitization_config
+            )
+            restored_session_converter.notifications = journal_entry.notifications
+            self._completed_session_ids.add(restored_session_converter.session_id)
+            self._session_summaries[restored_session_converter.session_id] = journal_entry.session
+            return restored_session_converter
+
+        session_converters = []
+        for session_converter in self.session_converters:
+            journal_entry = journal_entries.get(session_converter.session_id, None)
+            if (
+                journal_entry is None
+                or not journal_entry.matches_nwbfiles(nwbfile_paths=session_converter.nwbfile_paths)
+                or not journal_entry.has_outputs(bids_directory=bids_directory)
+            ):
+                session_converters.append(session_converter)
+                continue
+            session_converters.append(_restore(journal_entry=journal_entry))
+
+        discovered_session_ids = {sc.session_id for sc in self.session_converters}
+        undiscovered_journal_entries = sorted(
+            (
+                journal_entry
+                for session_id, journal_entry in journal_entries.items()
+                if session_id not in discovered_session_ids and journal_entry.has_outputs(bids_directory=bids_directory)
+            ),
+            key=lambda journal_entry: journal_entry.session.discovery_index,
+        )
+        session_converters += [_restore(journal_entry=journal_entry) for journal_entry in undiscovered_journal_entries]
+
+        sort_keys: list[tuple[float, int, int]] = []
+        next_discovery_index = math.inf
+        for position, session_converter in reversed(list(enumerate(session_converters))):
+            journal_entry = journal_entries.get(session_converter.session_id, None)
+            if journal_entry is None:
+                sort_keys.append((next_discovery_index, -1, position))
+                continue
+
+            sort_keys.append((journal_entry.session.discovery_index, 0, position))
+            if session_converter.session_id in discovered_session_ids:
+                next_discovery_index = journal_entry.session.discovery_index
+        self.session_converters = [session_converters[position] for _, _, position in sorted(sort_keys)]
+
+    def _record_session_failure(self, session_converter: SessionConverter, identifier: str) -> None:
+        """Record the exception being handled as a failure of a single session, which is skipped from then on."""
+        notification = Notification.from_definition(
+            identifier=identifier, source_file_paths=session_converter.nwbfile_paths, traceback=traceback.format_exc()
+        )
+        session_converter.notifications.append(notification)
+        self._failed_session_ids.add(session_converter.session_id)
+
     @property
     def _is_derivative(self) -> bool:
         """
@@ -51,14 +280,20 @@ class DatasetConverter(BaseConverter):
         This is the case when any session contains a units table but no electrodes table
         and no raw :class:`~pynwb.ecephys.ElectricalSeries` in the ``acquisition`` module,
         indicating the data is derived (e.g., spike-sorted) rather than raw.
-        Metadata must be extracted before this property is meaningful.
+        Metadata must be extracted before this property is meaningful, unless it was decided up front.
         """
+        if self.run_config.write_as_derivative is not None:
+            return self.run_config.write_as_derivative
+        if self._decided_is_derivative is not None:
+            return self._decided_is_derivative
+
         return any(
-            sc.session_metadata is not None
-            and not sc.session_metadata.has_electrical_series_in_acquisition
-            and sc.session_metadata.electrode_table is None
-            and sc.session_metadata.has_units_table
-            for sc in self.session_converters
+            (
+                self._session_summaries[sc.session_id].is_derived
+                if sc.session_id in self._session_summaries
+                else _is_derived_session(session_metadata=sc.session_metadata)
+            )
+            for sc in self._successful_session_converters
         )
 
     @classmethod
@@ -155,6 +390,7 @@ class DatasetConverter(BaseConverter):
         cls,
         nwb_paths: list[pydantic.FilePath | pydantic.DirectoryPath] = pydantic.Field(min_length=1),
         run_config: RunConfig = pydantic.Field(default_factory=lambda: RunConfig()),
+        extract_metadata: bool = False,
     ) -> typing_extensions.Self:
         """
         Initialize a converter of NWB files to BIDS format.
@@ -165,12 +401,30 @@ class DatasetConverter(BaseConverter):
             An iterable of NWB file paths and directories containing NWB files.
         run_config : RunConfig, optional
             The configuration for this conversion run.
+        extract_metadata : bool, default: False
+            Whether to also extract the metadata of each session as soon as it is discovered.
+            This overlaps metadata extraction with the discovery of the remaining NWB files.
         Returns
         -------
         An instance of DatasetConverter.
         """
+        if extract_metadata:
+            return cls._from_nwb_paths_with_metadata(nwb_paths=nwb_paths, run_config=run_config)
+
         try:
             session_converters = SessionConverter.from_nwb_paths(nwb_paths=nwb_paths, run_config=run_config)
+            other_shard_session_converters = []
+            discovery_indices = dict()
+            if (shard := run_config.shard) is not None:
+                other_shard_session_converters = [
+                    sc for sc in session_converters if not _is_in_shard(session_id=sc.session_id, shard=shard)
+                ]
+                discovery_indices = {
+                    sc.session_id: discovery_index for discovery_index, sc in enumerate(session_converters)
+                }
+                session_converters = [
+                    sc for sc in session_converters if _is_in_shard(session_id=sc.session_id, shard=shard)
+                ]
             dataset_description = None
             additional_metadata_file_path = run_config.additional_metadata_file_path
 
@@ -187,6 +441,8 @@ class DatasetConverter(BaseConverter):
                 session_converters=session_converters, dataset_description=dataset_description, run_config=run_config
             )
             dataset_converter._internal_notifications = session_messages
+            dataset_converter._other_shard_session_converters = other_shard_session_converters
+            dataset_converter._discovery_indices = discovery_indices
             return dataset_converter
         except Exception:  # noqa
             notification = Notification.from_definition(
@@ -198,31 +454,267 @@ class DatasetConverter(BaseConverter):
             dataset_converter._internal_notifications = _internal_notifications
             return dataset_converter
 
-    def extract_metadata(self) -> None:
-        try:
-            sessions_needing_metadata = [sc for sc in self.session_converters if sc.session_metadata is None]
-            if not sessions_needing_metadata:
-                return
+    @classmethod
+    @pydantic.validate_call
+    def from_shard_manifests(
+        cls, run_config: RunConfig = pydantic.Field(default_factory=lambda: RunConfig())
+    ) -> typing_extensions.Self:
+        """
+        Initialize a converter from the manifests left in a BIDS directory by every shard of a sharded conversion.
 
-            collections.deque(
-                (
-                    session_converter.extract_metadata()
-                    for session_converter in tqdm(
-                        sessions_needing_metadata,
-                        desc="Extracting metadata",
+        The resulting converter only holds the metadata needed to write the dataset-level files.
+
+        Parameters
+        ----------
+        run_config : RunConfig, optional
+            The configuration for this run, whose `bids_directory` is the one shared by all shards.
+        Returns
+        -------
+        An instance of DatasetConverter.
+        """
+        shard_manifests = _load_shard_manifests(nwb2bids_directory=run_config._nwb2bids_directory)
+        is_derivative = any(shard_manifest.is_derivative for shard_manifest in shard_manifests)
+        if is_derivative:
+            derivatives_bids_directory = run_config.bids_directory / "derivatives" / "nwb2bids"
+            run_config = run_config.model_copy(update={"bids_directory": derivatives_bids_directory})
+
+        # Restore the order in which the sessions were discovered, as when converting without sharding
+        shard_sessions = sorted(
+            (
+                (shard_session, shard_manifest.sanitization_config)
+                for shard_manifest in shard_manifests
+                for shard_session in shard_manifest.sessions
+            ),
+            key=lambda item: item[0].discovery_index,
+        )
+        session_converters = [
+            shard_session.to_session_converter(run_config=run_config, sanitization_config=sanitization_config)
+            for shard_session, sanitization_config in shard_sessions
+        ]
+
+        dataset_description = None
+        if run_config.additional_metadata_file_path is not None:
+            dataset_description = DatasetDescription.from_file_path(file_path=run_config.additional_metadata_file_path)
+
+        dataset_converter = cls(
+            session_converters=session_converters, dataset_description=dataset_description, run_config=run_config
+        )
+        dataset_converter._decided_is_derivative = is_derivative
+        return dataset_converter
+
+    @classmethod
+    def _from_nwb_paths_with_metadata(
+        cls, nwb_paths: list[pathlib.Path], run_config: RunConfig
+    ) -> typing_extensions.Self:
+        """Initialize a converter of NWB files while extracting the metadata of each session as it is discovered."""
+        submissions: list[_Submission] = []
+        start_time = time.perf_counter()
+        with _open_executor(executor=None, max_workers=run_config.max_workers, run_config=run_config) as executor:
+            try:
+                dataset_description = None
+                additional_metadata_file_path = run_config.additional_metadata_file_path
+                if additional_metadata_file_path is not None:
+                    dataset_description = DatasetDescription.from_file_path(file_path=additional_metadata_file_path)
+
+                dataset_converter = cls(
+                    session_converters=[], dataset_description=dataset_description, run_config=run_config
+                )
+                session_converter_stream = SessionConverter.iter_from_nwb_paths(
+                    nwb_paths=nwb_paths, run_config=run_config
+                )
+                # As with `extract_metadata`, no further sessions are extracted after the first failure
+                is_extracting = True
+                # The files of each session whose extraction failed, since a late file may yet let it succeed
+                failed_sessions: list[tuple[SessionConverter, list[pathlib.Path]]] = []
+                for discovery_index, session_converter in enumerate(
+                    tqdm(
+                        session_converter_stream,
+                        desc="Discovering sessions",
                         unit="session",
-                        disable=self.run_config.silent,
+                        disable=run_config.silent,
                     )
-                ),
-                maxlen=0,
+                ):
+                    shard = run_config.shard
+                    if shard is not None:
+                        dataset_converter._discovery_indices[session_converter.session_id] = discovery_index
+                    if shard is not None and not _is_in_shard(session_id=session_converter.session_id, shard=shard):
+                        dataset_converter._other_shard_session_converters.append(session_converter)
+                        continue
+
+                    dataset_converter.session_converters.append(session_converter)
+                    if executor is not None:
+                        submissions.append(_submit(executor=executor, session_converter=session_converter))
+                    elif is_extracting:
+                        is_extracting = dataset_converter._extract_session_metadata(session_converter=session_converter)
+                        if session_converter.session_id in dataset_converter._failed_session_ids:
+                            failed_sessions.append((session_converter, list(session_converter.nwbfile_paths)))
+            except Exception:  # noqa
+                _cancel(submissions=submissions)
+                notification = Notification.from_definition(
+                    identifier="LocalInitializationFailure", traceback=traceback.format_exc()
+                )
+                dataset_converter = cls(session_converters=[], dataset_description=None, run_config=run_config)
+                dataset_converter._internal_notifications = [notification]
+                return dataset_converter
+
+            if executor is not None:
+                is_extracting = dataset_converter._collect_session_metadata(submissions=submissions)
+
+            # Sessions are extracted as they are discovered, so their order cannot be scheduled
+            extraction_schedule = dataset_converter._get_stage_schedule(stage="extraction")
+            extraction_schedule.wall_seconds += time.perf_counter() - start_time
+            extraction_schedule.save()
+
+            # Sessions joined by files found after their first extraction were reset during discovery, including the
+            # notification of any failure, so they are extracted again rather than silently left out
+            for session_converter, failed_nwbfile_paths in failed_sessions:
+                if session_converter.nwbfile_paths != failed_nwbfile_paths:
+                    dataset_converter._failed_session_ids.discard(session_converter.session_id)
+            if is_extracting:
+                dataset_converter.extract_metadata(executor=executor)
+        return dataset_converter
+
+    def _extract_session_metadata(self, session_converter: SessionConverter) -> bool:
+        """
+        Extract the metadata of a single session, returning whether the extraction of further sessions should proceed.
+
+        A failure only skips this session, unless `run_config.fail_fast` is set.
+        """
+        try:
+            _, seconds = _run_timed(session_converter.extract_metadata)
+        except Exception:  # noqa
+            if not self.run_config.fail_fast:
+                self._record_session_failure(session_converter=session_converter, identifier="SessionExtractionFailure")
+                return True
+
+            notification = Notification.from_definition(
+                identifier="MetadataExtractionFailure", traceback=traceback.format_exc()
             )
+            self._internal_notifications.append(notification)
+            return False
+
+        self._get_stage_schedule(stage="extraction").record(session_converter=session_converter, seconds=seconds)
+        return True
+
+    def _load_extracted_metadata(self, session_converter: SessionConverter, future: concurrent.futures.Future) -> bool:
+        """
+        Load the metadata extracted by an executor into a session, returning whether it succeeded.
+
+        A failure is recorded on the session, unless `run_config.fail_fast` is set, in which case it is raised.
+        """
+        try:
+            metadata_dictionary, seconds = future.result()
+            session_converter._load_metadata_dictionary(metadata_dictionary=metadata_dictionary)
+        except Exception as exception:  # noqa
+            if self.run_config.fail_fast:
+                raise
+            if isinstance(exception, SessionTimeoutError):
+                identifier = "SessionExtractionTimeout"
+            elif isinstance(exception, WorkerProcessError):
+                identifier = "SessionExtractionWorkerFailure"
+            else:
+                identifier = "SessionExtractionFailure"
+            self._record_session_failure(session_converter=session_converter, identifier=identifier)
+            return False
+
+        self._get_stage_schedule(stage="extraction").record(session_converter=session_converter, seconds=seconds)
+        return True
+
+    def _collect_session_metadata(self, submissions: list[_Submission]) -> bool:
+        """
+        Load the metadata extracted by an executor into each session, in the order the sessions were submitted.
+
+        Returns whether the extraction of further sessions should proceed; as when extracting serially, a failure only
+        skips its session unless `run_config.fail_fast` is set, in which case the remaining ones are cancelled.
+        """
+        try:
+            for session_converter, nwbfile_paths, future in tqdm(
+                submissions,
+                desc="Extracting metadata",
+                unit="session",
+                disable=self.run_config.silent,
+            ):
+                # A late file joined this session after it was submitted, so its metadata is extracted again
+                if session_converter.nwbfile_paths != nwbfile_paths:
+                    future.cancel()
+                    continue
+
+                self._load_extracted_metadata(session_converter=session_converter, future=future)
         except Exception:  # noqa
+            _cancel(submissions=submissions)
             notification = Notification.from_definition(
                 identifier="MetadataExtractionFailure", traceback=traceback.format_exc()
             )
             self._internal_notifications.append(notification)
+            return False
+        return True
+
+    def extract_metadata(self, executor: concurrent.futures.Executor | None = None) -> None:
+        """
+        Extract the metadata of all sessions that do not have it yet.
+
+        Parameters
+        ----------
+        executor : concurrent.futures.Executor, optional
+            An executor in which to extract the metadata of each session, such as a thread or process pool.
+            Its workers only receive the file paths and run configuration of each session and return picklable
+            metadata, which is loaded back into the sessions in their original order.
+            Defaults to a process pool of `run_config.max_workers` workers, or to extracting each session in turn
+            within this process if that is 1. The cache of open NWB files in the workers of an executor given here
+            keeps its own bounds, rather than those of the run configuration.
+        """
+        sessions_needing_metadata = [sc for sc in self._successful_session_converters if sc.session_metadata is None]
+        if not sessions_needing_metadata:
+            return
+
+        # Starting the longest sessions first keeps the pool busy until the very end
+        extraction_schedule = self._get_stage_schedule(stage="extraction")
+        scheduled_sessions = extraction_schedule.order(session_converters=sessions_needing_metadata)
+
+        start_time = time.perf_counter()
+        max_workers = min(self.run_config.max_workers or os.cpu_count() or 1, len(sessions_needing_metadata))
+        with _open_executor(executor=executor, max_workers=max_workers, run_config=self.run_config) as session_executor:
+            try:
+                if session_executor is None:
+                    for session_converter in tqdm(
+                        scheduled_sessions,
+                        desc="Extracting metadata",
+                        unit="session",
+                        disable=self.run_config.silent,
+                    ):
+                        if not self._extract_session_metadata(session_converter=session_converter):
+                            return
+                else:
+                    submissions = [
+                        _submit(executor=session_executor, session_converter=session_converter)
+                        for session_converter in scheduled_sessions
+                    ]
+                    if not self._collect_session_metadata(submissions=submissions):
+                        return
+
+                # Persist any modalities detected and times taken during extraction for use on later runs
+                if self.run_config.use_cache:
+                    get_file_index(cache_directory=self.run_config.cache_directory).save()
+                    extraction_schedule.save()
+            except Exception:  # noqa
+                notification = Notification.from_definition(
+                    identifier="MetadataExtractionFailure", traceback=traceback.format_exc()
+                )
+                self._internal_notifications.append(notification)
+            finally:
+                extraction_schedule.wall_seconds += time.perf_counter() - start_time
+
+    def close(self) -> None:
+        """
+        Close the NWB files of all sessions that are still held open from metadata extraction.
+
+        Unlike closing each session, their metadata is kept, since it makes up the contents of the dataset-level files
+        and the notifications of the conversion.
+        """
+        for session_converter in self.session_converters:
+            session_converter._close_nwbfiles()
 
-    def _set_use_session_labels(self) -> None:
+    def _set_use_session_labels(self, read_unextracted: bool = False) -> None:
         """
         Determine whether each session converter should include the `ses-` entity in file names.
 
@@ -233,21 +725,47 @@ class DatasetConverter(BaseConverter):
           to ensure dataset-level consistency.
         - Otherwise (when ≤50% of subjects have multiple sessions), single-session subjects do not use
           `ses-` labels.
+
+        Sessions whose metadata has not been extracted yet are left out, unless `read_unextracted` is set, in which
+        case their participant IDs are read lightly, as for the sessions of other shards.
         """
+        # Sessions restored from the journal of the run being resumed keep the labels they were written with
         if self.run_config.use_session_labels:
             for session_converter in self.session_converters:
-                session_converter.use_session_labels = True
+                if session_converter.session_id not in self._completed_session_ids:
+                    session_converter.use_session_labels = True
             return
 
-        participant_session_counts: collections.Counter = collections.Counter()
-        for session_converter in self.session_converters:
+        file_index = (
+            get_file_index(cache_directory=self.run_config.cache_directory) if self.run_config.use_cache else None
+        )
+
+        def _get_participant_id(session_converter: SessionConverter) -> str | None:
             session_metadata = session_converter.session_metadata
-            if session_metadata is None:
-                continue
-            sanitization = session_metadata.sanitization
-            if sanitization is None:
+            if session_metadata is None and read_unextracted:
+                return _read_participant_id(
+                    session_converter=session_converter,
+                    file_index=file_index,
+                    sanitization_config=self.run_config.sanitization_config,
+                )
+            if session_metadata is None or session_metadata.sanitization is None:
+                return None
+            return session_metadata.sanitization.sanitized_participant_id
+
+        participant_ids = {sc.session_id: _get_participant_id(sc) for sc in self._successful_session_converters}
+        participant_session_counts: collections.Counter = collections.Counter(
+            participant_id for participant_id in participant_ids.values() if participant_id is not None
+        )
+
+        # Sessions converted by other shards are only read lightly, but still count towards the decision
+        for session_converter in self._other_shard_session_converters:
+            participant_id = _read_participant_id(
+                session_converter=session_converter,
+                file_index=file_index,
+                sanitization_config=self.run_config.sanitization_config,
+            )
+            if participant_id is None:
                 continue
-            participant_id = sanitization.sanitized_participant_id
             participant_session_counts[participant_id] += 1
 
         total_subjects = len(participant_session_counts)
@@ -257,48 +775,34 @@ class DatasetConverter(BaseConverter):
         subjects_with_multiple_sessions = sum(1 for count in participant_session_counts.values() if count > 1)
         use_labels_globally = (subjects_with_multiple_sessions / total_subjects) > 0.5
         for session_converter in self.session_converters:
-            session_metadata = session_converter.session_metadata
-            if session_metadata is None:
+            participant_id = participant_ids.get(session_converter.session_id, None)
+            if participant_id is None or session_converter.session_id in self._completed_session_ids:
                 continue
-            sanitization = session_metadata.sanitization
-            if sanitization is None:
-                continue
-            participant_id = sanitization.sanitized_participant_id
             session_converter.use_session_labels = participant_session_counts[participant_id] > 1 or use_labels_globally
 
     def convert_to_bids_dataset(self) -> None:
         """Convert the directory of NWB files to a BIDS dataset."""
+        # Shard manifests are gathered from the top-level BIDS directory, even for derivative datasets
+        nwb2bids_directory = self.run_config._nwb2bids_directory
+        # Likewise, the journal and the outputs it records always refer to the top-level BIDS directory
+        bids_directory = self.run_config.bids_directory
+        journal_file_path = self.run_config.journal_file_path
         try:
-            # Ensure all metadata is extracted before determining session label usage
-            self.extract_metadata()
-
-            # If any session has a units table but no electrodes table, redirect all output
-            # to a 'derivatives/nwb2bids' subfolder. DatasetType is set to 'derivative'
-            # separately inside write_dataset_description.
-            if self._is_derivative:
-                derivatives_bids_directory = self.run_config.bids_directory / "derivatives" / "nwb2bids"
-                derivatives_bids_directory.mkdir(parents=True, exist_ok=True)
-                derivative_run_config = self.run_config.model_copy(
-                    update={"bids_directory": derivatives_bids_directory}
-                )
-                self.run_config = derivative_run_config
-                for session_converter in self.session_converters:
-                    session_converter.run_config = derivative_run_config
-
-            # Determine which sessions should use ses- labels (requires metadata for participant IDs)
-            self._set_use_session_labels()
-            for session_converter in tqdm(
-                self.session_converters,
-                desc="Converting sessions",
-                unit="session",
-                disable=self.run_config.silent,
-            ):
-                session_converter.convert_to_bids_session()
+            if self.run_config.resume:
+                self._restore_completed_sessions(journal_file_path=journal_file_path, bids_directory=bids_directory)
+
+            if self.run_config.streaming:
+                self._stream_sessions(journal_file_path=journal_file_path, bids_directory=bids_directory)
+            else:
+                self._convert_sessions(journal_file_path=journal_file_path, bids_directory=bids_directory)
 
-            self.write_participants_metadata()
-            self.write_sessions_metadata()
-            self.write_dataset_description()
-            self.write_bidsignore()
+            # Dataset-level files depend on the sessions of all shards, so they are written by `finalize` instead
+            if (shard := self.run_config.shard) is not None:
+                self.write_shard_manifest(
+                    file_path=_get_shard_manifest_file_path(nwb2bids_directory=nwb2bids_directory, shard=shard)
+                )
+            else:
+                self.write_dataset_files()
         except Exception:  # noqa
             notification = Notification.from_definition(
                 identifier="LocalInitializationFailure", traceback=traceback.format_exc()
@@ -310,6 +814,323 @@ class DatasetConverter(BaseConverter):
 
             notifications_dump = [notification.model_dump(mode="json") for notification in self.notifications]
             self.run_config.notifications_json_file_path.write_text(data=json.dumps(obj=notifications_dump, indent=2))
+            self.write_timings_report()
+
+    def _read_other_shards_are_derived(self) -> bool:
+        """
+        Read whether any session converted by another shard makes the dataset a BIDS derivative.
+
+        All shards write into the same BIDS directory, so they must all reach the same decision.
+        """
+        if len(self._other_shard_session_converters) == 0:
+            return False
+
+        file_index = (
+            get_file_index(cache_directory=self.run_config.cache_directory) if self.run_config.use_cache else None
+        )
+        is_derived = any(
+            _read_is_derived(session_converter=session_converter, file_index=file_index)
+            for session_converter in self._other_shard_session_converters
+        )
+        if file_index is not None:
+            file_index.save()
+        return is_derived
+
+    def _redirect_to_derivatives(self) -> None:
+        """
+        Redirect all output to a 'derivatives/nwb2bids' subfolder.
+
+        DatasetType is set to 'derivative' separately inside write_dataset_description.
+        """
+        derivatives_bids_directory = self.run_config.bids_directory / "derivatives" / "nwb2bids"
+        derivatives_bids_directory.mkdir(parents=True, exist_ok=True)
+        derivative_run_config = self.run_config.model_copy(update={"bids_directory": derivatives_bids_directory})
+        self.run_config = derivative_run_config
+        for session_converter in self.session_converters:
+            session_converter.run_config = derivative_run_config
+
+    def _convert_sessions(self, journal_file_path: pathlib.Path, bids_directory: pathlib.Path) -> None:
+        """Extract the metadata of all sessions, then write them all to the BIDS dataset."""
+        # Ensure all metadata is extracted before determining session label usage
+        self.extract_metadata()
+
+        # If any session has a units table but no electrodes table, redirect all output to the derivatives
+        # Sessions converted by other shards are only read lightly, but still count towards the decision
+        if self.run_config.write_as_derivative is None and len(self._other_shard_session_converters) > 0:
+            self._decided_is_derivative = self._is_derivative or self._read_other_shards_are_derived()
+        if self._is_derivative:
+            self._redirect_to_derivatives()
+
+        # Determine which sessions should use ses- labels (requires metadata for participant IDs)
+        self._set_use_session_labels()
+        # Sessions write to disjoint directories, so their many small I/O-bound writes can overlap
+        # The pool runs sessions in the order they are submitted, so the longest ones are started first
+        conversion_schedule = self._get_stage_schedule(stage="conversion")
+        # Sessions that failed to be read are left out, so that the rest of the dataset is still converted
+        scheduled_sessions = conversion_schedule.order(
+            session_converters=[
+                sc for sc in self._successful_session_converters if sc.session_id not in self._completed_session_ids
+            ]
+        )
+        discovery_indices = self._get_all_discovery_indices()
+        start_time = time.perf_counter()
+        max_write_workers = max(1, min(self.run_config.max_write_workers, len(scheduled_sessions)))
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_write_workers) as executor:
+            future_to_session_converter = {
+                executor.submit(_convert_session, session_converter=session_converter): session_converter
+                for session_converter in scheduled_sessions
+            }
+            try:
+                for future in tqdm(
+                    concurrent.futures.as_completed(future_to_session_converter),
+                    total=len(future_to_session_converter),
+                    desc="Converting sessions",
+                    unit="session",
+                    disable=self.run_config.silent,
+                ):
+                    session_converter = future_to_session_converter[future]
+                    try:
+                        seconds = future.result()
+                    except Exception:  # noqa
+                        if self.run_config.fail_fast:
+                            raise
+                        self._record_session_failure(
+                            session_converter=session_converter, identifier="SessionConversionFailure"
+                        )
+                        continue
+                    conversion_schedule.record(session_converter=session_converter, seconds=seconds)
+                    self._journal_session(
+                        session_converter=session_converter,
+                        discovery_index=discovery_indices[session_converter.session_id],
+                        journal_file_path=journal_file_path,
+                        bids_directory=bids_directory,
+                    )
+            except BaseException:  # noqa
+                # Including on an interruption, so that the run can be resumed from the sessions journaled so far
+                for future in future_to_session_converter:
+                    future.cancel()
+                raise
+            finally:
+                conversion_schedule.wall_seconds += time.perf_counter() - start_time
+        conversion_schedule.save()
+
+    def _stream_sessions(self, journal_file_path: pathlib.Path, bids_directory: pathlib.Path) -> None:
+        """
+        Extract and write each session in turn, reducing it to a summary of its metadata as soon as it is written.
+
+        Since no session is held in full once written, whether the dataset is a derivative and which sessions use the
+        `ses-` entity are decided up front, from a pre-classification pass that reads only a few fields of each file.
+        """
+        unsupported_session_ids = [
+            sc.session_id
+            for sc in self._successful_session_converters
+            if sc.session_id not in self._completed_session_ids
+            and not all(isinstance(nwbfile_path, pathlib.Path) for nwbfile_path in sc.nwbfile_paths)
+        ]
+        if len(unsupported_session_ids) > 0:
+            message = (
+                "Streaming conversion only supports local NWB files, but the files of sessions "
+                f"{', '.join(unsupported_session_ids)} are streamed from URLs."
+            )
+            raise NotImplementedError(message)
+
+        file_index = (
+            get_file_index(cache_directory=self.run_config.cache_directory) if self.run_config.use_cache else None
+        )
+        if self.run_config.write_as_derivative is None:
+            self._decided_is_derivative = (
+                any(
+                    (
+                        self._session_summaries[sc.session_id].is_derived
+                        if sc.session_id in self._session_summaries
+                        else _read_is_derived(session_converter=sc, file_index=file_index)
+                    )
+                    for sc in self._successful_session_converters
+                )
+                or self._read_other_shards_are_derived()
+            )
+        if self._is_derivative:
+            self._redirect_to_derivatives()
+        self._set_use_session_labels(read_unextracted=True)
+        if file_index is not None:
+            file_index.save()
+
+        conversion_schedule = self._get_stage_schedule(stage="conversion")
+        scheduled_sessions = conversion_schedule.order(
+            session_converters=[
+                sc for sc in self._successful_session_converters if sc.session_id not in self._completed_session_ids
+            ]
+        )
+        discovery_indices = self._get_all_discovery_indices()
+        positions = {sc.session_id: position for position, sc in enumerate(self.session_converters)}
+        start_time = time.perf_counter()
+        max_workers = min(self.run_config.max_workers or os.cpu_count() or 1, max(1, len(scheduled_sessions)))
+        with _open_executor(executor=None, max_workers=max_workers, run_config=self.run_config) as session_executor:
+            try:
+                for session_converter in tqdm(
+                    self._iter_extracted_sessions(
+                        session_converters=scheduled_sessions, session_executor=session_executor, window=2 * max_workers
+                    ),
+                    total=len(scheduled_sessions),
+                    desc="Converting sessions",
+                    unit="session",
+                    disable=self.run_config.silent,
+                ):
+                    try:
+                        seconds = _convert_session(session_converter=session_converter)
+                    except Exception:  # noqa
+                        if self.run_config.fail_fast:
+                            raise
+                        self._record_session_failure(
+                            session_converter=session_converter, identifier="SessionConversionFailure"
+                        )
+                        session_converter.session_metadata = None
+                        continue
+                    conversion_schedule.record(session_converter=session_converter, seconds=seconds)
+                    self._journal_session(
+                        session_converter=session_converter,
+                        discovery_index=discovery_indices[session_converter.session_id],
+                        journal_file_path=journal_file_path,
+                        bids_directory=bids_directory,
+                    )
+                    self._summarize_session(
+                        position=positions[session_converter.session_id],
+                        discovery_index=discovery_indices[session_converter.session_id],
+                    )
+            finally:
+                conversion_schedule.wall_seconds += time.perf_counter() - start_time
+
+        if self.run_config.use_cache:
+            get_file_index(cache_directory=self.run_config.cache_directory).save()
+            self._get_stage_schedule(stage="extraction").save()
+        conversion_schedule.save()
+
+    def _iter_extracted_sessions(
+        self,
+        session_converters: list[SessionConverter],
+        session_executor: concurrent.futures.Executor | None,
+        window: int,
+    ) -> typing.Iterator[SessionConverter]:
+        """
+        Extract the metadata of each session, yielding those that succeeded in order.
+
+        When extracting in an executor, only up to `window` sessions are submitted ahead of the one being yielded,
+        so that the metadata of only that many sessions is held at once. As in `extract_metadata`, a failure only
+        skips its session unless `run_config.fail_fast` is set, in which case no further sessions are yielded.
+        """
+        if session_executor is None:
+            for session_converter in session_converters:
+                if not self._extract_session_metadata(session_converter=session_converter):
+                    return
+                if session_converter.session_id not in self._failed_session_ids:
+                    yield session_converter
+            return
+
+        remaining_session_converters = iter(session_converters)
+        submissions = collections.deque(
+            _submit(executor=session_executor, session_converter=session_converter)
+            for session_converter in itertools.islice(remaining_session_converters, window)
+        )
+        while submissions:
+            session_converter, _, future = submissions.popleft()
+            next_session_converter = next(remaining_session_converters, None)
+            if next_session_converter is not None:
+                submissions.append(_submit(executor=session_executor, session_converter=next_session_converter))
+
+            try:
+                is_loaded = self._load_extracted_metadata(session_converter=session_converter, future=future)
+            except Exception:  # noqa
+                _cancel(submissions=list(submissions))
+                notification = Notification.from_definition(
+                    identifier="MetadataExtractionFailure", traceback=traceback.format_exc()
+                )
+                self._internal_notifications.append(notification)
+                return
+            if is_loaded:
+                yield session_converter
+
+    def _summarize_session(self, position: int, discovery_index: int) -> None:
+        """Replace a written session by a summary of the metadata needed for the dataset-level files."""
+        session_converter = self.session_converters[position]
+        session_summary = ShardSession.from_session_converter(
+            session_converter=session_converter, discovery_index=discovery_index
+        )
+        if session_summary is None:
+            return
+
+        summarized_session_converter = session_summary.to_session_converter(
+            run_config=session_converter.run_config, sanitization_config=self.run_config.sanitization_config
+        )
+        summarized_session_converter.notifications = session_converter.notifications
+        self.session_converters[position] = summarized_session_converter
+        self._session_summaries[session_converter.session_id] = session_summary
+
+    def _get_all_discovery_indices(self) -> dict[str, int]:
+        """The order in which each session was discovered, among those of all shards if sharded."""
+        discovery_indices = {
+            sc.session_id: self._discovery_indices.get(sc.session_id, discovery_index)
+            for discovery_index, sc in enumerate(self.session_converters)
+        }
+        return discovery_indices
+
+    def _journal_session(
+        self,
+        session_converter: SessionConverter,
+        discovery_index: int,
+        journal_file_path: pathlib.Path,
+        bids_directory: pathlib.Path,
+    ) -> None:
+        """Record a session as completed in the journal of this run, so that an interrupted run can skip it."""
+        journal_entry = JournalEntry.from_session_converter(
+            session_converter=session_converter, discovery_index=discovery_index, bids_directory=bids_directory
+        )
+        if journal_entry is not None:
+            _append_journal_entry(file_path=journal_file_path, journal_entry=journal_entry)
+
+    def write_timings_report(self) -> None:
+        """
+        Write a report of how long each session took during each stage compared with the estimate it was scheduled by.
+        """
+        timings_report = {
+            stage: stage_schedule.model_dump(mode="json", exclude={"stage"})
+            for stage, stage_schedule in self._stage_schedules.items()
+        }
+        self.run_config.timings_json_file_path.write_text(data=json.dumps(obj=timings_report, indent=2))
+
+    def write_dataset_files(self) -> None:
+        """Write all dataset-level files, such as `participants.tsv` and `dataset_description.json`."""
+        self.write_participants_metadata()
+        self.write_sessions_metadata()
+        self.write_dataset_description()
+        self.write_bidsignore()
+
+    def write_shard_manifest(self, file_path: pathlib.Path) -> None:
+        """Write the manifest of the sessions of this shard, from which the dataset-level files are later written."""
+        if self.run_config.shard is None:
+            message = "A shard manifest can only be written for a sharded conversion."
+            raise ValueError(message)
+
+        # Summarized sessions no longer hold all the metadata that their summaries were made from
+        discovery_indices = self._get_all_discovery_indices()
+        shard_sessions = [
+            (
+                self._session_summaries[sc.session_id].model_copy(
+                    update={"discovery_index": discovery_indices[sc.session_id]}
+                )
+                if sc.session_id in self._session_summaries
+                else ShardSession.from_session_converter(
+                    session_converter=sc, discovery_index=discovery_indices[sc.session_id]
+                )
+            )
+            for sc in self._successful_session_converters
+        ]
+        shard_manifest = ShardManifest(
+            shard=self.run_config.shard,
+            is_derivative=self._is_derivative,
+            sanitization_config=self.run_config.sanitization_config,
+            sessions=[shard_session for shard_session in shard_sessions if shard_session is not None],
+        )
+        shard_manifest.save(file_path=file_path)
 
     def write_bidsignore(self) -> None:
         """Write the `.bidsignore` file if an archive target of `"dandi"` or `"ember"` is specified."""
@@ -318,13 +1139,14 @@ class DatasetConverter(BaseConverter):
 
         bidsignore_file_path = self.run_config.bids_directory / ".bidsignore"
         entry = "dandiset.yaml"
-        if bidsignore_file_path.exists():
-            existing_lines = {line.strip() for line in bidsignore_file_path.read_text().splitlines()}
-            if entry in existing_lines:
+        with hold_file_lock(file_path=self.run_config.dataset_lock_file_path):
+            existing_text = bidsignore_file_path.read_text() if bidsignore_file_path.exists() else ""
+            if entry in {line.strip() for line in existing_text.splitlines()}:
                 return
 
-        with bidsignore_file_path.open(mode="a") as file_stream:
-            file_stream.write(entry + "\n")
+            if existing_text and not existing_text.endswith("\n"):
+                existing_text += "\n"
+            write_text_atomically(file_path=bidsignore_file_path, data=f"{existing_text}{entry}\n")
 
     def write_dataset_description(self) -> None:
         """Write the `dataset_description.json` file."""
@@ -335,14 +1157,20 @@ class DatasetConverter(BaseConverter):
 
         dataset_description_dictionary = self.dataset_description.model_dump()
         dataset_description_file_path = self.run_config.bids_directory / "dataset_description.json"
-        with dataset_description_file_path.open(mode="w") as file_stream:
-            json.dump(obj=dataset_description_dictionary, fp=file_stream, indent=4)
+        with hold_file_lock(file_path=self.run_config.dataset_lock_file_path):
+            # Keep any fields written by other converters into the same dataset (or added manually)
+            dataset_description_dictionary = _merge_with_existing_json(
+                dictionary=dataset_description_dictionary, file_path=dataset_description_file_path
+            )
+            write_text_atomically(
+                file_path=dataset_description_file_path, data=json.dumps(obj=dataset_description_dictionary, indent=4)
+            )
 
     def write_participants_metadata(self) -> None:
         """Write the `participants.tsv` and `participants.json` files."""
         model_dump_per_session = [
             sc.session_metadata.participant.model_dump()
-            for sc in self.session_converters
+            for sc in self._successful_session_converters
             if sc.session_metadata is not None
         ]
 
@@ -373,7 +1201,7 @@ class DatasetConverter(BaseConverter):
 
         # Apply sanitization
         sanitizations = []
-        for converter in self.session_converters:
+        for converter in self._successful_session_converters:
             session_metadata = converter.session_metadata
             if session_metadata is None:
                 continue
@@ -426,12 +1254,11 @@ class DatasetConverter(BaseConverter):
         ]
 
         participants_tsv_file_path = self.run_config.bids_directory / "participants.tsv"
-        participants_data_frame.to_csv(
-            path_or_buf=participants_tsv_file_path, mode="w", index=False, sep="\t", columns=column_order
-        )
-        if len(self.session_converters) > 0:
+        participants_json_file_path = self.run_config.bids_directory / "participants.json"
+        participants_json = None
+        if len(self._successful_session_converters) > 0:
             is_field_in_table = {field: True for field in participants_data_frame.keys()}
-            example_participant = self.session_converters[0].session_metadata.participant  # type: ignore[union-attr]
+            example_participant = self._successful_session_converters[0].session_metadata.participant  # type: ignore[union-attr]
             participants_schema = example_participant.model_json_schema()
             participants_json = {
                 field: info["description"]
@@ -442,9 +1269,26 @@ class DatasetConverter(BaseConverter):
                 participants_json["original_participant_id"] = (
                     "The original participant identifier before sanitization."
                 )
-            participants_json_file_path = self.run_config.bids_directory / "participants.json"
-            with participants_json_file_path.open(mode="w") as file_stream:
-                json.dump(obj=participants_json, fp=file_stream, indent=4)
+
+        # Other converters into the same dataset may have written their own participants since this one started
+        with hold_file_lock(file_path=self.run_config.dataset_lock_file_path):
+            merged_participants_data_frame = _merge_with_existing_table(
+                data_frame=participants_data_frame[column_order],
+                file_path=participants_tsv_file_path,
+                id_column="participant_id",
+                required_column_order=required_column_order,
+            )
+            write_text_atomically(
+                file_path=participants_tsv_file_path,
+                data=merged_participants_data_frame.to_csv(index=False, sep="\t"),
+            )
+            if participants_json is not None:
+                participants_json = _merge_with_existing_json(
+                    dictionary=participants_json, file_path=participants_json_file_path
+                )
+                write_text_atomically(
+                    file_path=participants_json_file_path, data=json.dumps(obj=participants_json, indent=4)
+                )
 
     def write_sessions_metadata(self) -> None:
         """
@@ -455,7 +1299,7 @@ class DatasetConverter(BaseConverter):
         """
         participant_id_to_sessions = collections.defaultdict(list)
         participant_id_to_use_session_labels = {}
-        for session_converter in self.session_converters:
+        for session_converter in self._successful_session_converters:
             session_metadata = session_converter.session_metadata
             if session_metadata is None:
                 continue
@@ -467,7 +1311,7 @@ class DatasetConverter(BaseConverter):
             participant_id_to_use_session_labels[participant_id] = session_converter.use_session_labels
 
         sanitization_config = None
-        for sc in self.session_converters:
+        for sc in self._successful_session_converters:
             session_metadata = sc.session_metadata
             if session_metadata is None:
                 continue
@@ -516,10 +1360,23 @@ class DatasetConverter(BaseConverter):
                 ).astype("string")
 
             session_tsv_file_path = subject_directory / f"sub-{sanitized_participant_id}_sessions.tsv"
-            sessions_data_frame.to_csv(path_or_buf=session_tsv_file_path, mode="w", index=False, sep="\t")
             session_json_file_path = subject_directory / f"sub-{sanitized_participant_id}_sessions.json"
-            with session_json_file_path.open(mode="w") as file_stream:
-                json.dump(obj=sessions_json, fp=file_stream, indent=4)
+            with hold_file_lock(file_path=self.run_config.dataset_lock_file_path):
+                merged_sessions_data_frame = _merge_with_existing_table(
+                    data_frame=sessions_data_frame,
+                    file_path=session_tsv_file_path,
+                    id_column="session_id",
+                    required_column_order=["session_id", "original_session_id"],
+                )
+                write_text_atomically(
+                    file_path=session_tsv_file_path, data=merged_sessions_data_frame.to_csv(index=False, sep="\t")
+                )
+                merged_sessions_json = _merge_with_existing_json(
+                    dictionary=sessions_json, file_path=session_json_file_path
+                )
+                write_text_atomically(
+                    file_path=session_json_file_path, data=json.dumps(obj=merged_sessions_json, indent=4)
+                )
             for session_id in sanitized_session_ids:
                 session_directory = subject_directory / f"ses-{session_id}"
                 session_directory.mkdir(exist_ok=True)
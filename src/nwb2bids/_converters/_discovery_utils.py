@@ -0,0 +1,133 @@
+import os
+import pathlib
+import queue
+import threading
+import typing
+
+from ._datalad_utils import _content_is_retrieved, _find_retrieved_annexed_file_paths, _is_within_git_repository
+from ._path_filters import PathFilter
+
+
+def _walk_nwb_files(
+    directory: pathlib.Path, ignore_hidden: bool = True, path_filter: PathFilter | None = None
+) -> typing.Iterator[pathlib.Path]:
+    """
+    Walk a directory tree and yield the paths of all NWB files whose content is available locally.
+
+    Unlike `pathlib.Path.rglob`, directories are pruned *before* they are entered, so large hidden trees
+    (such as `.git/annex/objects` in DataLad datasets) are never descended into.
+    The cached file type information of each `os.DirEntry` is reused rather than calling `stat` again.
+
+    Parameters
+    ----------
+    directory : pathlib.Path
+        The root directory to walk.
+    ignore_hidden : bool, default: True
+        Whether to skip files and directories beneath the root whose names start with a period.
+        The `.git` directory is always skipped.
+    path_filter : PathFilter, optional
+        Include and exclude patterns matched against the POSIX path of each entry relative to the root directory.
+        Directories which the filter rules out are not entered at all.
+
+    Yields
+    ------
+    pathlib.Path
+        The path of each discovered NWB file.
+    """
+    # Availability of annexed content is resolved once per repository rather than once per file
+    root_directory = str(directory)
+    retrieved_file_paths = (
+        _find_retrieved_annexed_file_paths(directory=root_directory) if _is_within_git_repository(directory) else None
+    )
+
+    directories_to_scan = [(root_directory, "", retrieved_file_paths)]
+    while directories_to_scan:
+        current_directory, relative_directory, retrieved_file_paths = directories_to_scan.pop()
+
+        # Mirrors `pathlib.Path.rglob`, which silently skips directories that cannot be listed
+        try:
+            with os.scandir(current_directory) as scanner:
+                entries = list(scanner)
+        except PermissionError:
+            continue
+
+        # The root of a nested repository (such as a DataLad subdataset) tracks its own annexed content
+        if current_directory != root_directory and any(entry.name == ".git" for entry in entries):
+            retrieved_file_paths = _find_retrieved_annexed_file_paths(directory=current_directory)
+
+        subdirectories = []
+        for entry in entries:
+            if entry.name == ".git" or (ignore_hidden and entry.name.startswith(".")):
+                continue
+            relative_path = f"{relative_directory}/{entry.name}" if relative_directory else entry.name
+
+            # Symlinked directories are not followed, consistent with `pathlib.Path.rglob`
+            if entry.is_dir(follow_symlinks=False):
+                if path_filter is None or path_filter.includes_directory(relative_directory=relative_path):
+                    subdirectories.append((entry.path, relative_path, retrieved_file_paths))
+                continue
+
+            if not entry.name.endswith(".nwb"):
+                continue
+            if path_filter is not None and not path_filter.includes_file(relative_path=relative_path):
+                continue
+            if retrieved_file_paths is not None and os.path.normpath(entry.path) in retrieved_file_paths:
+                yield pathlib.Path(entry.path)
+                continue
+            # Files not known to be present (not annexed, or outside of an annexed repository) are checked one by one
+            if _content_is_retrieved(entry=entry):
+                yield pathlib.Path(entry.path)
+
+        # Reverse so that the stack pops subdirectories in their scanned order
+        directories_to_scan += reversed(subdirectories)
+
+
+_END_OF_STREAM = object()
+# How often a producer blocked on a full queue checks whether the stream was abandoned
+_PRODUCER_POLL_SECONDS = 0.1
+
+
+def _prefetch_in_background(
+    iterable: typing.Iterable[typing.Any], max_prefetched_items: int = 10_000
+) -> typing.Iterator[typing.Any]:
+    """
+    Consume an iterable in a background thread and yield its items in order.
+
+    This allows slow production of items (such as walking a network filesystem) to proceed while the caller is
+    still working on the items already yielded. Any exception raised by the iterable is re-raised to the caller.
+    At most `max_prefetched_items` are held ahead of the caller, and the background thread stops as soon as the
+    caller stops consuming (such as after a failure), rather than walking the rest of the tree.
+    """
+    item_queue: queue.Queue = queue.Queue(maxsize=max_prefetched_items)
+    stop_event = threading.Event()
+
+    def put(item: typing.Any) -> bool:
+        while not stop_event.is_set():
+            try:
+                item_queue.put(item, timeout=_PRODUCER_POLL_SECONDS)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce() -> None:
+        try:
+            for item in iterable:
+                if not put(item=item):
+                    return
+        except BaseException as exception:  # noqa: B036
+            put(item=exception)
+        put(item=_END_OF_STREAM)
+
+    # A daemon thread is used so that an abandoned stream never prevents the interpreter from exiting
+    producer = threading.Thread(target=produce, name="nwb2bids-discovery", daemon=True)
+    producer.start()
+
+    # Also reached when the caller closes or abandons this generator, which raises `GeneratorExit` at the `yield`
+    try:
+        while (item := item_queue.get()) is not _END_OF_STREAM:
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop_event.set()
@@ -0,0 +1,109 @@
+import os
+import pathlib
+
+import pydantic
+import typing_extensions
+
+from ._session_converter import SessionConverter
+from ._sharding import ShardSession
+from .._tools import get_file_signature
+from ..notifications import Notification
+
+
+class JournalEntry(pydantic.BaseModel):
+    """
+    A session recorded as completed in the journal of a conversion run, from which it can be skipped on resumption.
+    """
+
+    session: ShardSession = pydantic.Field(
+        description="The metadata of the session needed to write the dataset-level files."
+    )
+    output_file_paths: list[str] = pydantic.Field(
+        description="The POSIX paths, relative to the top-level BIDS directory, of the files written for the session."
+    )
+    notifications: list[Notification] = pydantic.Field(
+        description="The notifications raised for the session.", default_factory=list
+    )
+    nwbfile_signatures: list[tuple[int, int, int]] | None = pydantic.Field(
+        description=(
+            "The size, modification time, and inode of each NWB file of the session once converted, "
+            "or None if any of them is not a local file (such as a URL, or a file moved into the BIDS dataset)."
+        ),
+        default=None,
+    )
+
+    @classmethod
+    def from_session_converter(
+        cls, session_converter: SessionConverter, discovery_index: int, bids_directory: pathlib.Path
+    ) -> typing_extensions.Self | None:
+        """Record a converted session, or return None if it has no metadata from which it could be restored."""
+        session = ShardSession.from_session_converter(
+            session_converter=session_converter, discovery_index=discovery_index
+        )
+        if session is None:
+            return None
+
+        # Without the `ses-` entity a subject has a single session, so the prefix still matches only this session
+        modality_directory = session_converter._establish_modality_subdirectory()
+        file_prefix = session_converter._get_file_prefix()
+        output_file_paths = sorted(
+            file_path.relative_to(bids_directory).as_posix()
+            for file_path in modality_directory.glob(pattern=f"{file_prefix}_*")
+        )
+
+        nwbfile_signatures = [
+            get_file_signature(file_path=nwbfile_path) if isinstance(nwbfile_path, pathlib.Path) else None
+            for nwbfile_path in session_converter.nwbfile_paths
+        ]
+
+        journal_entry = cls(
+            session=session,
+            output_file_paths=output_file_paths,
+            notifications=session_converter.notifications,
+            nwbfile_signatures=None if None in nwbfile_signatures else nwbfile_signatures,
+        )
+        return journal_entry
+
+    def matches_nwbfiles(self, nwbfile_paths: list[pathlib.Path] | list[pydantic.HttpUrl]) -> bool:
+        """Whether the session still consists of the same NWB files, unchanged since they were converted."""
+        if self.session.nwbfile_paths != [str(nwbfile_path) for nwbfile_path in nwbfile_paths]:
+            return False
+        if self.nwbfile_signatures is None:
+            return True
+        return self.nwbfile_signatures == [
+            get_file_signature(file_path=pathlib.Path(nwbfile_path)) for nwbfile_path in nwbfile_paths
+        ]
+
+    def has_outputs(self, bids_directory: pathlib.Path) -> bool:
+        """Whether all files written for the session are still present, counting symbolic links even if broken."""
+        return all(os.path.lexists(bids_directory / output_file_path) for output_file_path in self.output_file_paths)
+
+
+def _append_journal_entry(file_path: pathlib.Path, journal_entry: JournalEntry) -> None:
+    """Append an entry to a journal, ensuring it reaches the disk before returning."""
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    with file_path.open(mode="a") as file_stream:
+        file_stream.write(journal_entry.model_dump_json() + "\n")
+        file_stream.flush()
+        os.fsync(file_stream.fileno())
+
+
+def _load_journal(file_path: pathlib.Path) -> dict[str, JournalEntry]:
+    """
+    Load the entries of a journal keyed by their session ID, the latest entry of a session replacing earlier ones.
+
+    A line left incomplete by a run that was killed while writing it is ignored, so that session is converted again.
+    """
+    # A run interrupted before completing any session leaves no journal behind
+    if not file_path.exists():
+        return dict()
+
+    journal_entries = dict()
+    with file_path.open(mode="r") as file_stream:
+        for line in file_stream:
+            try:
+                journal_entry = JournalEntry.model_validate_json(json_data=line)
+            except pydantic.ValidationError:
+                continue
+            journal_entries[journal_entry.session.session_id] = journal_entry
+    return journal_entries
@@ -0,0 +1,174 @@
+import functools
+import re
+
+import pydantic
+import typing_extensions
+
+_REGEX_PATTERN_PREFIX = "re:"
+_GLOB_SPECIAL_CHARACTERS = "*?["
+_REGEX_SPECIAL_CHARACTERS = ".^$*+?{}[]\\|()"
+_REGEX_QUANTIFIERS = "*+?{"
+
+
+def _translate_glob(pattern: str) -> str:
+    """
+    Translate a glob pattern over relative POSIX paths into an equivalent regular expression.
+
+    A `*` matches any characters within a single path component, `**/` matches zero or more whole directories,
+    a trailing `**` matches everything beneath a directory, `?` matches any single character other than `/`,
+    and `[...]` matches a character class (negated by a leading `!`).
+    """
+    regex_parts = ["^"]
+    index = 0
+    while index < len(pattern):
+        character = pattern[index]
+        if pattern.startswith("**/", index):
+            regex_parts.append("(?:.*/)?")
+            index += 3
+            continue
+        if pattern.startswith("**", index):
+            regex_parts.append(".*")
+            index += 2
+            continue
+
+        index += 1
+        if character == "*":
+            regex_parts.append("[^/]*")
+        elif character == "?":
+            regex_parts.append("[^/]")
+        elif character == "[" and (closing_index := pattern.find("]", index + 1)) != -1:
+            character_class = pattern[index:closing_index].replace("\\", "\\\\")
+            if character_class.startswith("!"):
+                character_class = "^" + character_class[1:]
+            regex_parts.append(f"[{character_class}]")
+            index = closing_index + 1
+        else:
+            regex_parts.append(re.escape(character))
+
+    regex_parts.append(r"\Z")
+    return "".join(regex_parts)
+
+
+def _get_glob_anchored_prefix(pattern: str) -> str:
+    """Return the literal leading part of a glob pattern, which every matching path must start with."""
+    for index, character in enumerate(pattern):
+        if character in _GLOB_SPECIAL_CHARACTERS:
+            return pattern[:index]
+    return pattern
+
+
+def _get_regex_anchored_prefix(expression: str) -> str:
+    """
+    Return the literal leading part of a regular expression anchored with `^`, which every match must start with.
+
+    This is a conservative reading of the expression: an empty string is returned whenever the prefix is unclear,
+    such as for unanchored expressions or those containing top-level alternations.
+    """
+    if not expression.startswith("^") or "|" in expression:
+        return ""
+
+    prefix_characters: list[str] = []
+    index = 1
+    while index < len(expression):
+        character = expression[index]
+        if character in _REGEX_QUANTIFIERS:
+            # The preceding literal is optional or repeated, so it is not part of the fixed prefix
+            return "".join(prefix_characters[:-1])
+        if character == "\\" and index + 1 < len(expression) and not expression[index + 1].isalnum():
+            prefix_characters.append(expression[index + 1])
+            index += 2
+            continue
+        if character in _REGEX_SPECIAL_CHARACTERS:
+            break
+
+        prefix_characters.append(character)
+        index += 1
+
+    return "".join(prefix_characters)
+
+
+class PathPattern(pydantic.BaseModel):
+    """
+    A compiled include or exclude pattern, matched against paths relative to a directory being walked.
+
+    Patterns are globs by default; patterns prefixed with `re:` are regular expressions searched for in the path.
+    """
+
+    pattern: str = pydantic.Field(description="The pattern as originally specified.")
+    regex: re.Pattern = pydantic.Field(description="The compiled regular expression equivalent to the pattern.")
+    anchored_prefix: str = pydantic.Field(
+        description="A literal prefix that every matching path must start with, or an empty string if there is none."
+    )
+
+    model_config = pydantic.ConfigDict(frozen=True)
+
+    @classmethod
+    def from_string(cls, pattern: str) -> typing_extensions.Self:
+        if pattern.startswith(_REGEX_PATTERN_PREFIX):
+            expression = pattern[len(_REGEX_PATTERN_PREFIX) :]
+            return cls(
+                pattern=pattern, regex=re.compile(expression), anchored_prefix=_get_regex_anchored_prefix(expression)
+            )
+
+        return cls(
+            pattern=pattern,
+            regex=re.compile(_translate_glob(pattern=pattern)),
+            anchored_prefix=_get_glob_anchored_prefix(pattern=pattern),
+        )
+
+    def matches(self, relative_path: str) -> bool:
+        """Whether a relative POSIX path matches this pattern."""
+        return self.regex.search(relative_path) is not None
+
+    def could_match_beneath(self, relative_directory: str) -> bool:
+        """Whether any path beneath a relative POSIX directory path could possibly match this pattern."""
+        directory_prefix = f"{relative_directory}/"
+        return directory_prefix.startswith(self.anchored_prefix) or self.anchored_prefix.startswith(directory_prefix)
+
+
+class PathFilter(pydantic.BaseModel):
+    """
+    A set of include and exclude patterns used to select NWB files during the discovery walk.
+
+    A file is selected if it matches none of the exclude patterns and, when any include patterns are specified,
+    at least one of them. A directory is never entered if it matches an exclude pattern, or if the anchored prefix
+    of every include pattern rules out all paths beneath it.
+    """
+
+    include: tuple[PathPattern, ...] = pydantic.Field(description="The patterns of paths to include.", default=())
+    exclude: tuple[PathPattern, ...] = pydantic.Field(description="The patterns of paths to exclude.", default=())
+
+    model_config = pydantic.ConfigDict(frozen=True)
+
+    def includes_file(self, relative_path: str) -> bool:
+        """Whether a file at the given relative POSIX path passes the filter."""
+        if any(pattern.matches(relative_path=relative_path) for pattern in self.exclude):
+            return False
+        if len(self.include) == 0:
+            return True
+        return any(pattern.matches(relative_path=relative_path) for pattern in self.include)
+
+    def includes_directory(self, relative_directory: str) -> bool:
+        """Whether the directory at the given relative POSIX path may contain any files that pass the filter."""
+        directory_prefix = f"{relative_directory}/"
+        if any(
+            pattern.matches(relative_path=relative_directory) or pattern.matches(relative_path=directory_prefix)
+            for pattern in self.exclude
+        ):
+            return False
+        if len(self.include) == 0:
+            return True
+        return any(pattern.could_match_beneath(relative_directory=relative_directory) for pattern in self.include)
+
+
+@functools.cache
+def _get_path_filter(include: tuple[str, ...], exclude: tuple[str, ...]) -> PathFilter | None:
+    """Compile include and exclude patterns once per unique combination, or return None if there are none."""
+    if len(include) == 0 and len(exclude) == 0:
+        return None
+
+    path_filter = PathFilter(
+        include=tuple(PathPattern.from_string(pattern=pattern) for pattern in include),
+        exclude=tuple(PathPattern.from_string(pattern=pattern) for pattern in exclude),
+    )
+    return path_filter
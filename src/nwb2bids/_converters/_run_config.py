@@ -1,12 +1,17 @@
 import datetime
 import pathlib
+import re
+import secrets
 import typing
 
 import pydantic
+import typing_extensions
 
+from ._path_filters import PathFilter, PathPattern, _get_path_filter
 from .._core._file_mode import _determine_file_mode
 from .._core._home import _get_nwb2bids_home_directory
 from .._core._validate_existing_bids import _validate_bids_directory
+from .._tools._file_lock import _DATASET_LOCK_FILE_NAME
 from ..sanitization import SanitizationConfig
 
 
@@ -20,9 +25,11 @@ def _generate_run_id() -> str:
         On each unique run of `nwb2bids`, a run ID is generated.
         Set this option to override this to any identifying string.
         This ID is used in the naming of the notification and sanitization reports saved to your cache directory.
-        The default ID uses runtime timestamp information of the form "date-%Y%m%d_time-%H%M%S."
+        The default ID uses runtime timestamp information of the form "datetime-%Y%m%d%H%M%S", followed by a short
+        random suffix so that the reports of runs started at the same time into one BIDS directory never collide.
     """
-    run_id = datetime.datetime.now().strftime("datetime-%Y%m%d%H%M%S")
+    timestamp = datetime.datetime.now().strftime("datetime-%Y%m%d%H%M%S")
+    run_id = f"{timestamp}-{secrets.token_hex(nbytes=2)}"
     return run_id
 
 
@@ -40,13 +47,105 @@ class RunConfig(pydantic.BaseModel):
         Specifies how to handle the NWB files when converting to BIDS format.
             - "move": Move the files to the BIDS directory.
             - "copy": Copy the files to the BIDS directory.
-              Copy-on-write is supported and used on systems that allow it, but requires Python 3.14 to use.
+              On Linux, copies are reflinks (copy-on-write) on filesystems that support them, and otherwise are made
+              within the kernel without polluting the page cache; elsewhere, copy-on-write requires Python 3.14.
+              Sessions are copied concurrently, as many at a time as `max_write_workers`.
             - "symlink": Create symbolic links to the files in the BIDS directory.
             - if not specified, decide between all the above based on the system,
               with preference for linking when possible.
     cache_directory : directory path
         The directory where run specific files (e.g., notifications, sanitization reports) will be stored.
         Defaults to `~/.nwb2bids`.
+    use_cache : bool, default: True
+        Whether to persist lightweight per-file information (such as session and subject IDs) and the extracted
+        session metadata in the cache directory, and reuse them on later runs to skip reopening NWB files that have
+        not changed. Cached metadata is invalidated by any change to the files or to the installed versions of
+        nwb2bids, PyNWB, or HDMF.
+    include : tuple of str, default: ()
+        Patterns of NWB file paths to include when searching directories; if specified, all other files are skipped.
+        Patterns are matched against POSIX paths relative to each given directory, such as `lab_a/sub-01/file.nwb`.
+        Patterns are globs by default (`*` within a single directory, `**/` across any number of directories);
+        prefix a pattern with `re:` to instead search for a regular expression.
+        Directories that cannot contain a match for the literal leading part of every pattern are never entered.
+        Explicitly listed NWB files are always included.
+    exclude : tuple of str, default: ()
+        Patterns of NWB file paths to exclude when searching directories, using the same syntax as `include`.
+        Directories matching any of these patterns are never entered.
+    nwb_cache_size : int or None, default: 16
+        The maximum number of NWB files kept open at once while extracting metadata.
+        Files beyond this are closed in least-recently-used order. If None, the number of open files is unbounded.
+    nwb_cache_max_memory : int or None, default: None
+        The resident memory (in bytes) of the process above which open NWB files are closed in least-recently-used
+        order while extracting metadata, always keeping the most recent one open.
+        Only enforced on systems exposing `/proc/self/statm` (such as Linux).
+    load_cached_namespaces : bool, default: True
+        Whether to load the specification namespaces cached within each NWB file when reading it through PyNWB.
+        Type maps built from these are reused across all files with identical cached namespaces.
+        Set to False when the core NWB schema is sufficient, which skips this step entirely but fails to read files
+        containing types from extensions.
+    extraction_engine : one of "pynwb" or "h5py", default: "pynwb"
+        How metadata is extracted from local NWB files.
+            - "pynwb": Read each file fully through PyNWB.
+            - "h5py": Read only the groups and attributes needed for the BIDS metadata directly through h5py,
+              which is much faster for files with many objects. Files using any layout this engine does not handle
+              (such as neurodata types from extensions) are read through PyNWB instead.
+    max_workers : int or None, default: 1
+        The number of processes in which the metadata of sessions is extracted in parallel.
+        If None, uses one process per CPU. If 1, all metadata is extracted within the current process.
+    extract_during_discovery : bool, default: True
+        Whether to start extracting the metadata of sessions while the remaining NWB files are still being
+        discovered. Sessions are then extracted in the order they are discovered, since those not discovered yet
+        cannot be scheduled. Set to False to first discover all sessions, then extract the longest ones first
+        (as estimated from their size and the times recorded on earlier runs), which finishes sooner when discovery
+        is quick compared with extraction and session sizes vary widely.
+    max_write_workers : int, default: 4
+        The number of threads in which sessions are written to the BIDS dataset concurrently.
+        Writing is dominated by small file operations, so this mostly hides the latency of network storage,
+        except when copying NWB files, which are then also copied this many at a time.
+        Dataset-level files (such as `participants.tsv`) are always written once all sessions are done.
+    copy_bandwidth_limit : int, optional
+        The total number of bytes per second at which NWB files are copied when `file_mode` is "copy", shared by all
+        sessions being written concurrently, so that a large conversion does not saturate shared storage or network.
+        Reflinks are not limited, since they copy no data. If None, copies are not limited.
+    shard : tuple of (int, int) or str, optional
+        The index and count, such as `(3, 8)` or `"3/8"`, of the shard of local sessions converted by this run.
+        Sessions are assigned to shards by a stable hash of their session ID, so independent runs of every index
+        from 0 up to the count (such as the tasks of a SLURM array) each convert a disjoint part of the dataset into
+        the same BIDS directory. Instead of the dataset-level files, each shard writes a manifest from which these are
+        written by `nwb2bids finalize` once all shards are done.
+    session_timeout : float, optional
+        The number of seconds after which the extraction of the metadata of a single session is abandoned.
+        When set, metadata is always extracted in worker processes (even if `max_workers` is 1), and any worker that
+        exceeds this timeout (such as on a read stuck on an unresponsive network mount) is killed and replaced.
+        The session is then reported as an error notification and skipped, unless `fail_fast` is set.
+        If None, sessions may take arbitrarily long.
+    fail_fast : bool, default: False
+        Whether to stop converting after the first session that fails to be read or written.
+        By default, such a failure is recorded as an error notification on its session converter, the remaining
+        sessions are still converted, and the dataset-level files only include the sessions that succeeded.
+    streaming : bool, default: False
+        Whether to write each session as soon as its metadata is extracted, then keep only a small summary of it
+        (the metadata needed for the dataset-level files), so that memory stays constant regardless of the number of
+        sessions. Since sessions are then written before all others are read, whether the dataset is a derivative
+        (unless `write_as_derivative` is set) and which sessions use the `ses-` entity are decided up front by a
+        pre-classification pass, which only reads the subject ID of each file and which of its groups are present.
+        Only supports local NWB files.
+    write_as_derivative : bool, optional
+        Whether to write the dataset as a BIDS derivative, within the `derivatives/nwb2bids` directory of the BIDS
+        directory. If None, the dataset is written as a derivative if any session contains a units table but no
+        electrodes and no raw electrical series in its acquisition (such as spike-sorted data).
+    resume : bool, default: False
+        Whether to resume an interrupted run, whose ID must then be given as `run_id`.
+        Each session written by a run is recorded in its journal (in the `.nwb2bids` directory of the BIDS dataset)
+        along with its metadata and output files. On resumption, sessions recorded there whose NWB files are unchanged
+        and whose output files are all still present are skipped, while still being included in the dataset-level
+        files; all other sessions are converted as usual.
+    io_profile : one of "local" or "network", default: "local"
+        How local HDF5 files are opened for reading.
+            - "local": Use the default options of HDF5, suited to local disks.
+            - "network": Tuned for network filesystems such as NFS and Lustre; disables HDF5 file locking (which can
+              hang on NFS) and enlarges the raw data chunk cache, page buffer, and metadata block size so that reads
+              go out in fewer, larger requests.
     sanitization_config : nwb2bids.SanitizationConfig
         Specifies the types of sanitization to apply when creating the BIDS dataset.
         Read more about the specific options from `nwb2bids.sanitization.SanitizationConfig?`.
@@ -54,7 +153,8 @@ class RunConfig(pydantic.BaseModel):
         On each unique run of nwb2bids, a run ID is generated.
         Set this option to override this to any identifying string.
         This ID is used in the naming of the files saved to your run directory.
-        The default ID uses runtime timestamp information of the form "date-%Y%m%d_time-%H%M%S."
+        The default ID uses runtime timestamp information of the form "datetime-%Y%m%d%H%M%S", followed by a short
+        random suffix so that the reports of runs started at the same time into one BIDS directory never collide.
     archive_target : one of "dandi", "ember", or None, default: None
         The archive you intend to upload the BIDS dataset to.
         When set to a non-`None` value, a `.bidsignore` file is created in the BIDS directory
@@ -75,6 +175,24 @@ class RunConfig(pydantic.BaseModel):
     additional_metadata_file_path: pydantic.FilePath | None = None
     file_mode: typing.Literal["move", "copy", "symlink"] = pydantic.Field(default_factory=_determine_file_mode)
     cache_directory: pydantic.DirectoryPath = pydantic.Field(default_factory=_get_nwb2bids_home_directory)
+    use_cache: bool = True
+    include: tuple[str, ...] = ()
+    exclude: tuple[str, ...] = ()
+    nwb_cache_size: pydantic.PositiveInt | None = 16
+    nwb_cache_max_memory: pydantic.PositiveInt | None = None
+    load_cached_namespaces: bool = True
+    extraction_engine: typing.Literal["pynwb", "h5py"] = "pynwb"
+    io_profile: typing.Literal["local", "network"] = "local"
+    max_workers: pydantic.PositiveInt | None = 1
+    extract_during_discovery: bool = True
+    max_write_workers: pydantic.PositiveInt = 4
+    copy_bandwidth_limit: pydantic.PositiveInt | None = None
+    shard: tuple[pydantic.NonNegativeInt, pydantic.PositiveInt] | None = None
+    session_timeout: pydantic.PositiveFloat | None = None
+    fail_fast: bool = False
+    streaming: bool = False
+    write_as_derivative: bool | None = None
+    resume: bool = False
     sanitization_config: SanitizationConfig = pydantic.Field(default_factory=SanitizationConfig)
     run_id: str = pydantic.Field(default_factory=_generate_run_id)
     space: typing.Literal["AllenCCFv3", "PaxinosWatson"] | None = pydantic.Field(
@@ -104,6 +222,7 @@ class RunConfig(pydantic.BaseModel):
     )
     silent: bool = False
     _nwb2bids_directory: pathlib.Path = pydantic.PrivateAttr()
+    _path_filter: PathFilter | None = pydantic.PrivateAttr()
 
     model_config = pydantic.ConfigDict(
         frozen=True,  # Make the model immutable
@@ -112,6 +231,7 @@ class RunConfig(pydantic.BaseModel):
 
     def model_post_init(self, context: typing.Any, /) -> None:
         self._nwb2bids_directory = self.bids_directory / ".nwb2bids"
+        self._path_filter = _get_path_filter(include=self.include, exclude=self.exclude)
 
     @pydantic.computed_field
     @property
@@ -134,7 +254,69 @@ class RunConfig(pydantic.BaseModel):
         notifications_file_path = self._nwb2bids_directory / f"{self.run_id}_notifications.json"
         return notifications_file_path
 
+    @pydantic.computed_field
+    @property
+    def timings_json_file_path(self) -> pathlib.Path:
+        """The file path leading to a JSON report of the estimated and actual time taken by each session."""
+        timings_file_path = self._nwb2bids_directory / f"{self.run_id}_timings.json"
+        return timings_file_path
+
+    @pydantic.computed_field
+    @property
+    def journal_file_path(self) -> pathlib.Path:
+        """The file path leading to the journal of the sessions completed by this run, from which it can be resumed."""
+        journal_file_path = self._nwb2bids_directory / f"{self.run_id}_journal.jsonl"
+        return journal_file_path
+
+    @pydantic.computed_field
+    @property
+    def dataset_lock_file_path(self) -> pathlib.Path:
+        """
+        The file path of the advisory lock held while updating the dataset-level files, such as `participants.tsv`.
+        """
+        dataset_lock_file_path = self._nwb2bids_directory / _DATASET_LOCK_FILE_NAME
+        return dataset_lock_file_path
+
     @pydantic.field_validator("bids_directory", mode="after")
     @classmethod
     def validate_bids_directory(cls, value: pathlib.Path) -> pathlib.Path:
         return _validate_bids_directory(value)
+
+    @pydantic.field_validator("shard", mode="before")
+    @classmethod
+    def parse_shard(cls, value: typing.Any) -> typing.Any:
+        if not isinstance(value, str):
+            return value
+
+        index, separator, count = value.partition("/")
+        if separator == "" or not index.strip().isdigit() or not count.strip().isdigit():
+            message = f"The shard '{value}' is not of the form INDEX/COUNT, such as '3/8'."
+            raise ValueError(message)
+        return int(index), int(count)
+
+    @pydantic.field_validator("shard", mode="after")
+    @classmethod
+    def validate_shard(cls, value: tuple[int, int] | None) -> tuple[int, int] | None:
+        if value is not None and value[0] >= value[1]:
+            message = f"The shard index ({value[0]}) must be less than the shard count ({value[1]})."
+            raise ValueError(message)
+        return value
+
+    @pydantic.field_validator("include", "exclude", mode="after")
+    @classmethod
+    def validate_path_patterns(cls, value: tuple[str, ...]) -> tuple[str, ...]:
+        for pattern in value:
+            try:
+                PathPattern.from_string(pattern=pattern)
+            except re.error as exception:
+                message = f"The regular expression of the pattern '{pattern}' is invalid: {exception}"
+                raise ValueError(message)
+        return value
+
+    @pydantic.model_validator(mode="after")
+    def validate_resume(self) -> typing_extensions.Self:
+        # A generated run ID never refers to an earlier run, so resuming it would silently convert everything again
+        if self.resume and "run_id" not in self.model_fields_set:
+            message = "Resuming an interrupted run requires its ID to be given as `run_id`."
+            raise ValueError(message)
+        return self
@@ -0,0 +1,138 @@
+import pathlib
+import time
+import typing
+
+import pydantic
+import typing_extensions
+
+from ._run_config import RunConfig
+from ._session_converter import SessionConverter
+from .._tools import SessionTimings, get_session_timings
+from .._tools._session_timings import Stage
+
+
+def _get_session_size(session_converter: SessionConverter) -> int:
+    """The total size in bytes of the local files of a session; streamed files are counted as empty."""
+    return sum(
+        nwbfile_path.stat().st_size
+        for nwbfile_path in session_converter.nwbfile_paths
+        if isinstance(nwbfile_path, pathlib.Path) and nwbfile_path.exists()
+    )
+
+
+def _run_timed(function: typing.Callable[..., typing.Any], /, **kwargs: typing.Any) -> tuple[typing.Any, float]:
+    """Call a function, returning its result along with the number of seconds it took."""
+    start_time = time.perf_counter()
+    result = function(**kwargs)
+    return result, time.perf_counter() - start_time
+
+
+class ScheduledSession(pydantic.BaseModel):
+    """
+    The estimated and actual time taken by a single session during one stage of a conversion.
+    """
+
+    session_id: str = pydantic.Field(description="The session identifier used to group NWB files.")
+    size: int = pydantic.Field(description="The total size of the files of the session in bytes.")
+    estimated_seconds: float | None = pydantic.Field(
+        description="The estimated number of seconds, or None if there were no earlier runs to estimate from."
+    )
+    actual_seconds: float | None = pydantic.Field(
+        description="The number of seconds the session actually took, or None if it did not finish.", default=None
+    )
+
+
+class StageSchedule(pydantic.BaseModel):
+    """
+    Orders the sessions of one stage of a conversion longest-first, and reports how long they actually took.
+
+    Sessions are estimated from the times recorded for them on earlier runs, or otherwise from their size; starting
+    the longest ones first keeps a single large session from running long after all others have finished.
+    """
+
+    stage: Stage = pydantic.Field(description="The stage of the conversion being scheduled.")
+    sessions: dict[str, ScheduledSession] = pydantic.Field(
+        description="The sessions of this stage keyed by their session ID, in the order they were scheduled.",
+        default_factory=dict,
+    )
+    wall_seconds: float = pydantic.Field(
+        description="The number of seconds elapsed while running this stage, across all sessions.", default=0.0
+    )
+    _session_timings: SessionTimings | None = pydantic.PrivateAttr(default=None)
+    # The average time per byte of the sessions recorded on earlier runs, computed once for all sessions of the stage
+    _seconds_per_byte: float | None = pydantic.PrivateAttr(default=None)
+
+    @classmethod
+    def from_run_config(cls, stage: Stage, run_config: RunConfig) -> typing_extensions.Self:
+        """Schedule a stage using the timings of earlier runs stored in the cache directory, if it is used."""
+        stage_schedule = cls(stage=stage)
+        if run_config.use_cache:
+            stage_schedule._session_timings = get_session_timings(cache_directory=run_config.cache_directory)
+            stage_schedule._seconds_per_byte = stage_schedule._session_timings.get_seconds_per_byte(stage=stage)
+        return stage_schedule
+
+    @pydantic.computed_field
+    @property
+    def estimated_seconds(self) -> float | None:
+        """The total estimated time of all sessions, or None if any of them could not be estimated."""
+        estimates = [scheduled_session.estimated_seconds for scheduled_session in self.sessions.values()]
+        if any(estimate is None for estimate in estimates):
+            return None
+        return sum(typing.cast(list[float], estimates))
+
+    @pydantic.computed_field
+    @property
+    def actual_seconds(self) -> float:
+        """The total time actually taken by all sessions that finished."""
+        return sum(scheduled_session.actual_seconds or 0.0 for scheduled_session in self.sessions.values())
+
+    def _schedule_session(self, session_converter: SessionConverter) -> ScheduledSession:
+        size = _get_session_size(session_converter=session_converter)
+        estimated_seconds = None
+        if self._session_timings is not None:
+            estimated_seconds = self._session_timings.estimate(
+                key=SessionTimings.get_key(nwbfile_paths=session_converter.nwbfile_paths),
+                size=size,
+                stage=self.stage,
+                seconds_per_byte=self._seconds_per_byte,
+            )
+
+        scheduled_session = ScheduledSession(
+            session_id=session_converter.session_id, size=size, estimated_seconds=estimated_seconds
+        )
+        self.sessions[session_converter.session_id] = scheduled_session
+        return scheduled_session
+
+    def order(self, session_converters: list[SessionConverter]) -> list[SessionConverter]:
+        """Estimate each session and return them longest-first, keeping their original order among ties."""
+        scheduled_sessions = [
+            self._schedule_session(session_converter=session_converter) for session_converter in session_converters
+        ]
+
+        # Sizes break ties, and order all sessions when no earlier runs have been recorded
+        def _get_sort_key(index: int) -> tuple[float, int]:
+            scheduled_session = scheduled_sessions[index]
+            return scheduled_session.estimated_seconds or 0.0, scheduled_session.size
+
+        indices = sorted(range(len(session_converters)), key=_get_sort_key, reverse=True)
+        return [session_converters[index] for index in indices]
+
+    def record(self, session_converter: SessionConverter, seconds: float) -> None:
+        """Record the time actually taken by a session, so that later runs can estimate it."""
+        scheduled_session = self.sessions.get(session_converter.session_id, None)
+        if scheduled_session is None:
+            scheduled_session = self._schedule_session(session_converter=session_converter)
+        scheduled_session.actual_seconds = seconds
+
+        if self._session_timings is not None:
+            self._session_timings.record(
+                key=SessionTimings.get_key(nwbfile_paths=session_converter.nwbfile_paths),
+                size=scheduled_session.size,
+                stage=self.stage,
+                seconds=seconds,
+            )
+
+    def save(self) -> None:
+        """Persist the times recorded during this stage for use on later runs."""
+        if self._session_timings is not None:
+            self._session_timings.save()
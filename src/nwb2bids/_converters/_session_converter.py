@@ -2,7 +2,6 @@ import collections
 import os
 import pathlib
 import shutil
-import sys
 import typing
 import warnings
 
@@ -10,15 +9,136 @@ import pydantic
 import typing_extensions
 from tqdm import tqdm
 
-from ._datalad_utils import _content_is_retrieved
+from ._discovery_utils import _prefetch_in_background, _walk_nwb_files
+from ._path_filters import PathFilter
 from ._run_config import RunConfig
 from .._converters._base_converter import BaseConverter
-from .._tools import cache_read_nwb
+from .._tools import (
+    FileIndex,
+    FileIndexEntry,
+    IoProfile,
+    cache_read_nwb,
+    copy_file,
+    get_bandwidth_limiter,
+    get_file_index,
+    probe_nwb_identifiers,
+    read_nwbfile,
+)
 from ..bids_models import BidsSessionMetadata
+from ..bids_models._bids_session_metadata import _extract_metadata_dictionary
 from ..bids_models._coordinate_system import write_coordsystem_json
 from ..notifications import Notification
 
 
+def _read_identifiers(nwbfile_path: pathlib.Path, io_profile: IoProfile = "local") -> tuple[str | None, str | None]:
+    """
+    Read the session and subject IDs of an NWB file for the purpose of grouping files into sessions.
+
+    Uses the lightweight HDF5 probe when possible and only falls back to a full PyNWB read when it is ambiguous.
+    """
+    identifiers = probe_nwb_identifiers(file_path=nwbfile_path, io_profile=io_profile)
+    if identifiers is not None:
+        return identifiers
+
+    # Not read through the shared cache, since discovery may run in a background thread and evicting from the cache
+    # there would close files that are still in use by metadata extraction
+    nwbfile = read_nwbfile(file_path=nwbfile_path.resolve(), io_profile=io_profile)
+    subject_id = nwbfile.subject.subject_id if nwbfile.subject is not None else None
+    session_id = nwbfile.session_id
+    nwbfile.get_read_io().close()
+    return session_id, subject_id
+
+
+def _read_indexed_file_information(
+    nwbfile_path: pathlib.Path, file_index: FileIndex | None, io_profile: IoProfile = "local"
+) -> FileIndexEntry | None:
+    """
+    Retrieve the file information from the persistent file index, only opening the file when it has changed.
+
+    Returns None when no file index is used, in which case only the identifiers are read directly from the file.
+    """
+    if file_index is None:
+        return None
+
+    entry = file_index.get(file_path=nwbfile_path)
+    if entry is not None:
+        return entry
+
+    session_id, subject_id = _read_identifiers(nwbfile_path=nwbfile_path, io_profile=io_profile)
+    entry = file_index.update(file_path=nwbfile_path, session_id=session_id, subject_id=subject_id)
+    return entry
+
+
+def _iter_nwbfile_paths(
+    nwb_paths: list[pathlib.Path], ignore_hidden: bool, path_filter: PathFilter | None
+) -> typing.Iterator[pathlib.Path]:
+    """Yield the given NWB file paths, along with all NWB files discovered beneath the given directories."""
+    for nwb_path in nwb_paths:
+        if nwb_path.is_file():
+            yield nwb_path
+        elif nwb_path.is_dir():
+            # Hidden folders (such as .git, which contains .git/annex and might include NWB extensions,
+            # DS_Store, etc.) are pruned during the walk, as are DataLad files not retrieved from the annex
+            yield from _walk_nwb_files(directory=nwb_path, ignore_hidden=ignore_hidden, path_filter=path_filter)
+
+
+def _iter_session_information(
+    nwb_paths: list[pathlib.Path],
+    file_index: FileIndex | None,
+    ignore_hidden: bool,
+    path_filter: PathFilter | None,
+    io_profile: IoProfile = "local",
+) -> typing.Iterator[tuple[pathlib.Path, str | None, typing.Literal["ecephys", "icephys"] | None]]:
+    """Yield the session ID and any previously detected modality of each NWB file as soon as it is discovered."""
+    nwbfile_paths = _iter_nwbfile_paths(nwb_paths=nwb_paths, ignore_hidden=ignore_hidden, path_filter=path_filter)
+    for nwbfile_path in nwbfile_paths:
+        entry = _read_indexed_file_information(nwbfile_path=nwbfile_path, file_index=file_index, io_profile=io_profile)
+        if entry is None:
+            session_id, _ = _read_identifiers(nwbfile_path=nwbfile_path, io_profile=io_profile)
+            yield nwbfile_path, session_id, None
+            continue
+
+        yield nwbfile_path, entry.session_id, entry.modality
+
+
+def _configure_nwb_file_cache(run_config: RunConfig) -> None:
+    """
+    Bound the cache of NWB files opened for reading as configured for a run.
+
+    Done once per run, and once per worker process of its executor, rather than for every session; reconfiguring
+    the shared cache while other threads read from it would otherwise evict the files they are still using.
+    """
+    cache_read_nwb.configure(
+        maxsize=run_config.nwb_cache_size,
+        max_memory=run_config.nwb_cache_max_memory,
+        load_cached_namespaces=run_config.load_cached_namespaces,
+    )
+
+
+def _extract_metadata_dictionary_in_worker(
+    nwbfile_paths: list[pathlib.Path] | list[pydantic.HttpUrl], run_config: RunConfig
+) -> dict[str, typing.Any]:
+    """
+    Extract the metadata of a session within an executor worker, which only receives its paths and configuration.
+
+    The files are closed afterwards, since a worker may extract any number of other sessions but never this one again.
+    """
+    metadata_dictionary = _extract_metadata_dictionary(nwbfile_paths=nwbfile_paths, run_config=run_config)
+    for nwbfile_path in nwbfile_paths:
+        if isinstance(nwbfile_path, pathlib.Path):
+            cache_read_nwb.discard(file_path=nwbfile_path)
+    return metadata_dictionary
+
+
+def _get_unique_modality(
+    modalities: set[typing.Literal["ecephys", "icephys"] | None],
+) -> typing.Literal["ecephys", "icephys"] | None:
+    """Return the single modality shared by all files, or None if it is unknown for any file or they disagree."""
+    if len(modalities) != 1:
+        return None
+    return next(iter(modalities))
+
+
 class SessionConverter(BaseConverter):
     """
     Initialize a converter of NWB files to BIDS format.
@@ -68,41 +188,39 @@ class SessionConverter(BaseConverter):
         run_config : RunConfig, optional
             The configuration for this conversion run.
         ignore_hidden : bool, default: True
-            Whether to ignore NWB files located under directories (those starting with a period).
+            Whether to ignore NWB files located under hidden directories (those starting with a period)
+            beneath each of the given directories.
 
         Returns
         -------
         A list of SessionConverter instances, one per unique session ID.
         """
-        all_nwbfile_paths = []
-        for nwb_path in nwb_paths:
-            if nwb_path.is_file():
-                all_nwbfile_paths.append(nwb_path)
-            elif nwb_path.is_dir():
-                all_nwbfile_paths += [
-                    path
-                    for path in nwb_path.rglob(pattern="*.nwb")
-                    # Ignore DataLad files not retrieved from the annex
-                    if ".git" not in path.parts and _content_is_retrieved(file_path=path)
-                ]
-
-        nwbfile_paths_to_convert = all_nwbfile_paths
-        if ignore_hidden:
-            # Ignore contents in hidden folders
-            # Such as .git since contains .git/annex which might include NWB extensions, DS_Store, etc.
-            nwbfile_paths_to_convert = [
-                path for path in all_nwbfile_paths if not any(part.startswith(".") for part in path.parts)
-            ]
+        _configure_nwb_file_cache(run_config=run_config)
+        file_index = get_file_index(cache_directory=run_config.cache_directory) if run_config.use_cache else None
 
         unique_session_id_to_nwbfile_paths = collections.defaultdict(list)
-        for nwbfile_path in nwbfile_paths_to_convert:
-            unique_session_id_to_nwbfile_paths[cache_read_nwb(nwbfile_path).session_id].append(nwbfile_path)
+        unique_session_id_to_modalities = collections.defaultdict(set)
+        session_information = _iter_session_information(
+            nwb_paths=nwb_paths,
+            file_index=file_index,
+            ignore_hidden=ignore_hidden,
+            path_filter=run_config._path_filter,
+            io_profile=run_config.io_profile,
+        )
+        for nwbfile_path, session_id, modality in session_information:
+            unique_session_id_to_nwbfile_paths[session_id].append(nwbfile_path)
+            unique_session_id_to_modalities[session_id].add(modality)
+
+        if file_index is not None:
+            file_index.save()
 
         session_converters = [
             cls(
                 session_id=session_id or "0",  # Always include `ses-` entity, even for single-session subjects
                 nwbfile_paths=nwbfile_paths,
                 run_config=run_config,
+                # Only reuse a previously detected modality if all files of the session agree on it
+                modality=_get_unique_modality(modalities=unique_session_id_to_modalities[session_id]),
             )
             for session_id, nwbfile_paths in tqdm(
                 unique_session_id_to_nwbfile_paths.items(),
@@ -113,15 +231,94 @@ class SessionConverter(BaseConverter):
         ]
         return session_converters
 
+    @classmethod
+    @pydantic.validate_call
+    def iter_from_nwb_paths(
+        cls,
+        nwb_paths: list[pydantic.FilePath | pydantic.DirectoryPath] = pydantic.Field(min_length=1),
+        run_config: RunConfig = pydantic.Field(default_factory=lambda: RunConfig()),
+        ignore_hidden: bool = True,
+    ) -> typing.Iterator[typing_extensions.Self]:
+        """
+        Lazily initialize session converters while the NWB files are still being discovered.
+
+        Each session converter is yielded as soon as the first NWB file of its session is found, so that work such as
+        metadata extraction can begin before the whole tree has been walked. Discovery itself proceeds in a background
+        thread in the meantime.
+
+        If another NWB file of an already yielded session is found later on, it is appended to the `nwbfile_paths`
+        of that same session converter and any metadata already extracted for it is discarded. Once the generator is
+        exhausted, the grouping is therefore identical to that of `from_nwb_paths`, and only those sessions whose
+        `session_metadata` is None need their metadata (re-)extracted.
+
+        Parameters
+        ----------
+        nwb_paths : iterable of file and directory paths
+            An iterable of NWB file paths and directories containing NWB files.
+        run_config : RunConfig, optional
+            The configuration for this conversion run.
+        ignore_hidden : bool, default: True
+            Whether to ignore NWB files located under hidden directories (those starting with a period)
+            beneath each of the given directories.
+
+        Yields
+        ------
+        SessionConverter
+            One instance per unique session ID, in order of discovery.
+        """
+        _configure_nwb_file_cache(run_config=run_config)
+        file_index = get_file_index(cache_directory=run_config.cache_directory) if run_config.use_cache else None
+        session_information_stream = _prefetch_in_background(
+            iterable=_iter_session_information(
+                nwb_paths=nwb_paths,
+                file_index=file_index,
+                ignore_hidden=ignore_hidden,
+                path_filter=run_config._path_filter,
+                io_profile=run_config.io_profile,
+            )
+        )
+
+        session_id_to_session_converter: dict[str | None, typing_extensions.Self] = dict()
+        session_id_to_modalities = collections.defaultdict(set)
+        for nwbfile_path, session_id, modality in session_information_stream:
+            session_id_to_modalities[session_id].add(modality)
+            unique_modality = _get_unique_modality(modalities=session_id_to_modalities[session_id])
+
+            session_converter = session_id_to_session_converter.get(session_id, None)
+            if session_converter is None:
+                session_converter = cls(
+                    session_id=session_id or "0",  # Always include `ses-` entity, even for single-session subjects
+                    nwbfile_paths=[nwbfile_path],
+                    run_config=run_config,
+                    modality=unique_modality,
+                )
+                session_id_to_session_converter[session_id] = session_converter
+                yield session_converter
+                continue
+
+            # A late file joined a session that was already yielded, so any metadata extracted so far is incomplete
+            session_converter.nwbfile_paths.append(nwbfile_path)
+            session_converter.session_metadata = None
+            session_converter.notifications = []
+            session_converter.modality = unique_modality
+
+        if file_index is not None:
+            file_index.save()
+
     def extract_metadata(self) -> None:
         if self.session_metadata is not None:
             return
 
+        metadata_dictionary = _extract_metadata_dictionary(nwbfile_paths=self.nwbfile_paths, run_config=self.run_config)
+        self._load_metadata_dictionary(metadata_dictionary=metadata_dictionary)
+
+    def _load_metadata_dictionary(self, metadata_dictionary: dict[str, typing.Any]) -> None:
+        """Set the session metadata and modality from a dictionary extracted in this or another process."""
         self.run_config.bids_directory.mkdir(exist_ok=True)
         self.run_config._nwb2bids_directory.mkdir(exist_ok=True)
 
-        self.session_metadata = BidsSessionMetadata.from_nwbfile_paths(
-            nwbfile_paths=self.nwbfile_paths, run_config=self.run_config
+        self.session_metadata = BidsSessionMetadata._from_metadata_dictionary(
+            metadata_dictionary=metadata_dictionary, nwbfile_paths=self.nwbfile_paths, run_config=self.run_config
         )
         self.notifications += self.session_metadata.notifications
 
@@ -147,6 +344,37 @@ class SessionConverter(BaseConverter):
             self.modality = "ecephys"
         else:
             self.modality = next(iter(detected_modalities))
+            self._index_modality()
+
+    def close(self) -> None:
+        """
+        Close the NWB files of this session that are still held open from metadata extraction, and release its
+        extracted metadata (which holds its largest references, such as its events and electrodes).
+
+        Its notifications remain available, and the metadata is extracted again if needed (from the metadata cache,
+        if it is used).
+        """
+        self._close_nwbfiles()
+        self.session_metadata = None
+
+    def _close_nwbfiles(self) -> None:
+        """Close the NWB files of this session that are still held open from metadata extraction."""
+        for nwbfile_path in self.nwbfile_paths:
+            # Streamed files are already closed as soon as their metadata is extracted
+            if not isinstance(nwbfile_path, pathlib.Path):
+                continue
+            cache_read_nwb.discard(file_path=nwbfile_path)
+
+    def _index_modality(self) -> None:
+        """Record the detected modality in the persistent file index so that later runs can skip its detection."""
+        if not self.run_config.use_cache:
+            return
+
+        file_index = get_file_index(cache_directory=self.run_config.cache_directory)
+        for nwbfile_path in self.nwbfile_paths:
+            if not isinstance(nwbfile_path, pathlib.Path):
+                continue
+            file_index.update(file_path=nwbfile_path, modality=self.modality)
 
     def _get_file_prefix(self) -> str:
         """Return the BIDS file prefix, including or excluding the `ses-` entity based on `use_session_labels`."""
@@ -196,14 +424,23 @@ class SessionConverter(BaseConverter):
                     file_stream.write(str(nwbfile_path))
                 continue
 
-            if self.run_config.file_mode == "copy" and sys.version_info >= (3, 14):
-                # Uses copy-on-write when available
-                nwbfile_path.copy(target=session_file_path, follow_symlinks=True)  # type: ignore[attr-defined]
-            elif self.run_config.file_mode == "copy":
-                shutil.copy(src=nwbfile_path, dst=session_file_path)
+            if self.run_config.file_mode == "copy":
+                # Copies of all sessions being written concurrently share the bandwidth limit
+                copy_bandwidth_limit = self.run_config.copy_bandwidth_limit
+                copy_file(
+                    source_file_path=nwbfile_path,
+                    target_file_path=session_file_path,
+                    bandwidth_limiter=(
+                        get_bandwidth_limiter(bytes_per_second=copy_bandwidth_limit)
+                        if copy_bandwidth_limit is not None
+                        else None
+                    ),
+                )
             elif self.run_config.file_mode == "move":
                 shutil.move(src=nwbfile_path, dst=session_file_path)
             elif self.run_config.file_mode == "symlink":
+                # Such as one left behind by an interrupted run, which the other modes also replace
+                session_file_path.unlink(missing_ok=True)
                 relative_target = os.path.relpath(nwbfile_path.resolve(), session_file_path.parent.resolve())
                 session_file_path.symlink_to(target=relative_target)
 
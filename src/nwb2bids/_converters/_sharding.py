@@ -0,0 +1,212 @@
+import hashlib
+import os
+import pathlib
+import typing
+
+import pydantic
+import typing_extensions
+
+from ._run_config import RunConfig
+from ._session_converter import SessionConverter, _read_identifiers, _read_indexed_file_information
+from .._tools import FileIndex
+from ..bids_models import BidsSessionMetadata, GeneralMetadata, Participant
+from ..sanitization import Sanitization, SanitizationConfig
+
+_SHARD_MANIFESTS_DIRECTORY_NAME = "shards"
+
+
+def _is_in_shard(session_id: str, shard: tuple[int, int]) -> bool:
+    """Whether a session belongs to a shard, by a hash of its ID that is stable across processes and machines."""
+    shard_index, shard_count = shard
+    digest = hashlib.sha256(session_id.encode()).digest()
+    return int.from_bytes(digest[:8], byteorder="big") % shard_count == shard_index
+
+
+def _get_shard_manifest_file_path(nwb2bids_directory: pathlib.Path, shard: tuple[int, int]) -> pathlib.Path:
+    shard_index, shard_count = shard
+    return nwb2bids_directory / _SHARD_MANIFESTS_DIRECTORY_NAME / f"shard-{shard_index}-of-{shard_count}.json"
+
+
+def _read_participant_id(
+    session_converter: SessionConverter, file_index: FileIndex | None, sanitization_config: SanitizationConfig
+) -> str | None:
+    """
+    Read the sanitized participant ID of a session converted by another shard, without extracting its metadata.
+
+    Only the first file is read, since all files of a session share a subject.
+    """
+    nwbfile_path = typing.cast(pathlib.Path, session_converter.nwbfile_paths[0])
+    io_profile = session_converter.run_config.io_profile
+    entry = _read_indexed_file_information(nwbfile_path=nwbfile_path, file_index=file_index, io_profile=io_profile)
+    if entry is not None:
+        participant_id = entry.subject_id
+    else:
+        _, participant_id = _read_identifiers(nwbfile_path=nwbfile_path, io_profile=io_profile)
+
+    if participant_id is None or sanitization_config.sub_labels is False:
+        return participant_id
+    return Sanitization._sanitize_label(label=participant_id)
+
+
+def _is_derived_session(session_metadata: BidsSessionMetadata | None) -> bool:
+    """
+    Whether a session makes its whole dataset a BIDS derivative.
+
+    This is the case when it contains a units table but no electrodes table and no raw electrical series in its
+    acquisition, indicating that the data is derived (such as spike-sorted) rather than raw.
+    """
+    return (
+        session_metadata is not None
+        and not session_metadata.has_electrical_series_in_acquisition
+        and session_metadata.electrode_table is None
+        and session_metadata.has_units_table
+    )
+
+
+class ShardSession(pydantic.BaseModel):
+    """
+    The information about a converted session that is needed to write the dataset-level files of a BIDS dataset.
+    """
+
+    session_id: str = pydantic.Field(description="The session identifier used to group NWB files.")
+    discovery_index: int = pydantic.Field(
+        description="The position of this session among all those discovered, which is the same for every shard."
+    )
+    nwbfile_paths: list[str] = pydantic.Field(description="The file paths or URLs of the NWB files of this session.")
+    modality: typing.Literal["ecephys", "icephys"] | None = pydantic.Field(
+        description="The modality of this session.", default=None
+    )
+    use_session_labels: bool = pydantic.Field(description="Whether this session was written with the `ses-` entity.")
+    participant: dict[str, typing.Any] = pydantic.Field(description="The dumped participant metadata.")
+    original_session_id: str = pydantic.Field(description="The session ID before sanitization.")
+    original_participant_id: str = pydantic.Field(description="The participant ID before sanitization.")
+    has_units_table: bool = False
+    has_electrical_series_in_acquisition: bool = False
+    is_derived: bool = pydantic.Field(
+        description="Whether this session makes its whole dataset a derivative, which its electrodes also decide.",
+        default=False,
+    )
+
+    @classmethod
+    def from_session_converter(
+        cls, session_converter: SessionConverter, discovery_index: int
+    ) -> typing_extensions.Self | None:
+        """Record a converted session, or return None if it has no metadata to contribute to the dataset files."""
+        session_metadata = session_converter.session_metadata
+        if session_metadata is None or session_metadata.sanitization is None:
+            return None
+
+        shard_session = cls(
+            session_id=session_converter.session_id,
+            discovery_index=discovery_index,
+            nwbfile_paths=[str(nwbfile_path) for nwbfile_path in session_converter.nwbfile_paths],
+            modality=session_converter.modality,
+            use_session_labels=session_converter.use_session_labels,
+            participant=session_metadata.participant.model_dump(mode="json"),
+            original_session_id=session_metadata.sanitization.original_session_id,
+            original_participant_id=session_metadata.sanitization.original_participant_id,
+            has_units_table=session_metadata.has_units_table,
+            has_electrical_series_in_acquisition=session_metadata.has_electrical_series_in_acquisition,
+            is_derived=_is_derived_session(session_metadata=session_metadata),
+        )
+        return shard_session
+
+    def to_session_converter(self, run_config: RunConfig, sanitization_config: SanitizationConfig) -> SessionConverter:
+        """Restore a session converter holding just enough metadata to write the dataset-level files."""
+        sanitization = Sanitization(
+            sanitization_config=sanitization_config,
+            sanitization_file_path=run_config.sanitization_file_path,
+            original_session_id=self.original_session_id,
+            original_participant_id=self.original_participant_id,
+        )
+        session_metadata = BidsSessionMetadata(
+            session_id=self.original_session_id,
+            participant=Participant.model_validate(self.participant),
+            general_metadata=GeneralMetadata(),
+            has_units_table=self.has_units_table,
+            has_electrical_series_in_acquisition=self.has_electrical_series_in_acquisition,
+            run_config=run_config,
+            sanitization=sanitization,
+        )
+
+        # The NWB files are not needed to write the dataset-level files, and may even have been moved
+        session_converter = SessionConverter.model_construct(
+            run_config=run_config,
+            session_id=self.session_id,
+            nwbfile_paths=[pathlib.Path(nwbfile_path) for nwbfile_path in self.nwbfile_paths],
+            session_metadata=session_metadata,
+            notifications=[],
+            modality=self.modality,
+            use_session_labels=self.use_session_labels,
+        )
+        return session_converter
+
+
+class ShardManifest(pydantic.BaseModel):
+    """
+    The partial dataset-level metadata left behind by a single shard of a sharded conversion.
+    """
+
+    shard: tuple[pydantic.NonNegativeInt, pydantic.PositiveInt] = pydantic.Field(
+        description="The index and count of the shard."
+    )
+    is_derivative: bool = pydantic.Field(description="Whether the sessions of this shard were written as a derivative.")
+    sanitization_config: SanitizationConfig = pydantic.Field(description="The sanitization applied by this shard.")
+    sessions: list[ShardSession] = pydantic.Field(description="The sessions converted by this shard.")
+
+    def save(self, file_path: pathlib.Path) -> None:
+        """Write the manifest, replacing any left by a previous run of the same shard."""
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Write to a temporary file first so that finalizing never reads a partially written manifest
+        temporary_file_path = file_path.with_suffix(f".{os.getpid()}.tmp")
+        temporary_file_path.write_text(data=self.model_dump_json(indent=2))
+        os.replace(src=temporary_file_path, dst=file_path)
+
+
+def _load_shard_manifests(nwb2bids_directory: pathlib.Path) -> list[ShardManifest]:
+    """Load the manifests left by all shards of a sharded conversion, ensuring that every shard has finished."""
+    shard_manifests_directory = nwb2bids_directory / _SHARD_MANIFESTS_DIRECTORY_NAME
+    shard_manifests = [
+        ShardManifest.model_validate_json(json_data=file_path.read_text())
+        for file_path in sorted(shard_manifests_directory.glob(pattern="shard-*-of-*.json"))
+    ]
+    if len(shard_manifests) == 0:
+        message = f"No shard manifests were found in '{shard_manifests_directory}'."
+        raise ValueError(message)
+
+    shard_counts = {shard_manifest.shard[1] for shard_manifest in shard_manifests}
+    if len(shard_counts) > 1:
+        message = (
+            f"The shard manifests in '{shard_manifests_directory}' come from conversions with different shard counts "
+            f"({', '.join(str(shard_count) for shard_count in sorted(shard_counts))}); "
+            "please remove those of previous conversions."
+        )
+        raise ValueError(message)
+
+    shard_count = next(iter(shard_counts))
+    missing_shard_indices = sorted(
+        set(range(shard_count)) - {shard_manifest.shard[0] for shard_manifest in shard_manifests}
+    )
+    if len(missing_shard_indices) > 0:
+        message = (
+            f"Not all shards have finished converting; the manifests of shards "
+            f"{', '.join(str(shard_index) for shard_index in missing_shard_indices)} (of {shard_count}) are missing."
+        )
+        raise ValueError(message)
+
+    sanitization_configs = {shard_manifest.sanitization_config.model_dump_json() for shard_manifest in shard_manifests}
+    if len(sanitization_configs) > 1:
+        message = "The shards were converted with different sanitization options."
+        raise ValueError(message)
+
+    # Shards without any sessions did not write anything, so they cannot conflict
+    derivative_flags = {shard_manifest.is_derivative for shard_manifest in shard_manifests if shard_manifest.sessions}
+    if len(derivative_flags) > 1:
+        message = (
+            "Some shards contain derived sessions (with units but no electrodes or raw electrical series) and were "
+            "written as a derivative dataset, while others were not. Please convert this dataset without sharding."
+        )
+        raise ValueError(message)
+
+    return shard_manifests
@@ -0,0 +1,57 @@
+import pathlib
+
+from ._session_converter import SessionConverter
+from .._tools import FileIndex, IoProfile, probe_nwb_derivative_indicators, read_nwbfile
+from ..bids_models._bids_session_metadata import _has_electrical_series_in_acquisition, _has_units_table
+
+
+def _read_derivative_indicators(nwbfile_path: pathlib.Path, io_profile: IoProfile) -> tuple[bool, bool, bool]:
+    """
+    Read whether an NWB file has a units table, any electrodes, and an electrical series in its acquisition.
+
+    Uses the lightweight HDF5 probe when possible and only falls back to a full PyNWB read when it is ambiguous.
+    """
+    indicators = probe_nwb_derivative_indicators(file_path=nwbfile_path, io_profile=io_profile)
+    if indicators is not None:
+        return indicators
+
+    nwbfile = read_nwbfile(file_path=nwbfile_path.resolve(), io_profile=io_profile)
+    indicators = (
+        _has_units_table(nwbfiles=[nwbfile]),
+        nwbfile.electrodes is not None or any(nwbfile.icephys_electrodes),
+        _has_electrical_series_in_acquisition(nwbfiles=[nwbfile]),
+    )
+    nwbfile.get_read_io().close()
+    return indicators
+
+
+def _read_is_derived(session_converter: SessionConverter, file_index: FileIndex | None) -> bool:
+    """
+    Read whether a session makes its whole dataset a BIDS derivative, without extracting its metadata.
+
+    Follows the same rule as for extracted sessions: a units table, but no electrodes and no raw electrical series.
+    """
+    has_units_table = has_electrodes = has_electrical_series_in_acquisition = False
+    for nwbfile_path in session_converter.nwbfile_paths:
+        if not isinstance(nwbfile_path, pathlib.Path):
+            message = (
+                "Whether a streamed session is derived cannot be read without extracting its metadata; "
+                "please set `write_as_derivative` explicitly."
+            )
+            raise ValueError(message)
+
+        entry = file_index.get(file_path=nwbfile_path) if file_index is not None else None
+        if entry is not None and entry.derivative_indicators is not None:
+            indicators = entry.derivative_indicators
+        else:
+            indicators = _read_derivative_indicators(
+                nwbfile_path=nwbfile_path, io_profile=session_converter.run_config.io_profile
+            )
+            if file_index is not None:
+                file_index.update(file_path=nwbfile_path, derivative_indicators=indicators)
+
+        has_units_table |= indicators[0]
+        has_electrodes |= indicators[1]
+        has_electrical_series_in_acquisition |= indicators[2]
+
+    return has_units_table and not has_electrodes and not has_electrical_series_in_acquisition
@@ -0,0 +1,196 @@
+import concurrent.futures
+import multiprocessing
+import multiprocessing.connection
+import os
+import threading
+import time
+import traceback
+import typing
+
+# Spawning a worker and importing nwb2bids within it can take a while on a busy machine or slow filesystem, but a worker
+# that has not started by then is stuck
+_STARTUP_TIMEOUT_SECONDS = 300.0
+
+
+class SessionTimeoutError(TimeoutError):
+    """Raised when a call in a watched worker process takes longer than its timeout, after the process is killed."""
+
+    def __init__(self, message: str, elapsed_seconds: float) -> None:
+        super().__init__(message)
+        self.elapsed_seconds = elapsed_seconds
+
+
+class WorkerProcessError(RuntimeError):
+    """Raised when a watched worker process fails to start, or exits without reporting the result of a call."""
+
+
+class _RemoteTraceback(Exception):
+    """Carries the formatted traceback of an exception raised within a worker process."""
+
+    def __init__(self, formatted_traceback: str) -> None:
+        self.formatted_traceback = formatted_traceback
+
+    def __str__(self) -> str:
+        return self.formatted_traceback
+
+
+def _serve(
+    connection: multiprocessing.connection.Connection,
+    initializer: typing.Callable[..., typing.Any] | None,
+    initargs: tuple[typing.Any, ...],
+) -> None:
+    """Run each call received through a connection until told to stop, sending back its result or exception."""
+    if initializer is not None:
+        initializer(*initargs)
+
+    # Spawned workers only become ready once this module (and so nwb2bids) has been imported
+    connection.send(None)
+    while (call := connection.recv()) is not None:
+        function, args, kwargs = call
+        try:
+            response = (True, function(*args, **kwargs), None)
+        except Exception as exception:  # noqa
+            response = (False, exception, traceback.format_exc())
+
+        try:
+            connection.send(response)
+        except Exception:  # noqa
+            # The result or exception could not be pickled; report it as a plain error instead
+            connection.send((False, RuntimeError(repr(response[1])), traceback.format_exc()))
+
+
+class _WatchedWorker:
+    """A spawned worker process that runs one call at a time, and is killed if a call takes too long."""
+
+    def __init__(
+        self,
+        initializer: typing.Callable[..., typing.Any] | None = None,
+        initargs: tuple[typing.Any, ...] = (),
+        startup_timeout: float = _STARTUP_TIMEOUT_SECONDS,
+    ) -> None:
+        context = multiprocessing.get_context(method="spawn")
+        self._connection, child_connection = context.Pipe()
+        self._process = context.Process(
+            target=_serve,
+            kwargs={"connection": child_connection, "initializer": initializer, "initargs": initargs},
+            daemon=True,
+        )
+        self._process.start()
+        child_connection.close()
+
+        # Start-up (spawning and importing) does not count towards the timeout of the first call
+        if not self._connection.poll(timeout=startup_timeout):
+            self._process.kill()
+            self.close()
+            raise WorkerProcessError(f"The worker process did not start within {startup_timeout} seconds.")
+        try:
+            self._connection.recv()
+        except EOFError:
+            # Such as when the initializer raised, which is printed to the standard error of the worker
+            self._raise_exited(during="while starting")
+
+    def run(
+        self,
+        function: typing.Callable[..., typing.Any],
+        args: tuple[typing.Any, ...],
+        kwargs: dict[str, typing.Any],
+        timeout: float,
+    ) -> typing.Any:
+        start_time = time.perf_counter()
+        try:
+            self._connection.send((function, args, kwargs))
+        except (BrokenPipeError, ConnectionResetError):
+            self._raise_exited(during="before running the call")
+        if not self._connection.poll(timeout=timeout):
+            self._process.kill()
+            self.close()
+            elapsed_seconds = time.perf_counter() - start_time
+            message = (
+                f"The worker process was killed after {elapsed_seconds:.1f} seconds, "
+                f"exceeding the session timeout of {timeout} seconds."
+            )
+            raise SessionTimeoutError(message, elapsed_seconds=elapsed_seconds)
+
+        try:
+            is_successful, result, formatted_traceback = self._connection.recv()
+        except EOFError:
+            # Such as when the process ran out of memory or a library crashed, leaving no exception to pass on
+            self._raise_exited(during="while running the call")
+        if not is_successful:
+            raise result from _RemoteTraceback(formatted_traceback=formatted_traceback)
+        return result
+
+    def _raise_exited(self, during: str) -> typing.NoReturn:
+        self._process.join(timeout=1)
+        exit_code = self._process.exitcode
+        self.close()
+        raise WorkerProcessError(f"The worker process exited unexpectedly {during}, with exit code {exit_code}.")
+
+    @property
+    def is_alive(self) -> bool:
+        return self._process.is_alive()
+
+    def close(self) -> None:
+        # Let an idle worker exit on its own, but kill one that is stuck
+        if self._process.is_alive():
+            try:
+                self._connection.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+            self._process.join(timeout=1)
+        if self._process.is_alive():
+            self._process.kill()
+            self._process.join()
+        self._connection.close()
+
+
+class WatchdogExecutor(concurrent.futures.ThreadPoolExecutor):
+    """
+    An executor that runs each call in one of a pool of worker processes, killing and replacing any worker whose call
+    takes longer than a timeout.
+
+    Unlike a `concurrent.futures.ProcessPoolExecutor`, a call that hangs (such as a read stuck on an unresponsive
+    network mount) therefore fails with a `SessionTimeoutError` instead of blocking the whole pool forever, and a
+    worker that crashes fails only its own call with a `WorkerProcessError`.
+    """
+
+    def __init__(
+        self,
+        max_workers: int | None,
+        timeout: float,
+        initializer: typing.Callable[..., typing.Any] | None = None,
+        initargs: tuple[typing.Any, ...] = (),
+    ) -> None:
+        super().__init__(max_workers=max_workers or os.cpu_count() or 1)
+        self._timeout = timeout
+        # Called in each worker process as it starts, as by `concurrent.futures.ProcessPoolExecutor`; named apart from
+        # the `_initializer` of the thread pool, which would otherwise also call it in each thread of this process
+        self._worker_initializer = initializer
+        self._worker_initargs = initargs
+        self._thread_local = threading.local()
+        self._workers: list[_WatchedWorker] = []
+        self._workers_lock = threading.Lock()
+
+    def _run_in_worker(
+        self, function: typing.Callable[..., typing.Any], /, *args: typing.Any, **kwargs: typing.Any
+    ) -> typing.Any:
+        # Each thread of the pool drives its own worker process, replacing it after it was killed
+        worker = getattr(self._thread_local, "worker", None)
+        if worker is None or not worker.is_alive:
+            worker = _WatchedWorker(initializer=self._worker_initializer, initargs=self._worker_initargs)
+            self._thread_local.worker = worker
+            with self._workers_lock:
+                self._workers.append(worker)
+        return worker.run(function, args=args, kwargs=kwargs, timeout=self._timeout)
+
+    def submit(  # type: ignore[override]
+        self, function: typing.Callable[..., typing.Any], /, *args: typing.Any, **kwargs: typing.Any
+    ) -> concurrent.futures.Future:
+        return super().submit(self._run_in_worker, function, *args, **kwargs)
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False) -> None:
+        super().shutdown(wait=wait, cancel_futures=cancel_futures)
+        with self._workers_lock:
+            for worker in self._workers:
+                worker.close()
+            self._workers.clear()
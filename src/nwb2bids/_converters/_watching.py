@@ -0,0 +1,268 @@
+import ctypes
+import ctypes.util
+import errno
+import os
+import pathlib
+import select
+import struct
+import sys
+import time
+import warnings
+
+from ._run_config import RunConfig
+from ._session_converter import _iter_nwbfile_paths, _read_identifiers, _read_indexed_file_information
+from .._tools import get_file_index, get_file_signature
+
+# From <sys/inotify.h>
+_IN_ATTRIB = 0x00000004
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_MOVE_SELF = 0x00000800
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ONLYDIR = 0x01000000
+_IN_ISDIR = 0x40000000
+
+# Files being written are not followed write by write, only once they are closed; their settling is checked by stat
+_WATCH_MASK = (
+    _IN_ATTRIB
+    | _IN_CLOSE_WRITE
+    | _IN_MOVED_FROM
+    | _IN_MOVED_TO
+    | _IN_CREATE
+    | _IN_DELETE
+    | _IN_DELETE_SELF
+    | _IN_MOVE_SELF
+    | _IN_ONLYDIR
+)
+_EVENT_HEADER = struct.Struct("iIII")
+_READ_SIZE = 64 * 1024
+
+
+class _PollingWatcher:
+    """Stands in for an `_InotifyWatcher` where inotify is unavailable, assuming a change after every interval."""
+
+    def __init__(self, poll_interval: float) -> None:
+        self._poll_interval = poll_interval
+
+    def wait(self, timeout: float | None) -> set[pathlib.Path] | None:
+        """Wait until the next poll, or until the timeout if it comes first; anything may have changed meanwhile."""
+        time.sleep(self._poll_interval if timeout is None else min(timeout, self._poll_interval))
+        return None
+
+    def close(self) -> None:
+        pass
+
+
+class _InotifyWatcher:
+    """
+    Waits for changes beneath the watched paths using the inotify API of the Linux kernel.
+
+    Every non-hidden directory beneath a watched directory is watched, including those created later on;
+    for a watched file, only its parent directory is. Once a directory can no longer be watched (such as when the
+    limit on the number of watches of the user is reached), this falls back to polling.
+    """
+
+    def __init__(self, nwb_paths: list[pathlib.Path], poll_interval: float) -> None:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._inotify_add_watch = libc.inotify_add_watch
+        self._inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+
+        file_descriptor = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if file_descriptor < 0:
+            error_number = ctypes.get_errno()
+            raise OSError(error_number, os.strerror(error_number))
+        self._file_descriptor = file_descriptor
+        self._watched_directories: dict[int, str] = dict()
+        self._poll_interval = poll_interval
+        self._polling_watcher: _PollingWatcher | None = None
+
+        self._tree_roots = [str(nwb_path) for nwb_path in nwb_paths if nwb_path.is_dir()]
+        self._directory_roots = [str(nwb_path.parent) for nwb_path in nwb_paths if not nwb_path.is_dir()]
+        try:
+            self._watch_roots()
+        except Exception:  # noqa
+            self.close()
+            raise
+
+    def _watch_directory(self, directory: str) -> None:
+        watch_descriptor = self._inotify_add_watch(self._file_descriptor, os.fsencode(directory), _WATCH_MASK)
+        if watch_descriptor < 0:
+            error_number = ctypes.get_errno()
+            # The directory was removed or made unreadable in the meantime
+            if error_number in (errno.ENOENT, errno.ENOTDIR, errno.EACCES):
+                return
+            # Such as ENOSPC, once the limit on the number of watches of the user is reached
+            raise OSError(error_number, os.strerror(error_number), directory)
+        self._watched_directories[watch_descriptor] = directory
+
+    def _watch_tree(self, directory: str) -> None:
+        # Hidden directories are skipped during discovery, so they are not watched either
+        for current_directory, subdirectory_names, _ in os.walk(directory):
+            subdirectory_names[:] = [name for name in subdirectory_names if not name.startswith(".")]
+            self._watch_directory(directory=current_directory)
+
+    def _watch_roots(self) -> None:
+        # Watching a directory again only returns its existing watch descriptor
+        for tree_root in self._tree_roots:
+            self._watch_tree(directory=tree_root)
+        for directory_root in self._directory_roots:
+            self._watch_directory(directory=directory_root)
+
+    def wait(self, timeout: float | None) -> set[pathlib.Path] | None:
+        """
+        Wait until anything changes beneath the watched paths, or until the timeout if one is given.
+
+        Returns the paths of the files that changed, or None if anything may have changed (such as when directories
+        were created, moved, or removed, or when events were dropped).
+        """
+        if self._polling_watcher is not None:
+            return self._polling_watcher.wait(timeout=timeout)
+
+        readable, _, _ = select.select([self._file_descriptor], [], [], timeout)
+        if len(readable) == 0:
+            return set()
+        try:
+            return self._read_events()
+        except OSError as exception:
+            self._fall_back_to_polling(exception=exception)
+            return None
+
+    def _fall_back_to_polling(self, exception: OSError) -> None:
+        message = (
+            f"Unable to keep watching for changes with inotify ({exception}); "
+            f"polling every {self._poll_interval} seconds instead."
+        )
+        warnings.warn(message=message, stacklevel=3)
+        os.close(self._file_descriptor)
+        self._polling_watcher = _PollingWatcher(poll_interval=self._poll_interval)
+
+    def _read_events(self) -> set[pathlib.Path] | None:
+        changed_file_paths: set[pathlib.Path] | None = set()
+        while True:
+            try:
+                data = os.read(self._file_descriptor, _READ_SIZE)
+            except BlockingIOError:
+                return changed_file_paths
+
+            offset = 0
+            while offset < len(data):
+                watch_descriptor, mask, _, name_length = _EVENT_HEADER.unpack_from(data, offset)
+                name_offset = offset + _EVENT_HEADER.size
+                name = os.fsdecode(data[name_offset : name_offset + name_length].rstrip(b"\0"))
+                offset = name_offset + name_length
+
+                # Events were dropped, possibly including the creation of directories that should now be watched
+                if mask & _IN_Q_OVERFLOW:
+                    self._watch_roots()
+                    changed_file_paths = None
+                    continue
+                if mask & _IN_IGNORED:
+                    self._watched_directories.pop(watch_descriptor, None)
+                    continue
+
+                parent_directory = self._watched_directories.get(watch_descriptor, None)
+                if parent_directory is None:
+                    continue
+
+                # The files beneath a directory that appeared, moved, or disappeared are only known by scanning it
+                if mask & (_IN_ISDIR | _IN_DELETE_SELF | _IN_MOVE_SELF) or name == "":
+                    changed_file_paths = None
+                elif changed_file_paths is not None:
+                    changed_file_paths.add(pathlib.Path(parent_directory, name))
+
+                if (
+                    mask & _IN_ISDIR
+                    and mask & (_IN_CREATE | _IN_MOVED_TO)
+                    and parent_directory not in self._directory_roots
+                    and not name.startswith(".")
+                ):
+                    self._watch_tree(directory=os.path.join(parent_directory, name))
+
+    def close(self) -> None:
+        if self._polling_watcher is None:
+            os.close(self._file_descriptor)
+
+
+def _open_watcher(
+    nwb_paths: list[pathlib.Path], poll_interval: float, use_polling: bool
+) -> _InotifyWatcher | _PollingWatcher:
+    """Watch the given paths with inotify, falling back to polling if it is not requested or not available."""
+    if use_polling or not sys.platform.startswith("linux"):
+        return _PollingWatcher(poll_interval=poll_interval)
+
+    try:
+        return _InotifyWatcher(nwb_paths=nwb_paths, poll_interval=poll_interval)
+    except (OSError, AttributeError) as exception:
+        message = f"Unable to watch for changes with inotify ({exception}); polling every {poll_interval} seconds."
+        warnings.warn(message=message, stacklevel=2)
+        return _PollingWatcher(poll_interval=poll_interval)
+
+
+def _scan_nwbfile_signatures(
+    nwb_paths: list[pathlib.Path], run_config: RunConfig
+) -> dict[pathlib.Path, tuple[int, int, int]]:
+    """Find the NWB files that a conversion of the given paths would discover, along with their current signatures."""
+    # Files written into a BIDS directory within a watched directory are outputs, not new files to convert
+    bids_directory = os.path.abspath(run_config.bids_directory)
+
+    nwbfile_signatures = dict()
+    for nwbfile_path in _iter_nwbfile_paths(
+        nwb_paths=nwb_paths, ignore_hidden=True, path_filter=run_config._path_filter
+    ):
+        if os.path.commonpath([bids_directory, os.path.abspath(nwbfile_path)]) == bids_directory:
+            continue
+
+        # The file may have been removed since it was discovered
+        nwbfile_signature = get_file_signature(file_path=nwbfile_path)
+        if nwbfile_signature is not None:
+            nwbfile_signatures[nwbfile_path] = nwbfile_signature
+    return nwbfile_signatures
+
+
+def _is_discoverable(nwbfile_path: pathlib.Path, nwb_paths: list[pathlib.Path], run_config: RunConfig) -> bool:
+    """Whether a conversion of the given paths would discover an NWB file at the given path, were it present."""
+    bids_directory = os.path.abspath(run_config.bids_directory)
+    if os.path.commonpath([bids_directory, os.path.abspath(nwbfile_path)]) == bids_directory:
+        return False
+    if nwbfile_path in nwb_paths:
+        return True
+    if not nwbfile_path.name.endswith(".nwb"):
+        return False
+
+    # Mirrors the pruning of `_walk_nwb_files`, which skips hidden entries and those the filter rules out
+    path_filter = run_config._path_filter
+    for nwb_path in nwb_paths:
+        if nwb_path not in nwbfile_path.parents:
+            continue
+
+        relative_parts = nwbfile_path.relative_to(nwb_path).parts
+        if any(part.startswith(".") for part in relative_parts):
+            continue
+        if path_filter is None:
+            return True
+
+        relative_directories = ["/".join(relative_parts[:index]) for index in range(1, len(relative_parts))]
+        if all(
+            path_filter.includes_directory(relative_directory=relative_directory)
+            for relative_directory in relative_directories
+        ) and path_filter.includes_file(relative_path="/".join(relative_parts)):
+            return True
+    return False
+
+
+def _read_session_id(nwbfile_path: pathlib.Path, run_config: RunConfig) -> str | None:
+    """Read the session ID by which a conversion would group an NWB file, through the file index if it is used."""
+    file_index = get_file_index(cache_directory=run_config.cache_directory) if run_config.use_cache else None
+    entry = _read_indexed_file_information(
+        nwbfile_path=nwbfile_path, file_index=file_index, io_profile=run_config.io_profile
+    )
+    if entry is not None:
+        return entry.session_id
+
+    session_id, _ = _read_identifiers(nwbfile_path=nwbfile_path, io_profile=run_config.io_profile)
+    return session_id
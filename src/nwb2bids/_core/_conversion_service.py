@@ -0,0 +1,427 @@
+import datetime
+import hmac
+import http
+import http.server
+import json
+import os
+import pathlib
+import queue
+import secrets
+import socket
+import socketserver
+import threading
+import traceback
+import typing
+import urllib.parse
+import uuid
+
+import pydantic
+import typing_extensions
+
+from ._convert_nwb_dataset import convert_nwb_dataset
+from .._converters._run_config import RunConfig
+from ..bids_models._probes import cache_probe_lookups
+from ..notifications import Notification
+
+
+class ConversionJob(pydantic.BaseModel):
+    """
+    A conversion submitted to a `ConversionService`, along with its status and outcome.
+    """
+
+    job_id: str = pydantic.Field(description="The unique identifier of this job.")
+    nwb_paths: list[pathlib.Path] = pydantic.Field(description="The NWB files and directories to convert.")
+    run_config: RunConfig = pydantic.Field(description="The configuration of the conversion.")
+    status: typing.Literal["queued", "running", "succeeded", "failed", "cancelled"] = pydantic.Field(
+        description=(
+            "The status of this job. A job succeeds once the conversion has run to completion, even if it raised "
+            "notifications (including errors for individual sessions); it only fails if the conversion itself raised. "
+            "Jobs still queued when the service is closed are cancelled without running."
+        ),
+        default="queued",
+    )
+    submitted_at: datetime.datetime = pydantic.Field(description="When the job was submitted.")
+    started_at: datetime.datetime | None = pydantic.Field(description="When the job started running.", default=None)
+    finished_at: datetime.datetime | None = pydantic.Field(description="When the job finished running.", default=None)
+    notifications: list[Notification] = pydantic.Field(
+        description="The notifications raised by the conversion, once finished.", default_factory=list
+    )
+    error: str | None = pydantic.Field(
+        description="The traceback of the exception that made the job fail, if any.", default=None
+    )
+
+
+# Fields of `RunConfig` that a job may set; the others (such as `cache_directory`, whose cached metadata is loaded back
+# by the service) are left to the service, since requests should only control what is converted and where to
+_ALLOWED_RUN_CONFIG_FIELDS = frozenset(
+    {
+        "bids_directory",
+        "additional_metadata_file_path",
+        "file_mode",
+        "use_cache",
+        "include",
+        "exclude",
+        "nwb_cache_size",
+        "nwb_cache_max_memory",
+        "load_cached_namespaces",
+        "extraction_engine",
+        "io_profile",
+        "max_workers",
+        "extract_during_discovery",
+        "max_write_workers",
+        "copy_bandwidth_limit",
+        "shard",
+        "session_timeout",
+        "fail_fast",
+        "streaming",
+        "write_as_derivative",
+        "resume",
+        "sanitization_config",
+        "run_id",
+        "space",
+        "archive_target",
+        "use_session_labels",
+        "probe",
+    }
+)
+
+# Requests only describe a job, so anything larger is refused before being read
+_MAX_REQUEST_BODY_SIZE = 1024 * 1024
+
+
+class _JobRequest(pydantic.BaseModel):
+    """The body of a request to submit a conversion job."""
+
+    nwb_paths: list[pydantic.FilePath | pydantic.DirectoryPath] = pydantic.Field(min_length=1)
+    run_config: dict[str, typing.Any] = pydantic.Field(default_factory=dict)
+
+    model_config = pydantic.ConfigDict(extra="forbid")
+
+    @pydantic.field_validator("run_config")
+    @classmethod
+    def _validate_run_config(cls, run_config: dict[str, typing.Any]) -> dict[str, typing.Any]:
+        disallowed_fields = sorted(set(run_config) - _ALLOWED_RUN_CONFIG_FIELDS)
+        if len(disallowed_fields) > 0:
+            message = f"The fields {disallowed_fields} of the run configuration cannot be set by a job."
+            raise ValueError(message)
+        # Jobs may only add files to a BIDS dataset, never remove the NWB files they are given
+        if run_config.get("file_mode", None) == "move":
+            message = 'The "move" file mode cannot be used by a job; use "copy" or "symlink" instead.'
+            raise ValueError(message)
+        return run_config
+
+
+class ConversionService:
+    """
+    Runs conversion jobs one at a time in a background thread of a single long-running process.
+
+    Since every job runs in the same process, the imports, the type maps built from the namespaces cached in NWB
+    files, the file indexes and metadata caches of each cache directory, and the probes fetched from the
+    ProbeInterface library all stay warm from one job to the next.
+    """
+
+    def __init__(self, max_finished_jobs: int = 1000) -> None:
+        """
+        Parameters
+        ----------
+        max_finished_jobs : int, default: 1000
+            The number of finished jobs whose outcome is kept; older ones are forgotten as new ones finish.
+        """
+        self._max_finished_jobs = max_finished_jobs
+        self._jobs: dict[str, ConversionJob] = dict()
+        self._jobs_lock = threading.Lock()
+        self._job_ids: queue.Queue[str | None] = queue.Queue()
+        self._worker = threading.Thread(target=self._run_jobs, name="nwb2bids-conversion-service", daemon=True)
+        self._worker.start()
+
+    def __enter__(self) -> typing_extensions.Self:
+        return self
+
+    def __exit__(self, *args: typing.Any) -> None:
+        self.close()
+
+    def submit(self, nwb_paths: list[pathlib.Path], run_config: RunConfig) -> ConversionJob:
+        """Queue the conversion of NWB files, returning the job tracking it."""
+        job = ConversionJob(
+            job_id=uuid.uuid4().hex,
+            nwb_paths=nwb_paths,
+            run_config=run_config,
+            submitted_at=datetime.datetime.now(tz=datetime.timezone.utc),
+        )
+        with self._jobs_lock:
+            self._jobs[job.job_id] = job
+        self._job_ids.put(job.job_id)
+        return job
+
+    def get_job(self, job_id: str) -> ConversionJob | None:
+        """The current state of a job, or None if no job with this ID was submitted."""
+        with self._jobs_lock:
+            return self._jobs.get(job_id, None)
+
+    def list_jobs(self) -> list[ConversionJob]:
+        """The current state of all submitted jobs, in the order they were submitted."""
+        with self._jobs_lock:
+            return list(self._jobs.values())
+
+    def close(self) -> None:
+        """Stop running jobs, cancelling those still queued and waiting only for the one running to finish."""
+        while True:
+            try:
+                job_id = self._job_ids.get_nowait()
+            except queue.Empty:
+                break
+            if job_id is not None:
+                self._update_job(
+                    job_id=job_id, status="cancelled", finished_at=datetime.datetime.now(tz=datetime.timezone.utc)
+                )
+
+        self._job_ids.put(None)
+        self._worker.join()
+
+    @property
+    def running_job(self) -> ConversionJob | None:
+        """The job being run, if any."""
+        with self._jobs_lock:
+            return next((job for job in self._jobs.values() if job.status == "running"), None)
+
+    def _update_job(self, job_id: str, **fields: typing.Any) -> ConversionJob:
+        # Jobs are replaced rather than modified, so that those already returned are consistent snapshots
+        with self._jobs_lock:
+            job = self._jobs[job_id].model_copy(update=fields)
+            self._jobs[job_id] = job
+
+            # Jobs are kept in the order they were submitted, so the first finished ones are the oldest
+            finished_job_ids = [
+                other_job_id
+                for other_job_id, other_job in self._jobs.items()
+                if other_job.status in ("succeeded", "failed", "cancelled")
+            ]
+            for finished_job_id in finished_job_ids[: max(0, len(finished_job_ids) - self._max_finished_jobs)]:
+                del self._jobs[finished_job_id]
+        return job
+
+    def _run_jobs(self) -> None:
+        with cache_probe_lookups():
+            while (job_id := self._job_ids.get()) is not None:
+                self._run_job(job_id=job_id)
+
+    def _run_job(self, job_id: str) -> None:
+        job = self._update_job(
+            job_id=job_id, status="running", started_at=datetime.datetime.now(tz=datetime.timezone.utc)
+        )
+        try:
+            dataset_converter = convert_nwb_dataset(nwb_paths=job.nwb_paths, run_config=job.run_config)
+        except Exception:  # noqa
+            self._update_job(
+                job_id=job_id,
+                status="failed",
+                error=traceback.format_exc(),
+                finished_at=datetime.datetime.now(tz=datetime.timezone.utc),
+            )
+            return
+
+        self._update_job(
+            job_id=job_id,
+            status="succeeded",
+            notifications=dataset_converter.notifications,
+            finished_at=datetime.datetime.now(tz=datetime.timezone.utc),
+        )
+
+    def create_server(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8765,
+        socket_path: pathlib.Path | None = None,
+        token: str | None = None,
+    ) -> socketserver.BaseServer:
+        """
+        Create a server exposing this service through a local HTTP API, either over TCP or a Unix socket.
+
+        The API has the following endpoints, all of which respond with JSON:
+            - `POST /jobs`: submit a job from a body of the form `{"nwb_paths": [...], "run_config": {...}}`, where
+              `run_config` holds keyword arguments of `RunConfig` (progress bars are silenced by default).
+              Only the fields controlling what is converted and where may be set, and the "move" file mode is refused.
+              Responds with the queued job and status 202, or with the validation errors and status 400.
+            - `GET /jobs`: list all submitted jobs.
+            - `GET /jobs/{job_id}`: the status of a job, along with its notifications once finished.
+
+        Requests must carry the token as an `Authorization: Bearer <token>` header, if there is one. Over TCP,
+        they must also be addressed to the host the server is bound to, which defeats DNS rebinding, and submissions
+        must be sent as `application/json`, which browsers cannot send across origins without asking first.
+
+        Parameters
+        ----------
+        host : str, default: "127.0.0.1"
+            The address to listen on over TCP. Only listens on the loopback interface by default.
+        port : int, default: 8765
+            The port to listen on over TCP; if 0, a free port is chosen.
+        socket_path : file path, optional
+            The path of a Unix socket to listen on instead of TCP, which only its owner may connect to.
+        token : str, optional
+            The secret that requests must carry. Over TCP, a random one is generated if not given, since any local
+            user (and any web page) can connect; over a Unix socket, none is required unless given.
+
+        Returns
+        -------
+        server : socketserver.BaseServer
+            The server, whose `serve_forever` method handles requests until `shutdown` is called.
+            The token it requires, if any, is available as its `token` attribute.
+        """
+        if socket_path is None:
+            server: _ConversionHTTPServer | _ConversionUnixHTTPServer = _ConversionHTTPServer(
+                (host, port), _ConversionRequestHandler
+            )
+            bound_port = server.server_address[1]
+            allowed_hosts = {f"{host}:{bound_port}", f"[{host}]:{bound_port}"}
+            if host in ("127.0.0.1", "::1", "localhost"):
+                allowed_hosts.add(f"localhost:{bound_port}")
+            server.allowed_hosts = allowed_hosts
+            server.token = token if token is not None else secrets.token_urlsafe(32)
+        else:
+            if not hasattr(socket, "AF_UNIX"):
+                message = "Unix sockets are not supported on this system; please listen over TCP instead."
+                raise NotImplementedError(message)
+
+            # Only replace a socket left behind by a previous server, never any other kind of file
+            if socket_path.is_socket():
+                socket_path.unlink()
+            server = _ConversionUnixHTTPServer(str(socket_path), _ConversionRequestHandler)
+            server.allowed_hosts = None
+            server.token = token
+        server.conversion_service = self
+        return server
+
+
+class _ConversionHTTPServer(http.server.ThreadingHTTPServer):
+    conversion_service: ConversionService
+    allowed_hosts: set[str] | None
+    token: str | None
+
+
+class _ConversionUnixHTTPServer(socketserver.ThreadingMixIn, getattr(socketserver, "UnixStreamServer", object)):
+    daemon_threads = True
+    conversion_service: ConversionService
+    allowed_hosts: set[str] | None
+    token: str | None
+
+    def server_bind(self) -> None:
+        super().server_bind()
+        # Restricted between binding and listening, so that no connection can be accepted beforehand
+        os.chmod(self.server_address, 0o600)
+
+    def server_close(self) -> None:
+        super().server_close()
+        if os.path.exists(self.server_address):
+            os.remove(self.server_address)
+
+
+class _ConversionRequestHandler(http.server.BaseHTTPRequestHandler):
+    server: _ConversionHTTPServer | _ConversionUnixHTTPServer
+
+    def address_string(self) -> str:
+        # Clients of a Unix socket have no address
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "local"
+
+    def _send_json(self, status: http.HTTPStatus, payload: typing.Any, headers: dict[str, str] | None = None) -> None:
+        body = json.dumps(obj=payload, indent=2).encode()
+        self.send_response(code=status)
+        self.send_header(keyword="Content-Type", value="application/json")
+        self.send_header(keyword="Content-Length", value=str(len(body)))
+        for keyword, value in (headers or dict()).items():
+            self.send_header(keyword=keyword, value=value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_not_found(self) -> None:
+        self._send_json(status=http.HTTPStatus.NOT_FOUND, payload={"error": f"No resource at '{self.path}'."})
+
+    def _is_authorized(self) -> bool:
+        """Check the host and token of a request, responding with an error if either is wrong."""
+        allowed_hosts = self.server.allowed_hosts
+        if allowed_hosts is not None and self.headers.get("Host", None) not in allowed_hosts:
+            self._send_json(status=http.HTTPStatus.FORBIDDEN, payload={"error": "Unexpected Host header."})
+            return False
+
+        token = self.server.token
+        if token is None:
+            return True
+        authorization = self.headers.get("Authorization", "")
+        if not hmac.compare_digest(authorization.encode(), f"Bearer {token}".encode()):
+            self._send_json(
+                status=http.HTTPStatus.UNAUTHORIZED,
+                payload={"error": "Missing or invalid token."},
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+            return False
+        return True
+
+    def do_GET(self) -> None:
+        if not self._is_authorized():
+            return
+
+        service = self.server.conversion_service
+        path_parts = [part for part in urllib.parse.urlsplit(url=self.path).path.split("/") if part != ""]
+        if path_parts == ["jobs"]:
+            payload = [job.model_dump(mode="json") for job in service.list_jobs()]
+            self._send_json(status=http.HTTPStatus.OK, payload=payload)
+            return
+
+        if len(path_parts) == 2 and path_parts[0] == "jobs":
+            job = service.get_job(job_id=path_parts[1])
+            if job is None:
+                self._send_not_found()
+                return
+            self._send_json(status=http.HTTPStatus.OK, payload=job.model_dump(mode="json"))
+            return
+
+        self._send_not_found()
+
+    def do_POST(self) -> None:
+        if not self._is_authorized():
+            return
+
+        service = self.server.conversion_service
+        path_parts = [part for part in urllib.parse.urlsplit(url=self.path).path.split("/") if part != ""]
+        if path_parts != ["jobs"]:
+            self._send_not_found()
+            return
+
+        content_type = self.headers.get("Content-Type", "").split(";")[0].strip().lower()
+        if content_type != "application/json":
+            self._send_json(
+                status=http.HTTPStatus.UNSUPPORTED_MEDIA_TYPE,
+                payload={"error": "Jobs must be submitted as 'application/json'."},
+            )
+            return
+
+        try:
+            content_length = int(self.headers.get("Content-Length", ""))
+        except ValueError:
+            content_length = -1
+        if content_length < 0:
+            self._send_json(
+                status=http.HTTPStatus.LENGTH_REQUIRED, payload={"error": "A valid Content-Length is required."}
+            )
+            return
+        if content_length > _MAX_REQUEST_BODY_SIZE:
+            self._send_json(
+                status=http.HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                payload={"error": f"Requests are limited to {_MAX_REQUEST_BODY_SIZE} bytes."},
+            )
+            return
+        body = self.rfile.read(content_length)
+        try:
+            job_request = _JobRequest.model_validate_json(json_data=body)
+            run_config = RunConfig(**{"silent": True, **job_request.run_config})
+        except pydantic.ValidationError as exception:
+            payload = {"errors": json.loads(exception.json(include_url=False))}
+            self._send_json(status=http.HTTPStatus.BAD_REQUEST, payload=payload)
+            return
+
+        nwb_paths = [pathlib.Path(os.path.abspath(nwb_path)) for nwb_path in job_request.nwb_paths]
+        job = service.submit(nwb_paths=nwb_paths, run_config=run_config)
+        self._send_json(
+            status=http.HTTPStatus.ACCEPTED,
+            payload=job.model_dump(mode="json"),
+            headers={"Location": f"/jobs/{job.job_id}"},
+        )
@@ -7,6 +7,7 @@ import pydantic
 
 from .._converters._dataset_converter import DatasetConverter
 from .._converters._run_config import RunConfig
+from ..bids_models._probes import cache_probe_lookups
 
 
 def _make_absolute(p: pathlib.Path) -> pathlib.Path:
@@ -51,8 +52,17 @@ def convert_nwb_dataset(
         The DatasetConverter used to perform the conversion.
         Contains notifications and other contextual information about the conversion process.
     """
-    dataset_converter = DatasetConverter.from_nwb_paths(nwb_paths=nwb_paths, run_config=run_config)
-    dataset_converter.extract_metadata()
-    dataset_converter.convert_to_bids_dataset()
+    # Sessions sharing a probe only fetch it from the ProbeInterface library once
+    with cache_probe_lookups():
+        # Metadata extraction begins while the remaining NWB files are still being discovered, unless it is to be
+        # scheduled longest-first, which requires all sessions to be discovered first
+        # When resuming, sessions completed by the interrupted run must first be restored so as not to be extracted
+        # again, and when streaming, each session is only extracted right before it is written
+        with DatasetConverter.from_nwb_paths(
+            nwb_paths=nwb_paths,
+            run_config=run_config,
+            extract_metadata=(run_config.extract_during_discovery and not (run_config.resume or run_config.streaming)),
+        ) as dataset_converter:
+            dataset_converter.convert_to_bids_dataset()
 
     return dataset_converter
@@ -0,0 +1,212 @@
+import json
+import pathlib
+
+import pandas
+import pydantic
+
+from .._converters._sharding import _SHARD_MANIFESTS_DIRECTORY_NAME, ShardManifest
+from .._tools import hold_file_lock, write_text_atomically
+from .._tools._file_lock import _DATASET_LOCK_FILE_NAME
+from ..bids_models import BidsSessionMetadata, Participant
+from ..sanitization import Sanitization
+
+_REQUIRED_PARTICIPANTS_COLUMN_ORDER = ("participant_id", "original_participant_id", "species", "sex", "strain")
+_ORIGINAL_PARTICIPANT_ID_DESCRIPTION = "The original participant identifier before sanitization."
+_ORIGINAL_SESSION_ID_DESCRIPTION = "The original session identifier before sanitization."
+
+
+def _read_tsv(file_path: pathlib.Path) -> list[dict[str, str]]:
+    """Read the rows of a TSV file exactly as written, including any `n/a` or manually edited values."""
+    if not file_path.is_file():
+        return []
+
+    data_frame = pandas.read_csv(filepath_or_buffer=file_path, sep="\t", dtype=str, keep_default_na=False)
+    return data_frame.to_dict(orient="records")
+
+
+def _read_json(file_path: pathlib.Path) -> dict[str, str]:
+    if not file_path.is_file():
+        return dict()
+
+    with file_path.open(mode="r") as file_stream:
+        return json.load(fp=file_stream)
+
+
+def _write_table(rows: list[dict[str, str]], columns: list[str], file_path: pathlib.Path) -> None:
+    data_frame = pandas.DataFrame.from_records(data=rows, columns=columns).fillna(value="n/a")
+    write_text_atomically(file_path=file_path, data=data_frame.to_csv(index=False, sep="\t"))
+
+
+def _get_column_order(rows: list[dict[str, str]], required_column_order: tuple[str, ...]) -> list[str]:
+    """Order the columns of a table with the required ones first, as the BIDS validator expects."""
+    columns = list(dict.fromkeys(column for row in rows for column in row))
+    return [column for column in required_column_order if column in columns] + [
+        column for column in columns if column not in required_column_order
+    ]
+
+
+def _scan_bids_tree(bids_directory: pathlib.Path) -> dict[str, list[str]]:
+    """Map each `sub-` directory of a BIDS dataset to the names of its `ses-` directories."""
+    subject_to_sessions = {
+        subject_directory.name: sorted(
+            session_directory.name
+            for session_directory in subject_directory.glob(pattern="ses-*")
+            if session_directory.is_dir()
+        )
+        for subject_directory in sorted(bids_directory.glob(pattern="sub-*"))
+        if subject_directory.is_dir()
+    }
+    return subject_to_sessions
+
+
+def _load_recorded_metadata(
+    nwb2bids_directory: pathlib.Path,
+) -> tuple[dict[str, dict[str, str]], dict[tuple[str, str], str]]:
+    """
+    Collect the participant attributes and original session IDs recorded in the manifests of sharded conversions.
+
+    Returns the rows of participants keyed by their `sub-` label, and the original `ses-` label of each session
+    keyed by its `sub-` and `ses-` labels.
+    """
+    participant_rows: dict[str, dict[str, str]] = dict()
+    original_session_ids: dict[tuple[str, str], str] = dict()
+    shard_manifests_directory = nwb2bids_directory / _SHARD_MANIFESTS_DIRECTORY_NAME
+    for file_path in sorted(shard_manifests_directory.glob(pattern="shard-*-of-*.json")):
+        shard_manifest = ShardManifest.model_validate_json(json_data=file_path.read_text())
+        sanitization_config = shard_manifest.sanitization_config
+        for shard_session in shard_manifest.sessions:
+            original_participant_id = shard_session.original_participant_id
+            participant_label = (
+                Sanitization._sanitize_label(label=original_participant_id)
+                if sanitization_config.sub_labels
+                else original_participant_id
+            )
+            participant_id = f"sub-{participant_label}"
+
+            participant_row = participant_rows.setdefault(participant_id, {"participant_id": participant_id})
+            if sanitization_config.sub_labels:
+                participant_row["original_participant_id"] = f"sub-{original_participant_id}"
+
+            # Aggregate differing values across sessions (such as species mismatches)
+            for field, value in shard_session.participant.items():
+                if field == "participant_id" or value is None:
+                    continue
+                values = participant_row[field].split(", ") if field in participant_row else []
+                if value not in values:
+                    participant_row[field] = ", ".join(values + [value])
+
+            if sanitization_config.ses_labels:
+                original_session_id = shard_session.original_session_id
+                session_id = f"ses-{Sanitization._sanitize_label(label=original_session_id)}"
+                original_session_ids[(participant_id, session_id)] = f"ses-{original_session_id}"
+
+    return participant_rows, original_session_ids
+
+
+def _reindex_participants(
+    bids_directory: pathlib.Path, participant_ids: list[str], recorded_participant_rows: dict[str, dict[str, str]]
+) -> None:
+    participants_tsv_file_path = bids_directory / "participants.tsv"
+    participants_json_file_path = bids_directory / "participants.json"
+
+    # As for sessions files, a table listing subjects that no longer exist would contradict the tree
+    if len(participant_ids) == 0:
+        participants_tsv_file_path.unlink(missing_ok=True)
+        participants_json_file_path.unlink(missing_ok=True)
+        return
+
+    # Existing rows take precedence, since they may have been edited manually after conversion
+    existing_rows = {row.get("participant_id", None): row for row in _read_tsv(file_path=participants_tsv_file_path)}
+    rows = [
+        existing_rows.get(participant_id, None)
+        or recorded_participant_rows.get(participant_id, None)
+        or {"participant_id": participant_id}
+        for participant_id in participant_ids
+    ]
+    columns = _get_column_order(rows=rows, required_column_order=_REQUIRED_PARTICIPANTS_COLUMN_ORDER)
+    _write_table(rows=rows, columns=columns, file_path=participants_tsv_file_path)
+
+    participants_schema = Participant.model_json_schema()
+    default_descriptions = {field: info["description"] for field, info in participants_schema["properties"].items()}
+    default_descriptions["original_participant_id"] = _ORIGINAL_PARTICIPANT_ID_DESCRIPTION
+    existing_descriptions = _read_json(file_path=participants_json_file_path)
+    participants_json = {
+        column: existing_descriptions.get(column, default_descriptions.get(column, None))
+        for column in columns
+        if column in existing_descriptions or column in default_descriptions
+    }
+    write_text_atomically(file_path=participants_json_file_path, data=json.dumps(obj=participants_json, indent=4))
+
+
+def _reindex_sessions(
+    subject_directory: pathlib.Path, session_ids: list[str], recorded_original_session_ids: dict[tuple[str, str], str]
+) -> None:
+    participant_id = subject_directory.name
+    sessions_tsv_file_path = subject_directory / f"{participant_id}_sessions.tsv"
+    sessions_json_file_path = subject_directory / f"{participant_id}_sessions.json"
+
+    # Sessions files are only written for subjects that use `ses-` labels
+    if len(session_ids) == 0:
+        sessions_tsv_file_path.unlink(missing_ok=True)
+        sessions_json_file_path.unlink(missing_ok=True)
+        return
+
+    existing_rows = {row.get("session_id", None): row for row in _read_tsv(file_path=sessions_tsv_file_path)}
+    rows = []
+    for session_id in session_ids:
+        row = existing_rows.get(session_id, None) or {"session_id": session_id}
+        original_session_id = recorded_original_session_ids.get((participant_id, session_id), None)
+        if original_session_id is not None:
+            row.setdefault("original_session_id", original_session_id)
+        rows.append(row)
+    columns = _get_column_order(rows=rows, required_column_order=("session_id", "original_session_id"))
+    _write_table(rows=rows, columns=columns, file_path=sessions_tsv_file_path)
+
+    sessions_schema = BidsSessionMetadata.model_json_schema()
+    default_descriptions = {
+        "session_id": sessions_schema["properties"]["session_id"]["description"],
+        "original_session_id": _ORIGINAL_SESSION_ID_DESCRIPTION,
+    }
+    existing_descriptions = _read_json(file_path=sessions_json_file_path)
+    sessions_json = {
+        column: existing_descriptions.get(column, default_descriptions.get(column, None))
+        for column in columns
+        if column in existing_descriptions or column in default_descriptions
+    }
+    write_text_atomically(file_path=sessions_json_file_path, data=json.dumps(obj=sessions_json, indent=4))
+
+
+@pydantic.validate_call
+def reindex_bids_dataset(*, bids_directory: pydantic.DirectoryPath) -> None:
+    """
+    Regenerate the dataset-level tables of a BIDS dataset from its directory tree, without reading any NWB files.
+
+    The `participants.tsv` and per-subject `_sessions.tsv` files (along with their JSON sidecars) are rewritten to
+    list exactly the `sub-` and `ses-` directories present. Rows and descriptions already in these files, including
+    manual edits and the original IDs recorded by sanitization, are kept for every subject and session that still
+    exists; those of new subjects are taken from the manifests of sharded conversions when available.
+
+    Parameters
+    ----------
+    bids_directory : directory path
+        The path to the BIDS dataset to reindex.
+    """
+    nwb2bids_directory = bids_directory / ".nwb2bids"
+    recorded_participant_rows, recorded_original_session_ids = _load_recorded_metadata(
+        nwb2bids_directory=nwb2bids_directory
+    )
+
+    # Converters may be updating the same tables concurrently
+    with hold_file_lock(file_path=nwb2bids_directory / _DATASET_LOCK_FILE_NAME):
+        subject_to_sessions = _scan_bids_tree(bids_directory=bids_directory)
+        _reindex_participants(
+            bids_directory=bids_directory,
+            participant_ids=list(subject_to_sessions.keys()),
+            recorded_participant_rows=recorded_participant_rows,
+        )
+        for participant_id, session_ids in subject_to_sessions.items():
+            _reindex_sessions(
+                subject_directory=bids_directory / participant_id,
+                session_ids=session_ids,
+                recorded_original_session_ids=recorded_original_session_ids,
+            )
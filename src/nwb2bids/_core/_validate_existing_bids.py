@@ -1,6 +1,8 @@
 import json
 import pathlib
 
+from .._tools._file_lock import write_text_atomically
+
 
 def _validate_bids_directory(path: pathlib.Path) -> pathlib.Path:
     """
@@ -56,10 +58,12 @@ def _validate_existing_directory_as_bids(directory: pathlib.Path) -> pathlib.Pat
         # The directory is considered empty, not containing any meaningful content.
         # Populate the directory with `dataset_description.json` to make it
         # a valid (though minimal) BIDS dataset.
+        # Written atomically, since other converters into the same directory may be validating it concurrently.
 
         default_dataset_description = {"BIDSVersion": "1.10", "HEDVersion": "8.3.0"}
-        with dataset_description_file_path.open(mode="w") as file_stream:
-            json.dump(obj=default_dataset_description, fp=file_stream, indent=4)
+        write_text_atomically(
+            file_path=dataset_description_file_path, data=json.dumps(obj=default_dataset_description, indent=4)
+        )
     else:
         # The directory is considered non-empty
 
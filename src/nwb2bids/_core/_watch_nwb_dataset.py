@@ -0,0 +1,146 @@
+import pathlib
+import time
+import typing
+
+import pydantic
+
+from ._convert_nwb_dataset import NwbPathsList, convert_nwb_dataset
+from .._converters._dataset_converter import DatasetConverter
+from .._converters._run_config import RunConfig
+from .._converters._watching import _is_discoverable, _open_watcher, _read_session_id, _scan_nwbfile_signatures
+from .._tools import get_file_signature
+
+
+@pydantic.validate_call
+def watch_nwb_dataset(
+    *,
+    nwb_paths: NwbPathsList,
+    run_config: RunConfig = pydantic.Field(default_factory=lambda: RunConfig()),
+    settle_seconds: pydantic.NonNegativeFloat = 5.0,
+    poll_interval: pydantic.PositiveFloat = 2.0,
+    use_polling: bool | None = None,
+) -> typing.Iterator[DatasetConverter]:
+    """
+    Watch directories of NWB files, converting new or changed sessions into a BIDS dataset as their files arrive.
+
+    Each conversion only covers the sessions of files that arrived, changed, or were removed since the previous one,
+    and resumes from the journal of the previous ones (see `RunConfig.resume`), so that the dataset-level tables
+    still include all sessions converted so far. Where inotify is used, only the files it notifies as changed are
+    checked again, rather than scanning all directories.
+
+    A file only counts as arrived once it has been observed a second time, at least `settle_seconds` after the
+    first, with the same size, modification time, and inode, so that files still being copied or acquired are left
+    for a later conversion. A session that failed to convert is not retried until one of its files changes.
+
+    Parameters
+    ----------
+    nwb_paths : any iterable of file or directory paths
+        An iterable of NWB file paths and directories containing NWB files.
+    run_config : RunConfig, optional
+        The configuration for every conversion run; pass the same `run_id` to pick up where a previous watch stopped.
+    settle_seconds : float, default: 5.0
+        How long a file must remain unchanged before it is converted.
+    poll_interval : float, default: 2.0
+        How often to check for changes when polling, and to check whether files still being written have settled.
+    use_polling : bool, optional
+        Whether to poll for changes instead of being notified of them through inotify.
+        By default, polling is used on network filesystems (`run_config.io_profile="network"`), where changes made
+        by other machines are not notified, and wherever inotify is not available.
+
+    Yields
+    ------
+    dataset_converter : DatasetConverter
+        The DatasetConverter used to perform each conversion, as soon as it is done.
+        Watching stops when the iteration does.
+    """
+    # Each pass resumes from the journal of the previous ones, which all share the run ID of the given configuration
+    run_config = run_config.model_copy(update={"resume": True, "run_id": run_config.run_id})
+    if use_polling is None:
+        use_polling = run_config.io_profile == "network"
+
+    watcher = _open_watcher(nwb_paths=nwb_paths, poll_interval=poll_interval, use_polling=use_polling)
+    # The signature of each file, when it was first observed with that signature (on the clock of `time.monotonic`),
+    # and whether it has since been observed again with the same signature after settling
+    file_states: dict[pathlib.Path, tuple[tuple[int, int, int], float, bool]] = dict()
+    # The signatures of the settled files as of the last conversion of their sessions, and the IDs of those sessions
+    handled_signatures: dict[pathlib.Path, tuple[int, int, int]] = dict()
+    session_ids: dict[pathlib.Path, str | pathlib.Path | None] = dict()
+    # Every file is scanned for at first, then only those notified as changed (or all of them, when unknown)
+    changed_file_paths: set[pathlib.Path] | None = None
+    try:
+        while True:
+            current_time = time.monotonic()
+            unsettled_file_paths = {
+                nwbfile_path for nwbfile_path, (_, _, is_settled) in file_states.items() if not is_settled
+            }
+            if changed_file_paths is None:
+                current_signatures = _scan_nwbfile_signatures(nwb_paths=nwb_paths, run_config=run_config)
+                removed_file_paths = set(file_states) - set(current_signatures)
+            else:
+                current_signatures = dict()
+                removed_file_paths = set()
+                for nwbfile_path in changed_file_paths | unsettled_file_paths:
+                    nwbfile_signature = (
+                        get_file_signature(file_path=nwbfile_path)
+                        if _is_discoverable(nwbfile_path=nwbfile_path, nwb_paths=nwb_paths, run_config=run_config)
+                        else None
+                    )
+                    if nwbfile_signature is None:
+                        removed_file_paths.add(nwbfile_path)
+                    else:
+                        current_signatures[nwbfile_path] = nwbfile_signature
+
+            for nwbfile_path in removed_file_paths:
+                file_states.pop(nwbfile_path, None)
+            for nwbfile_path, nwbfile_signature in current_signatures.items():
+                previous_state = file_states.get(nwbfile_path, None)
+                if previous_state is None or previous_state[0] != nwbfile_signature:
+                    # Modification times cannot be trusted (copies may preserve them, and clocks may differ across
+                    # machines), so a file only settles once observed again unchanged after `settle_seconds`
+                    file_states[nwbfile_path] = (nwbfile_signature, current_time, False)
+                elif not previous_state[2] and current_time - previous_state[1] >= settle_seconds:
+                    file_states[nwbfile_path] = (nwbfile_signature, previous_state[1], True)
+
+            # Only the sessions of files that settled with a new signature, or that were removed, are converted again
+            changed_settled_file_paths = [
+                nwbfile_path
+                for nwbfile_path, (nwbfile_signature, _, is_settled) in file_states.items()
+                if is_settled and handled_signatures.get(nwbfile_path, None) != nwbfile_signature
+            ]
+            affected_session_ids = {
+                session_ids.pop(nwbfile_path) for nwbfile_path in removed_file_paths if nwbfile_path in session_ids
+            }
+            for nwbfile_path in changed_settled_file_paths:
+                try:
+                    session_ids[nwbfile_path] = _read_session_id(nwbfile_path=nwbfile_path, run_config=run_config)
+                except Exception:  # noqa
+                    # Converted on its own, so that the conversion reports why it cannot be read
+                    session_ids[nwbfile_path] = nwbfile_path
+                affected_session_ids.add(session_ids[nwbfile_path])
+            for nwbfile_path in removed_file_paths:
+                handled_signatures.pop(nwbfile_path, None)
+
+            nwbfile_paths = sorted(
+                nwbfile_path
+                for nwbfile_path, (_, _, is_settled) in file_states.items()
+                if is_settled and nwbfile_path in session_ids and session_ids[nwbfile_path] in affected_session_ids
+            )
+            if len(nwbfile_paths) > 0:
+                # A session that fails is not retried until one of its files changes, since it is only converted again
+                # once one of them settles with a new signature
+                dataset_converter = convert_nwb_dataset(nwb_paths=nwbfile_paths, run_config=run_config)
+                handled_signatures.update(
+                    {nwbfile_path: file_states[nwbfile_path][0] for nwbfile_path in nwbfile_paths}
+                )
+                yield dataset_converter
+
+            # Files still settling are checked again once they may have, even if nothing is notified in the meantime
+            unsettled_seconds = [
+                settle_seconds - (current_time - changed_time)
+                for _, changed_time, is_settled in file_states.values()
+                if not is_settled
+            ]
+            timeout = max(0.1, min(min(unsettled_seconds), poll_interval)) if len(unsettled_seconds) > 0 else None
+            changed_file_paths = watcher.wait(timeout=timeout)
+    finally:
+        watcher.close()
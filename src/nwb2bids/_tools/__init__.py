@@ -1,3 +1,34 @@
-from ._cache_nwb import cache_read_nwb
+from ._cache_nwb import NwbCacheInfo, NwbFileCache, cache_read_nwb, read_nwbfile
+from ._file_copy import BandwidthLimiter, copy_file, get_bandwidth_limiter
+from ._file_index import FileIndex, FileIndexEntry, get_file_index, get_file_signature
+from ._file_lock import hold_file_lock, write_text_atomically
+from ._hdf5_io import IoProfile, is_hdf5_file, open_h5py_file
+from ._metadata_cache import MetadataCache, get_metadata_cache
+from ._probe_nwb import probe_nwb_derivative_indicators, probe_nwb_identifiers
+from ._session_timings import SessionTiming, SessionTimings, get_session_timings
 
-__all__ = ["cache_read_nwb"]
+__all__ = [
+    "cache_read_nwb",
+    "NwbCacheInfo",
+    "NwbFileCache",
+    "read_nwbfile",
+    "BandwidthLimiter",
+    "copy_file",
+    "get_bandwidth_limiter",
+    "FileIndex",
+    "FileIndexEntry",
+    "get_file_index",
+    "get_file_signature",
+    "hold_file_lock",
+    "write_text_atomically",
+    "MetadataCache",
+    "get_metadata_cache",
+    "probe_nwb_derivative_indicators",
+    "probe_nwb_identifiers",
+    "SessionTiming",
+    "SessionTimings",
+    "get_session_timings",
+    "IoProfile",
+    "is_hdf5_file",
+    "open_h5py_file",
+]
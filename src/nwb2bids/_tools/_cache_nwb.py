@@ -1,9 +1,19 @@
-import functools
+import collections
+import contextlib
+import gc
+import hashlib
+import os
 import pathlib
+import threading
+import typing
 import warnings
 
+import h5py
+import hdmf.build
 import pynwb
 
+from ._hdf5_io import IoProfile, is_hdf5_file, open_h5py_file
+
 ignored_pynwb_message_patterns = [
     "No cached namespaces found in .+",
     "Ignoring cached namespace .+",
@@ -16,10 +26,296 @@ for message in ignored_pynwb_message_patterns:
     warnings.filterwarnings(action="ignore", message=message)
 
 
-@functools.cache
-def cache_read_nwb(file_path: pathlib.Path) -> pynwb.NWBFile:
-    """Cache the read operation per NWB file path to speed up repeated calls."""
-    # Always resolve in case of symlinks, mostly relevant to Windows (i.e., from DataLad most likely)
-    resolved_path = file_path.resolve()
-    nwbfile = pynwb.read_nwb(path=resolved_path)
+class NwbCacheInfo(typing.NamedTuple):
+    """Statistics of an `NwbFileCache`, in the spirit of `functools.lru_cache().cache_info()`."""
+
+    hits: int
+    misses: int
+    evictions: int
+    maxsize: int | None
+    currsize: int
+
+
+def _get_resident_memory() -> int | None:
+    """Return the current resident memory of this process in bytes, or None if it cannot be determined cheaply."""
+    statm_file_path = pathlib.Path("/proc/self/statm")
+    if not statm_file_path.exists():
+        return None
+
+    resident_pages = int(statm_file_path.read_text().split()[1])
+    return resident_pages * os.sysconf("SC_PAGE_SIZE")
+
+
+def _close_nwbfile(nwbfile: pynwb.NWBFile) -> None:
+    """Close the IO (and with it, the underlying HDF5 file) that an NWB file was read from."""
+    read_io = nwbfile.get_read_io()
+    if read_io is None:
+        return
+
+    read_io.close()
+
+
+# Type maps built from the cached namespaces of previously read files, keyed by the fingerprint of those namespaces
+_fingerprint_to_type_map: dict[str | None, hdmf.build.TypeMap] = dict()
+_type_map_lock = threading.Lock()
+
+
+def _get_namespace_fingerprint(h5py_file: h5py.File) -> str | None:
+    """
+    Hash the cached namespaces of an NWB file, or return None if the file has none.
+
+    Only the latest cached version of each namespace is hashed, since those are the only ones loaded by PyNWB.
+    """
+    if ".specloc" not in h5py_file.attrs:
+        return None
+
+    specifications_group = h5py_file[h5py_file.attrs[".specloc"]]
+    namespace_to_version = pynwb.NWBHDF5IO.get_namespaces(file=h5py_file)
+
+    fingerprint = hashlib.sha256()
+    for namespace, version in sorted(namespace_to_version.items()):
+        version_group = specifications_group[namespace][version]
+        for specification_name in sorted(version_group.keys()):
+            specification = version_group[specification_name][()]
+            fingerprint.update(f"{namespace}/{version}/{specification_name}\n".encode())
+            fingerprint.update(specification if isinstance(specification, bytes) else specification.encode())
+    return fingerprint.hexdigest()
+
+
+def _get_type_map(h5py_file: h5py.File, load_cached_namespaces: bool) -> hdmf.build.TypeMap:
+    """Retrieve the type map for the cached namespaces of an NWB file, only building it for new fingerprints."""
+    fingerprint = _get_namespace_fingerprint(h5py_file=h5py_file) if load_cached_namespaces else None
+
+    type_map = _fingerprint_to_type_map.get(fingerprint, None)
+    if type_map is not None:
+        return type_map
+
+    with _type_map_lock:
+        if (type_map := _fingerprint_to_type_map.get(fingerprint, None)) is not None:
+            return type_map
+
+        type_map = pynwb.get_type_map()
+        if fingerprint is not None:
+            pynwb.NWBHDF5IO.load_namespaces(namespace_catalog=type_map, file=h5py_file)
+        _fingerprint_to_type_map[fingerprint] = type_map
+    return type_map
+
+
+def read_nwbfile(
+    file_path: pathlib.Path, load_cached_namespaces: bool = True, io_profile: IoProfile = "local"
+) -> pynwb.NWBFile:
+    """
+    Read a local NWB file, reusing the type map built for any earlier file with identical cached namespaces.
+
+    Parameters
+    ----------
+    file_path : pathlib.Path
+        The path to the NWB file.
+    load_cached_namespaces : bool, default: True
+        Whether to load the namespaces cached in the file. If False, only the core NWB namespaces are used,
+        which is faster but fails on files containing types from extensions.
+    io_profile : "local" or "network", default: "local"
+        The I/O profile with which to open the file.
+    """
+    # Leave any non-HDF5 backends (such as Zarr) entirely to PyNWB
+    if not is_hdf5_file(file_path=file_path):
+        return pynwb.read_nwb(path=file_path)
+
+    h5py_file = open_h5py_file(file_path=file_path, io_profile=io_profile)
+    try:
+        type_map = _get_type_map(h5py_file=h5py_file, load_cached_namespaces=load_cached_namespaces)
+        # Each file needs its own build manager, since it caches the builders of all objects read through it
+        file_io = pynwb.NWBHDF5IO(file=h5py_file, mode="r", manager=hdmf.build.BuildManager(type_map))
+        nwbfile = file_io.read()
+    except Exception:
+        h5py_file.close()
+        raise
     return nwbfile
+
+
+class NwbFileCache:
+    """
+    A bounded, least-recently-used cache of NWB files opened for reading.
+
+    Files evicted from the cache have their underlying IO closed, so any objects read from them must not be used
+    afterwards. Extracted metadata should therefore never hold on to objects read from the NWB files themselves.
+
+    Files in use by any thread should be held through `checkout`, which keeps them from being closed (by eviction,
+    `discard`, `configure`, or `cache_clear`) until they are released; the cache may exceed its bounds meanwhile.
+
+    Parameters
+    ----------
+    maxsize : int or None, default: 16
+        The maximum number of NWB files kept open at once. If None, the number of files is unbounded.
+    max_memory : int or None, default: None
+        The resident memory of the process, in bytes, above which the least recently used files are evicted.
+        The most recently read file is always kept. Only enforced on systems that expose `/proc/self/statm`.
+    load_cached_namespaces : bool, default: True
+        Whether to load the namespaces cached in each file, or only use the core NWB namespaces.
+    """
+
+    def __init__(
+        self, maxsize: int | None = 16, max_memory: int | None = None, load_cached_namespaces: bool = True
+    ) -> None:
+        self._maxsize = maxsize
+        self._max_memory = max_memory
+        self._load_cached_namespaces = load_cached_namespaces
+        self._nwbfiles: collections.OrderedDict[pathlib.Path, pynwb.NWBFile] = collections.OrderedDict()
+        # The number of checkouts not yet released of each file (by ID), and the files to close once they all are
+        self._reference_counts: collections.Counter[int] = collections.Counter()
+        self._nwbfiles_to_close: list[pynwb.NWBFile] = []
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def __call__(self, file_path: pathlib.Path, io_profile: IoProfile = "local") -> pynwb.NWBFile:
+        """
+        Read an NWB file with an I/O profile, or retrieve it from the cache if it has been read recently.
+
+        The file is not held, so it may be closed by another thread at any time; prefer `checkout` when threads
+        share this cache.
+        """
+        return self._get(file_path=file_path, io_profile=io_profile, is_checkout=False)
+
+    @contextlib.contextmanager
+    def checkout(self, file_path: pathlib.Path, io_profile: IoProfile = "local") -> typing.Iterator[pynwb.NWBFile]:
+        """Read or retrieve an NWB file as `__call__` does, holding it open for the duration of the context."""
+        nwbfile = self._get(file_path=file_path, io_profile=io_profile, is_checkout=True)
+        try:
+            yield nwbfile
+        finally:
+            with self._lock:
+                self._reference_counts[id(nwbfile)] -= 1
+                if self._reference_counts[id(nwbfile)] == 0:
+                    del self._reference_counts[id(nwbfile)]
+                # Files held beyond the bounds, or discarded while held, are only closed once released
+                self._close_released()
+                self._evict()
+
+    def _get(self, file_path: pathlib.Path, io_profile: IoProfile, is_checkout: bool) -> pynwb.NWBFile:
+        # Always resolve in case of symlinks, mostly relevant to Windows (i.e., from DataLad most likely)
+        resolved_path = file_path.resolve()
+
+        with self._lock:
+            nwbfile = self._nwbfiles.get(resolved_path, None)
+            if nwbfile is not None:
+                self._nwbfiles.move_to_end(resolved_path)
+                self._hits += 1
+                if is_checkout:
+                    self._reference_counts[id(nwbfile)] += 1
+                return nwbfile
+            self._misses += 1
+
+        # Read outside of the lock so that other threads are not blocked on retrieving already cached files
+        nwbfile = read_nwbfile(
+            file_path=resolved_path, load_cached_namespaces=self._load_cached_namespaces, io_profile=io_profile
+        )
+
+        with self._lock:
+            # Another thread may have read the same file in the meantime
+            cached_nwbfile = self._nwbfiles.get(resolved_path, None)
+            if cached_nwbfile is not None:
+                _close_nwbfile(nwbfile=nwbfile)
+                nwbfile = cached_nwbfile
+            else:
+                self._nwbfiles[resolved_path] = nwbfile
+            if is_checkout:
+                self._reference_counts[id(nwbfile)] += 1
+            self._evict()
+        return nwbfile
+
+    def _remove(self, file_path: pathlib.Path) -> None:
+        """Remove a file from the cache, closing it now or once released. Must be called with the lock."""
+        nwbfile = self._nwbfiles.pop(file_path)
+        if self._reference_counts[id(nwbfile)] > 0:
+            self._nwbfiles_to_close.append(nwbfile)
+        else:
+            _close_nwbfile(nwbfile=nwbfile)
+
+    def _close_released(self) -> None:
+        """Close the files removed from the cache while held, once released. Must be called with the lock."""
+        released_nwbfiles = [nwbfile for nwbfile in self._nwbfiles_to_close if self._reference_counts[id(nwbfile)] == 0]
+        self._nwbfiles_to_close = [
+            nwbfile for nwbfile in self._nwbfiles_to_close if self._reference_counts[id(nwbfile)] > 0
+        ]
+        for nwbfile in released_nwbfiles:
+            _close_nwbfile(nwbfile=nwbfile)
+
+    def _evict_least_recently_used(self, keep: int = 0) -> bool:
+        """
+        Evict the least recently used file not held by any thread, never evicting the `keep` most recent files.
+
+        Returns whether a file could be evicted. Must be called with the lock.
+        """
+        evictable_file_paths = list(self._nwbfiles)[: max(0, len(self._nwbfiles) - keep)]
+        for file_path in evictable_file_paths:
+            if self._reference_counts[id(self._nwbfiles[file_path])] == 0:
+                self._remove(file_path=file_path)
+                self._evictions += 1
+                return True
+        return False
+
+    def _evict(self) -> None:
+        """Evict the least recently used files until the cache is within its bounds. Must be called with the lock."""
+        while self._maxsize is not None and len(self._nwbfiles) > self._maxsize:
+            if not self._evict_least_recently_used():
+                return
+
+        if self._max_memory is None:
+            return
+        while len(self._nwbfiles) > 1:
+            resident_memory = _get_resident_memory()
+            if resident_memory is None or resident_memory <= self._max_memory:
+                return
+
+            if not self._evict_least_recently_used(keep=1):
+                return
+            # PyNWB containers reference their parents, so their memory is only released by the cycle collector
+            gc.collect()
+
+    def configure(self, maxsize: int | None, max_memory: int | None, load_cached_namespaces: bool = True) -> None:
+        """
+        Change the bounds of the cache, immediately evicting any files beyond them.
+
+        Changing whether cached namespaces are loaded removes all files, since they were read with different types.
+        """
+        with self._lock:
+            if load_cached_namespaces != self._load_cached_namespaces:
+                for file_path in list(self._nwbfiles):
+                    self._remove(file_path=file_path)
+            self._maxsize = maxsize
+            self._max_memory = max_memory
+            self._load_cached_namespaces = load_cached_namespaces
+            self._evict()
+
+    def discard(self, file_path: pathlib.Path) -> None:
+        """Remove an NWB file from the cache, if it is currently cached, closing it once no thread holds it."""
+        with self._lock:
+            resolved_path = file_path.resolve()
+            if resolved_path in self._nwbfiles:
+                self._remove(file_path=resolved_path)
+
+    def cache_info(self) -> NwbCacheInfo:
+        """Report the hits, misses, and evictions of the cache, along with its current and maximum size."""
+        with self._lock:
+            return NwbCacheInfo(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                maxsize=self._maxsize,
+                currsize=len(self._nwbfiles),
+            )
+
+    def cache_clear(self) -> None:
+        """Remove all cached files, closing each once no thread holds it, and reset the statistics of the cache."""
+        with self._lock:
+            for file_path in list(self._nwbfiles):
+                self._remove(file_path=file_path)
+            self._hits = 0
+            self._misses = 0
+            self._evictions = 0
+
+
+# Cache the read operation per NWB file path to speed up repeated calls
+cache_read_nwb = NwbFileCache()
@@ -0,0 +1,297 @@
+import errno
+import functools
+import os
+import pathlib
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import typing
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None  # type: ignore[assignment]
+
+# From <linux/fs.h>: _IOW(0x94, 9, int)
+_FICLONE = 0x40049409
+
+# Each chunk is paced, and dropped from the page cache, before the next one is copied
+_CHUNK_SIZE = 64 * 1024 * 1024
+_MINIMUM_PACED_CHUNK_SIZE = 64 * 1024
+_BUFFER_SIZE = 1024 * 1024
+
+# Raised when a method of copying is not supported between the two files, rather than because the copy failed
+_UNSUPPORTED_ERRNOS = frozenset(
+    {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.ENOTSUP, errno.ENOTTY, errno.ENOTSOCK}
+)
+
+# Not available on macOS or Windows
+_POSIX_FADV_SEQUENTIAL: int | None = getattr(os, "POSIX_FADV_SEQUENTIAL", None)
+_POSIX_FADV_DONTNEED: int | None = getattr(os, "POSIX_FADV_DONTNEED", None)
+
+CopyMethod = typing.Literal["reflink", "copy_file_range", "sendfile", "buffered", "native"]
+
+
+class BandwidthLimiter:
+    """
+    Paces the bytes copied by any number of threads so that, together, they do not exceed a rate.
+
+    Each chunk reserves the next slot of time its size allows at that rate, and waits for the slot to begin.
+    """
+
+    def __init__(self, bytes_per_second: int) -> None:
+        self.bytes_per_second = bytes_per_second
+        self._next_time = time.monotonic()
+        self._lock = threading.Lock()
+
+    def consume(self, number_of_bytes: int) -> None:
+        """Wait until the given number of bytes can be copied without exceeding the rate."""
+        with self._lock:
+            current_time = time.monotonic()
+            start_time = max(self._next_time, current_time)
+            self._next_time = start_time + number_of_bytes / self.bytes_per_second
+
+        delay = start_time - current_time
+        if delay > 0:
+            time.sleep(delay)
+
+
+@functools.cache
+def get_bandwidth_limiter(bytes_per_second: int) -> BandwidthLimiter:
+    """Share one limiter between all copies at the same rate within this process, such as all sessions of a run."""
+    return BandwidthLimiter(bytes_per_second=bytes_per_second)
+
+
+def _advise(file_descriptor: int, offset: int, length: int, advice: int | None) -> None:
+    """Pass advice about future access to a range of a file to the kernel, where supported."""
+    if advice is None:
+        return
+
+    try:
+        os.posix_fadvise(file_descriptor, offset, length, advice)
+    except OSError:
+        # Such as on filesystems which do not support it; the advice is only an optimization
+        pass
+
+
+def _reflink(source_file_descriptor: int, target_file_descriptor: int) -> bool:
+    """Share the extents of the source with the (empty) target copy-on-write, returning whether it was possible."""
+    if fcntl is None or not sys.platform.startswith("linux"):
+        return False
+
+    try:
+        fcntl.ioctl(target_file_descriptor, _FICLONE, source_file_descriptor)
+    except OSError as exception:
+        if exception.errno in _UNSUPPORTED_ERRNOS:
+            return False
+        raise
+    return True
+
+
+def _copy_chunk_with_copy_file_range(
+    source_file_descriptor: int, target_file_descriptor: int, offset: int, count: int
+) -> int:
+    copied = 0
+    while copied < count:
+        number_of_bytes = os.copy_file_range(  # type: ignore[attr-defined]
+            source_file_descriptor,
+            target_file_descriptor,
+            count - copied,
+            offset + copied,
+            offset + copied,
+        )
+        if number_of_bytes == 0:
+            break
+        copied += number_of_bytes
+    return copied
+
+
+def _copy_chunk_with_sendfile(source_file_descriptor: int, target_file_descriptor: int, offset: int, count: int) -> int:
+    # Unlike the source offset, which is passed explicitly, the target is written at its current position
+    os.lseek(target_file_descriptor, offset, os.SEEK_SET)
+    copied = 0
+    while copied < count:
+        number_of_bytes = os.sendfile(target_file_descriptor, source_file_descriptor, offset + copied, count - copied)
+        if number_of_bytes == 0:
+            break
+        copied += number_of_bytes
+    return copied
+
+
+def _copy_chunk_with_buffer(source_file_descriptor: int, target_file_descriptor: int, offset: int, count: int) -> int:
+    os.lseek(source_file_descriptor, offset, os.SEEK_SET)
+    os.lseek(target_file_descriptor, offset, os.SEEK_SET)
+    copied = 0
+    while copied < count:
+        data = os.read(source_file_descriptor, min(_BUFFER_SIZE, count - copied))
+        if len(data) == 0:
+            break
+
+        view = memoryview(data)
+        while len(view) > 0:
+            view = view[os.write(target_file_descriptor, view) :]
+        copied += len(data)
+    return copied
+
+
+_CopyChunk = typing.Callable[[int, int, int, int], int]
+
+
+def _get_copy_chunk_methods() -> list[tuple[CopyMethod, _CopyChunk]]:
+    """The methods of copying a chunk supported on this system, from the most to the least efficient."""
+    copy_chunk_methods: list[tuple[CopyMethod, _CopyChunk]] = []
+    # Within the kernel, and offloaded to the filesystem (such as a server-side copy on NFS 4.2) where supported
+    if hasattr(os, "copy_file_range"):
+        copy_chunk_methods.append(("copy_file_range", _copy_chunk_with_copy_file_range))
+    # Within the kernel; only Linux allows a regular file as the target
+    if sys.platform.startswith("linux"):
+        copy_chunk_methods.append(("sendfile", _copy_chunk_with_sendfile))
+    copy_chunk_methods.append(("buffered", _copy_chunk_with_buffer))
+    return copy_chunk_methods
+
+
+def _copy_contents(
+    source_file_descriptor: int,
+    target_file_descriptor: int,
+    size: int,
+    bandwidth_limiter: BandwidthLimiter | None,
+) -> CopyMethod:
+    """Copy the contents of one file into another chunk by chunk, falling back on less efficient methods as needed."""
+    chunk_size = _CHUNK_SIZE
+    if bandwidth_limiter is not None:
+        # Pace in slots of at most a quarter of a second, so that concurrent copies take turns smoothly
+        chunk_size = max(_MINIMUM_PACED_CHUNK_SIZE, min(_CHUNK_SIZE, bandwidth_limiter.bytes_per_second // 4))
+
+    copy_chunk_methods = _get_copy_chunk_methods()
+    method_index = 0
+    offset = 0
+    # The bandwidth of a chunk is reserved once, even if it is then retried by another method
+    reserved_offset = -1
+    while offset < size:
+        count = min(chunk_size, size - offset)
+        if bandwidth_limiter is not None and reserved_offset != offset:
+            bandwidth_limiter.consume(number_of_bytes=count)
+            reserved_offset = offset
+
+        is_last_method = method_index == len(copy_chunk_methods) - 1
+        _, copy_chunk = copy_chunk_methods[method_index]
+        try:
+            copied = copy_chunk(source_file_descriptor, target_file_descriptor, offset, count)
+        except OSError as exception:
+            if is_last_method or exception.errno not in _UNSUPPORTED_ERRNOS:
+                raise
+            method_index += 1
+            continue
+
+        # Some filesystems report nothing copied rather than an error; only a buffered read settles the end of file
+        if copied == 0:
+            if is_last_method:
+                break
+            method_index += 1
+            continue
+
+        # Copied data will not be read again, so it should not evict pages that will; pages of the target can only be
+        # dropped once written back, which is most likely for the previous chunk
+        _advise(file_descriptor=source_file_descriptor, offset=offset, length=copied, advice=_POSIX_FADV_DONTNEED)
+        if offset > 0:
+            _advise(file_descriptor=target_file_descriptor, offset=0, length=offset, advice=_POSIX_FADV_DONTNEED)
+        offset += copied
+
+    _advise(file_descriptor=target_file_descriptor, offset=0, length=0, advice=_POSIX_FADV_DONTNEED)
+    return copy_chunk_methods[method_index][0]
+
+
+def copy_file(
+    source_file_path: pathlib.Path,
+    target_file_path: pathlib.Path,
+    bandwidth_limiter: BandwidthLimiter | None = None,
+) -> CopyMethod:
+    """
+    Copy the contents and permission bits of a file, as `shutil.copy` does, using the most efficient method available.
+
+    On Linux, the target first shares the extents of the source copy-on-write where the filesystem supports reflinks
+    (such as Btrfs, XFS, and ZFS). Otherwise, the contents are copied within the kernel by `copy_file_range` or else
+    `sendfile`, and only as a last resort read and written through a buffer. Copied data is dropped from the page
+    cache as it goes, so that large copies do not evict the pages of other files.
+
+    Parameters
+    ----------
+    source_file_path : file path
+        The file to copy, following symbolic links.
+    target_file_path : file path
+        The path of the copy, replacing any file (or symbolic link) already there.
+        The copy is written to a temporary file beside it first, so an interrupted copy never leaves it partial.
+    bandwidth_limiter : BandwidthLimiter, optional
+        Paces the data copied (reflinks copy none) so that all copies sharing the limiter stay under its rate.
+
+    Raises
+    ------
+    shutil.SameFileError
+        If the target already is the source, such as through a symbolic link.
+
+    Returns
+    -------
+    method : one of "reflink", "copy_file_range", "sendfile", "buffered", or "native"
+        The method by which the contents were copied, the last one used if several were.
+        Elsewhere than Linux, and without a bandwidth limit, the native method of Python is used instead.
+    """
+    # A target left behind by an earlier run, such as a symbolic link to the source written in symlink mode, must
+    # never be opened for writing, since that would truncate whatever it points to; a dangling link (such as one to a
+    # source that has since moved) cannot be the source, and is simply replaced
+    if target_file_path.exists() and os.path.samefile(source_file_path, target_file_path):
+        message = f"{str(source_file_path)!r} and {str(target_file_path)!r} are the same file"
+        raise shutil.SameFileError(message)
+
+    # The copy is written beside the target, then renamed over it, replacing a symbolic link instead of following it
+    temporary_file_descriptor, temporary_file_name = tempfile.mkstemp(
+        dir=target_file_path.parent, prefix=f".{target_file_path.name}.", suffix=".tmp"
+    )
+    temporary_file_path = pathlib.Path(temporary_file_name)
+    try:
+        method = _copy_to_new_file(
+            source_file_path=source_file_path,
+            temporary_file_descriptor=temporary_file_descriptor,
+            temporary_file_path=temporary_file_path,
+            bandwidth_limiter=bandwidth_limiter,
+        )
+        shutil.copymode(src=source_file_path, dst=temporary_file_path)
+        target_file_path.unlink(missing_ok=True)
+        os.replace(src=temporary_file_path, dst=target_file_path)
+    except BaseException:
+        temporary_file_path.unlink(missing_ok=True)
+        raise
+    return method
+
+
+def _copy_to_new_file(
+    source_file_path: pathlib.Path,
+    temporary_file_descriptor: int,
+    temporary_file_path: pathlib.Path,
+    bandwidth_limiter: BandwidthLimiter | None,
+) -> CopyMethod:
+    """Copy the contents of a file into a newly created, empty file, taking ownership of its open descriptor."""
+    if not sys.platform.startswith("linux") and bandwidth_limiter is None:
+        os.close(temporary_file_descriptor)
+        # Uses the copy-on-write and system copy functions of each platform when available
+        if sys.version_info >= (3, 14):
+            source_file_path.copy(target=temporary_file_path, follow_symlinks=True)  # type: ignore[attr-defined]
+        else:
+            shutil.copyfile(src=source_file_path, dst=temporary_file_path)
+        return "native"
+
+    with source_file_path.open(mode="rb") as source_stream, os.fdopen(temporary_file_descriptor, "wb") as target_stream:
+        source_file_descriptor = source_stream.fileno()
+        target_file_descriptor = target_stream.fileno()
+        if _reflink(source_file_descriptor=source_file_descriptor, target_file_descriptor=target_file_descriptor):
+            return "reflink"
+
+        _advise(file_descriptor=source_file_descriptor, offset=0, length=0, advice=_POSIX_FADV_SEQUENTIAL)
+        method = _copy_contents(
+            source_file_descriptor=source_file_descriptor,
+            target_file_descriptor=target_file_descriptor,
+            size=os.fstat(source_file_descriptor).st_size,
+            bandwidth_limiter=bandwidth_limiter,
+        )
+    return method
@@ -0,0 +1,180 @@
+import functools
+import json
+import os
+import pathlib
+import threading
+import typing
+
+import pydantic
+import typing_extensions
+
+from ._file_lock import hold_file_lock, write_text_atomically
+
+_FILE_INDEX_FILE_NAME = "file_index.json"
+
+
+class FileIndexEntry(pydantic.BaseModel):
+    """
+    Lightweight information about a single NWB file, valid for as long as the file is unchanged on disk.
+    """
+
+    size: int = pydantic.Field(description="The size of the file in bytes.")
+    mtime_ns: int = pydantic.Field(description="The modification time of the file in nanoseconds.")
+    inode: int = pydantic.Field(description="The inode number of the file.")
+    session_id: str | None = pydantic.Field(description="The session ID of the file.", default=None)
+    subject_id: str | None = pydantic.Field(description="The subject ID of the file.", default=None)
+    modality: typing.Literal["ecephys", "icephys"] | None = pydantic.Field(
+        description="The modality detected during metadata extraction, if it has been run.", default=None
+    )
+    derivative_indicators: tuple[bool, bool, bool] | None = pydantic.Field(
+        description=(
+            "Whether the file has a units table, any electrodes, and an electrical series in its acquisition, "
+            "if these have been read to decide whether a streaming conversion is written as a derivative."
+        ),
+        default=None,
+    )
+
+    def matches(self, stat_result: os.stat_result) -> bool:
+        """Whether this entry still describes a file with the given stat results."""
+        return (
+            self.size == stat_result.st_size
+            and self.mtime_ns == stat_result.st_mtime_ns
+            and self.inode == stat_result.st_ino
+        )
+
+
+class FileIndex(pydantic.BaseModel):
+    """
+    An on-disk index of NWB files keyed by resolved path, used to avoid reopening files that have not changed.
+
+    Entries are invalidated whenever the size, modification time, or inode of the file changes. The index may be
+    shared by any number of processes, so saving merges in the entries saved by others since, and only keeps the
+    most recently used `max_entries` so that the index does not grow with every file ever converted.
+    """
+
+    file_path: pathlib.Path = pydantic.Field(description="The path of the JSON file backing this index.")
+    entries: dict[str, FileIndexEntry] = pydantic.Field(
+        description="Mapping of resolved file paths to their index entries, from the least to most recently used.",
+        default_factory=dict,
+    )
+    max_entries: pydantic.PositiveInt = pydantic.Field(
+        description="The number of entries kept when saving, dropping the least recently used ones.", default=100_000
+    )
+    _is_modified: bool = pydantic.PrivateAttr(default=False)
+    # The keys of the entries used since the index was loaded or last saved, in the order they were last used
+    _used_keys: dict[str, None] = pydantic.PrivateAttr(default_factory=dict)
+    # Several converters in the same process may share this index; reentrant since updating also gets the entry
+    _lock: threading.RLock = pydantic.PrivateAttr(default_factory=threading.RLock)
+
+    @classmethod
+    def from_file_path(cls, file_path: pathlib.Path) -> typing_extensions.Self:
+        """Load an existing index, or start an empty one if it does not exist or cannot be read."""
+        return cls(file_path=file_path, entries=_read_entries(file_path=file_path))
+
+    def get(self, file_path: pathlib.Path) -> FileIndexEntry | None:
+        """Retrieve the index entry for a file, or None if there is no entry or the file has changed since."""
+        resolved_path = file_path.resolve()
+        with self._lock:
+            entry = self.entries.get(str(resolved_path), None)
+            if entry is None:
+                return None
+            if not entry.matches(stat_result=resolved_path.stat()):
+                return None
+            self._used_keys.pop(str(resolved_path), None)
+            self._used_keys[str(resolved_path)] = None
+            return entry
+
+    def update(self, file_path: pathlib.Path, **fields: typing.Any) -> FileIndexEntry:
+        """
+        Create or update the index entry for a file.
+
+        Any fields of an existing entry not specified are kept, unless the file has changed since it was indexed.
+        """
+        resolved_path = file_path.resolve()
+        stat_result = resolved_path.stat()
+
+        with self._lock:
+            existing_entry = self.get(file_path=resolved_path)
+            existing_fields = existing_entry.model_dump() if existing_entry is not None else dict()
+            entry = FileIndexEntry(
+                **{
+                    **existing_fields,
+                    **fields,
+                    "size": stat_result.st_size,
+                    "mtime_ns": stat_result.st_mtime_ns,
+                    "inode": stat_result.st_ino,
+                }
+            )
+
+            self.entries[str(resolved_path)] = entry
+            self._used_keys.pop(str(resolved_path), None)
+            self._used_keys[str(resolved_path)] = None
+            self._is_modified = True
+            return entry
+
+    def save(self) -> None:
+        """Write the index to disk if it has been modified since it was loaded or last saved."""
+        with self._lock:
+            if not self._is_modified:
+                return
+
+            with hold_file_lock(file_path=self.file_path.with_name(f"{self.file_path.name}.lock")):
+                # Entries used here are moved to the end, after those saved by other processes since loading
+                entries = _read_entries(file_path=self.file_path)
+                for key in self._used_keys:
+                    entries.pop(key, None)
+                    entries[key] = self.entries[key]
+                entries = dict(list(entries.items())[-self.max_entries :])
+
+                # Replace the whole file at once so that a concurrent reader never sees a partially written index
+                data = {key: entry.model_dump() for key, entry in entries.items()}
+                write_text_atomically(file_path=self.file_path, data=json.dumps(obj=data))
+
+            self.entries = entries
+            self._used_keys = dict()
+            self._is_modified = False
+
+
+def _read_entries(file_path: pathlib.Path) -> dict[str, FileIndexEntry]:
+    """Read the entries of an index, or none if it does not exist or cannot be read."""
+    if not file_path.exists():
+        return dict()
+
+    with file_path.open(mode="r") as file_stream:
+        try:
+            entries = json.load(fp=file_stream)
+        except json.JSONDecodeError:
+            # A corrupted index is only a missed optimization; start over rather than fail the run
+            return dict()
+
+    if not isinstance(entries, dict):
+        return dict()
+
+    # Entries written by an incompatible version are dropped rather than failing the run
+    valid_entries = dict()
+    for key, entry in entries.items():
+        try:
+            valid_entries[key] = FileIndexEntry.model_validate(entry)
+        except pydantic.ValidationError:
+            continue
+    return valid_entries
+
+
+def get_file_signature(file_path: pathlib.Path) -> tuple[int, int, int] | None:
+    """
+    The size, modification time (in nanoseconds), and inode of a file, which change whenever it is rewritten.
+
+    Returns None if the file does not exist or cannot be accessed.
+    """
+    try:
+        stat_result = os.stat(file_path)
+    except OSError:
+        return None
+    return stat_result.st_size, stat_result.st_mtime_ns, stat_result.st_ino
+
+
+@functools.cache
+def get_file_index(cache_directory: pathlib.Path) -> FileIndex:
+    """Load the file index stored in a cache directory once per process."""
+    file_index = FileIndex.from_file_path(file_path=cache_directory / _FILE_INDEX_FILE_NAME)
+    return file_index
@@ -0,0 +1,65 @@
+import collections
+import contextlib
+import os
+import pathlib
+import threading
+import time
+import typing
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None  # type: ignore[assignment]
+    import msvcrt
+
+_DATASET_LOCK_FILE_NAME = "dataset.lock"
+
+# Advisory locks are held per process, so threads of the same process are excluded from each other separately
+_thread_locks: collections.defaultdict[pathlib.Path, threading.Lock] = collections.defaultdict(threading.Lock)
+_thread_locks_guard = threading.Lock()
+
+
+@contextlib.contextmanager
+def hold_file_lock(file_path: pathlib.Path) -> typing.Iterator[None]:
+    """
+    Hold an exclusive advisory lock on a file (created if needed) for the duration of the context.
+
+    The lock is shared by all processes that use this function on the same file, including those on other machines
+    when the file is on network storage supporting POSIX locks (such as NFS with `lockd`).
+    """
+    file_path = file_path.absolute()
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    with _thread_locks_guard:
+        thread_lock = _thread_locks[file_path]
+
+    with thread_lock, file_path.open(mode="a+b") as file_stream:
+        # Lock the same (first) byte on every platform, regardless of where appending left the position
+        file_stream.seek(0)
+        if fcntl is not None:
+            fcntl.lockf(file_stream.fileno(), fcntl.LOCK_EX)
+        else:
+            # `msvcrt.locking` gives up after ten seconds of retrying, so keep retrying until the lock is free
+            while True:
+                try:
+                    msvcrt.locking(file_stream.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    time.sleep(0.1)
+
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.lockf(file_stream.fileno(), fcntl.LOCK_UN)
+            else:
+                msvcrt.locking(file_stream.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def write_text_atomically(file_path: pathlib.Path, data: str) -> None:
+    """
+    Replace the contents of a file all at once, so that concurrent readers see either the old or the new contents.
+    """
+    # Hidden, so that the temporary file is never mistaken for content of the BIDS dataset
+    temporary_file_path = file_path.with_name(f".{file_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    temporary_file_path.write_text(data=data)
+    os.replace(src=temporary_file_path, dst=file_path)
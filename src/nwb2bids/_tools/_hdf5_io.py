@@ -0,0 +1,65 @@
+import pathlib
+import typing
+
+import h5py
+
+_MEBIBYTE = 1024 * 1024
+
+IoProfile = typing.Literal["local", "network"]
+
+_IO_PROFILE_TO_FILE_OPTIONS: dict[str, dict[str, typing.Any]] = {
+    "local": dict(),
+    "network": {
+        # File locking hangs on NFS and is unnecessary for read-only access
+        "locking": False,
+        # Larger caches and blocks coalesce the many small metadata and chunk reads into fewer, larger requests
+        "rdcc_nbytes": 64 * _MEBIBYTE,
+        "rdcc_nslots": 100_003,
+        "page_buf_size": 16 * _MEBIBYTE,
+        "meta_block_size": 1 * _MEBIBYTE,
+    },
+}
+
+# From the HDF5 file format specification: the superblock begins with this signature, either at the start of the file
+# or after a user block of 512 bytes times a power of two
+_HDF5_SIGNATURE = b"\x89HDF\r\n\x1a\n"
+_HDF5_SUPERBLOCK_OFFSET_BASE = 512
+
+
+def is_hdf5_file(file_path: pathlib.Path | str) -> bool:
+    """
+    Whether a local file is an HDF5 file, judging only by the signature of its superblock.
+
+    Unlike `h5py.is_hdf5`, the file is never opened through HDF5, and so never locked, under any I/O profile.
+    """
+    try:
+        with open(file_path, mode="rb") as file_stream:
+            file_size = file_stream.seek(0, 2)
+            offset = 0
+            while offset + len(_HDF5_SIGNATURE) <= file_size:
+                file_stream.seek(offset)
+                if file_stream.read(len(_HDF5_SIGNATURE)) == _HDF5_SIGNATURE:
+                    return True
+                offset = max(_HDF5_SUPERBLOCK_OFFSET_BASE, 2 * offset)
+    except OSError:
+        # Such as a directory (for instance, a Zarr store) or a file that cannot be read
+        return False
+    return False
+
+
+def open_h5py_file(file_path: pathlib.Path | str, io_profile: IoProfile = "local") -> h5py.File:
+    """Open a local HDF5 file for reading with the options of an I/O profile."""
+    file_options = _IO_PROFILE_TO_FILE_OPTIONS[io_profile]
+    if not file_options:
+        return h5py.File(name=file_path, mode="r")
+
+    # Some versions of HDF5 refuse a page buffer for files not written with paged aggregation, or other options for
+    # some files; locking is kept in every fallback, since it is what keeps reads on network storage from hanging
+    unpaged_file_options = {key: value for key, value in file_options.items() if key != "page_buf_size"}
+    locking_file_options = {key: value for key, value in file_options.items() if key == "locking"}
+    for fallback_file_options in (file_options, unpaged_file_options):
+        try:
+            return h5py.File(name=file_path, mode="r", **fallback_file_options)
+        except (OSError, ValueError):
+            continue
+    return h5py.File(name=file_path, mode="r", **locking_file_options)
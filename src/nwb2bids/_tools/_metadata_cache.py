@@ -0,0 +1,131 @@
+import functools
+import gzip
+import hashlib
+import importlib.metadata
+import json
+import os
+import pathlib
+import threading
+import typing
+
+import h5py
+import pydantic
+
+from ._hdf5_io import IoProfile, is_hdf5_file, open_h5py_file
+
+_METADATA_CACHE_DIRECTORY_NAME = "metadata_cache"
+_VERSIONED_DISTRIBUTIONS = ("nwb2bids", "pynwb", "hdmf")
+
+
+def _read_nwb_identifier(file_path: pathlib.Path, io_profile: IoProfile) -> str | None:
+    """Read the `identifier` of an HDF5-backed NWB file, or return None if it cannot be read directly."""
+    if not is_hdf5_file(file_path=file_path):
+        return None
+
+    with open_h5py_file(file_path=file_path, io_profile=io_profile) as h5py_file:
+        identifier = h5py_file.get("identifier", None)
+        if not isinstance(identifier, h5py.Dataset) or h5py.check_string_dtype(identifier.dtype) is None:
+            return None
+        return identifier.asstr()[()]
+
+
+class MetadataCache(pydantic.BaseModel):
+    """
+    An on-disk cache of the metadata extracted from NWB files, stored as gzip-compressed JSON.
+
+    Entries are keyed by the resolved path, size, modification time, and NWB `identifier` of every source file,
+    along with the installed versions of nwb2bids, PyNWB, and HDMF so that upgrades invalidate stale entries.
+    Since stale entries are never looked up again, only the `max_entries` most recently used are kept.
+    """
+
+    directory: pathlib.Path = pydantic.Field(description="The directory in which the cached entries are stored.")
+    max_entries: pydantic.PositiveInt = pydantic.Field(
+        description="The number of entries kept when pruning, removing the least recently used ones.", default=10_000
+    )
+
+    def get_key(
+        self, nwbfile_paths: list[pathlib.Path], io_profile: IoProfile = "local", **options: typing.Any
+    ) -> str | None:
+        """
+        Compute the key of the metadata extracted from the given NWB files with the given extraction options.
+
+        The files are read with the given I/O profile, which does not affect the key.
+        Returns None if any of the files cannot be fingerprinted (such as non-HDF5 backends).
+        """
+        file_fingerprints = []
+        for nwbfile_path in nwbfile_paths:
+            resolved_path = nwbfile_path.resolve()
+            identifier = _read_nwb_identifier(file_path=resolved_path, io_profile=io_profile)
+            if identifier is None:
+                return None
+
+            stat_result = resolved_path.stat()
+            file_fingerprints.append([str(resolved_path), stat_result.st_size, stat_result.st_mtime_ns, identifier])
+
+        versions = {
+            distribution_name: importlib.metadata.version(distribution_name=distribution_name)
+            for distribution_name in _VERSIONED_DISTRIBUTIONS
+        }
+        fingerprint = json.dumps(obj={"files": file_fingerprints, "versions": versions, "options": options})
+        return hashlib.sha256(fingerprint.encode()).hexdigest()
+
+    def load(self, key: str) -> dict[str, typing.Any] | None:
+        """Load a cached entry, or return None if there is none or it cannot be read."""
+        file_path = self.directory / f"{key}.json.gz"
+        if not file_path.exists():
+            return None
+
+        try:
+            with gzip.open(filename=file_path, mode="rt", encoding="utf-8") as file_stream:
+                metadata = json.load(fp=file_stream)
+        except Exception:  # noqa
+            # A corrupted or incompatible entry is only a missed optimization; extract again rather than fail the run
+            return None
+
+        if not isinstance(metadata, dict):
+            return None
+
+        # The modification time of an entry marks when it was last used, for pruning
+        try:
+            os.utime(path=file_path)
+        except OSError:
+            pass
+        return metadata
+
+    def save(self, key: str, metadata: dict[str, typing.Any]) -> None:
+        """Store an entry, which must be JSON-serializable, replacing any existing one."""
+        self.directory.mkdir(exist_ok=True)
+
+        # Write to a temporary file first so that a concurrent reader never sees a partially written entry
+        file_path = self.directory / f"{key}.json.gz"
+        temporary_file_path = file_path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with gzip.open(filename=temporary_file_path, mode="wt", encoding="utf-8") as file_stream:
+            json.dump(obj=metadata, fp=file_stream)
+        os.replace(src=temporary_file_path, dst=file_path)
+
+    def prune(self) -> None:
+        """Remove the least recently used entries beyond `max_entries`."""
+        if not self.directory.exists():
+            return
+
+        entries = []
+        for directory_entry in os.scandir(self.directory):
+            if not directory_entry.name.endswith(".json.gz"):
+                continue
+            try:
+                entries.append((directory_entry.stat().st_mtime_ns, directory_entry.path))
+            except OSError:
+                # Such as an entry removed by another process in the meantime
+                continue
+
+        entries.sort()
+        for _, file_path in entries[: max(0, len(entries) - self.max_entries)]:
+            pathlib.Path(file_path).unlink(missing_ok=True)
+
+
+@functools.cache
+def get_metadata_cache(cache_directory: pathlib.Path) -> MetadataCache:
+    """Retrieve the metadata cache stored in a cache directory, pruning it once per process."""
+    metadata_cache = MetadataCache(directory=cache_directory / _METADATA_CACHE_DIRECTORY_NAME)
+    metadata_cache.prune()
+    return metadata_cache
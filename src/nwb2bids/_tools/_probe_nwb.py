@@ -0,0 +1,150 @@
+import pathlib
+
+import h5py
+
+from ._hdf5_io import IoProfile, is_hdf5_file, open_h5py_file
+
+
+def _read_scalar_string(group: h5py.Group, name: str) -> tuple[bool, str | None]:
+    """
+    Read a scalar string dataset from an HDF5 group.
+
+    Returns
+    -------
+    is_unambiguous : bool
+        False if the object exists but is not a scalar string dataset, in which case the value cannot be trusted.
+    value : str or None
+        The decoded string value, or None if the dataset does not exist.
+    """
+    if name not in group:
+        return True, None
+
+    dataset = group.get(name)
+    if not isinstance(dataset, h5py.Dataset) or dataset.shape != ():
+        return False, None
+    if h5py.check_string_dtype(dataset.dtype) is None:
+        return False, None
+
+    value = dataset.asstr()[()]
+    return True, value
+
+
+def probe_nwb_identifiers(
+    file_path: pathlib.Path, io_profile: IoProfile = "local"
+) -> tuple[str | None, str | None] | None:
+    """
+    Read only the session and subject IDs of an NWB file, without constructing any PyNWB objects.
+
+    The values are read directly from `/general/session_id` and `/general/subject/subject_id` through h5py.
+
+    Parameters
+    ----------
+    file_path : pathlib.Path
+        Path to the NWB file to probe.
+    io_profile : "local" or "network", default: "local"
+        The I/O profile with which to open the file.
+
+    Returns
+    -------
+    identifiers : tuple of (str or None, str or None), or None
+        The `(session_id, subject_id)` pair, where either value is None if absent from the file.
+        Returns None if the fast probe is ambiguous (such as for non-HDF5 backends or unexpected layouts),
+        in which case the caller should fall back to a full read of the file.
+    """
+    # Always resolve in case of symlinks, mostly relevant to Windows (i.e., from DataLad most likely)
+    resolved_path = file_path.resolve()
+    if not is_hdf5_file(file_path=resolved_path):
+        return None
+
+    with open_h5py_file(file_path=resolved_path, io_profile=io_profile) as h5py_file:
+        if h5py_file.attrs.get("neurodata_type", None) != "NWBFile":
+            return None
+
+        general = h5py_file.get("general", None)
+        if general is None:
+            return None, None
+        if not isinstance(general, h5py.Group):
+            return None
+
+        is_session_id_unambiguous, session_id = _read_scalar_string(group=general, name="session_id")
+        if not is_session_id_unambiguous:
+            return None
+
+        subject = general.get("subject", None)
+        if subject is None:
+            return session_id, None
+        if not isinstance(subject, h5py.Group):
+            return None
+
+        is_subject_id_unambiguous, subject_id = _read_scalar_string(group=subject, name="subject_id")
+        if not is_subject_id_unambiguous:
+            return None
+
+    return session_id, subject_id
+
+
+_CORE_NAMESPACES = {"core", "hdmf-common"}
+_ELECTRICAL_SERIES_TYPES = {"ElectricalSeries", "SpikeEventSeries"}
+
+
+def probe_nwb_derivative_indicators(
+    file_path: pathlib.Path, io_profile: IoProfile = "local"
+) -> tuple[bool, bool, bool] | None:
+    """
+    Read only whether an NWB file has a units table, electrodes, and an electrical series in its acquisition.
+
+    These are read from the `neurodata_type` attributes of a handful of groups through h5py, without walking the file.
+
+    Parameters
+    ----------
+    file_path : pathlib.Path
+        Path to the NWB file to probe.
+    io_profile : "local" or "network", default: "local"
+        The I/O profile with which to open the file.
+
+    Returns
+    -------
+    indicators : tuple of (bool, bool, bool), or None
+        Whether the file has a units table (at the top level or within a processing module), any extracellular or
+        intracellular electrodes, and an electrical series directly within `/acquisition`.
+        Returns None if the fast probe is ambiguous (such as for non-HDF5 backends or neurodata types from
+        extensions, which may subclass those of the core), in which case the caller should fall back to a full read.
+    """
+    resolved_path = file_path.resolve()
+    if not is_hdf5_file(file_path=resolved_path):
+        return None
+
+    with open_h5py_file(file_path=resolved_path, io_profile=io_profile) as h5py_file:
+        if h5py_file.attrs.get("neurodata_type", None) != "NWBFile":
+            return None
+
+        acquisition_objects = list(h5py_file["acquisition"].values()) if "acquisition" in h5py_file else []
+        processing_objects = [
+            h5py_object
+            for processing_module in (h5py_file["processing"].values() if "processing" in h5py_file else [])
+            if isinstance(processing_module, h5py.Group)
+            for h5py_object in processing_module.values()
+        ]
+        intracellular_electrodes = (
+            list(h5py_file["general/intracellular_ephys"].values())
+            if "general/intracellular_ephys" in h5py_file
+            else []
+        )
+        for h5py_object in [*acquisition_objects, *processing_objects, *intracellular_electrodes]:
+            namespace = h5py_object.attrs.get("namespace", None)
+            if namespace is not None and namespace not in _CORE_NAMESPACES:
+                return None
+
+        has_units_table = "units" in h5py_file or any(
+            h5py_object.attrs.get("neurodata_type", None) == "Units" for h5py_object in processing_objects
+        )
+        has_electrodes = "general/extracellular_ephys/electrodes" in h5py_file or any(
+            h5py_object.attrs.get("neurodata_type", None) == "IntracellularElectrode"
+            for h5py_object in intracellular_electrodes
+        )
+        has_electrical_series_in_acquisition = any(
+            h5py_object.attrs.get("neurodata_type", None) in _ELECTRICAL_SERIES_TYPES
+            for h5py_object in acquisition_objects
+        )
+
+    return has_units_table, has_electrodes, has_electrical_series_in_acquisition
@@ -0,0 +1,160 @@
+import functools
+import hashlib
+import json
+import pathlib
+import threading
+import typing
+
+import pydantic
+import typing_extensions
+
+from ._file_lock import hold_file_lock, write_text_atomically
+
+_SESSION_TIMINGS_FILE_NAME = "session_timings.json"
+
+Stage = typing.Literal["extraction", "conversion"]
+
+
+class SessionTiming(pydantic.BaseModel):
+    """
+    How long each stage took for a single session on its most recent run.
+    """
+
+    size: int = pydantic.Field(description="The total size of the files of the session in bytes.")
+    extraction: float | None = pydantic.Field(
+        description="The number of seconds taken to extract the metadata of the session.", default=None
+    )
+    conversion: float | None = pydantic.Field(
+        description="The number of seconds taken to write the session to the BIDS dataset.", default=None
+    )
+
+
+class SessionTimings(pydantic.BaseModel):
+    """
+    An on-disk record of how long sessions took to process on earlier runs, keyed by the files of each session.
+
+    Used to estimate how long each session will take so that the longest ones can be started first. As with the
+    file index, saving merges in the timings saved by other processes since, and only keeps the `max_entries` most
+    recently recorded.
+    """
+
+    file_path: pathlib.Path = pydantic.Field(description="The path of the JSON file backing this record.")
+    entries: dict[str, SessionTiming] = pydantic.Field(
+        description="Mapping of session keys to their timings, from the least to most recently recorded.",
+        default_factory=dict,
+    )
+    max_entries: pydantic.PositiveInt = pydantic.Field(
+        description="The number of timings kept when saving, dropping the least recently recorded ones.",
+        default=10_000,
+    )
+    _is_modified: bool = pydantic.PrivateAttr(default=False)
+    # The keys of the timings recorded since the record was loaded or last saved, in the order they were recorded
+    _recorded_keys: dict[str, None] = pydantic.PrivateAttr(default_factory=dict)
+    # Several converters in the same process may share this record
+    _lock: threading.Lock = pydantic.PrivateAttr(default_factory=threading.Lock)
+
+    @classmethod
+    def from_file_path(cls, file_path: pathlib.Path) -> typing_extensions.Self:
+        """Load an existing record, or start an empty one if it does not exist or cannot be read."""
+        return cls(file_path=file_path, entries=_read_entries(file_path=file_path))
+
+    @staticmethod
+    def get_key(nwbfile_paths: list[pathlib.Path] | list[pydantic.HttpUrl]) -> str:
+        """Compute the key of a session from the (resolved, for local files) paths or URLs of its files."""
+        locations = sorted(
+            str(nwbfile_path.resolve()) if isinstance(nwbfile_path, pathlib.Path) else str(nwbfile_path)
+            for nwbfile_path in nwbfile_paths
+        )
+        return hashlib.sha256(json.dumps(obj=locations).encode()).hexdigest()
+
+    def get_seconds_per_byte(self, stage: Stage) -> float | None:
+        """The average time taken per byte of a stage across all recorded sessions, or None if there are none."""
+        recorded = [
+            (seconds, entry.size)
+            for entry in self.entries.values()
+            if (seconds := getattr(entry, stage)) is not None and entry.size > 0
+        ]
+        total_size = sum(size for _, size in recorded)
+        if total_size == 0:
+            return None
+        return sum(seconds for seconds, _ in recorded) / total_size
+
+    def estimate(self, key: str, size: int, stage: Stage, seconds_per_byte: float | None) -> float | None:
+        """
+        Estimate the number of seconds a stage will take for a session.
+
+        Uses the time recorded for the same session if its files have not changed size since, and otherwise scales
+        its size by the given average time per byte of all recorded sessions (from `get_seconds_per_byte`, computed
+        once for all sessions being estimated). Returns None if nothing has been recorded.
+        """
+        entry = self.entries.get(key, None)
+        if entry is not None and entry.size == size and (seconds := getattr(entry, stage)) is not None:
+            return seconds
+
+        if seconds_per_byte is None:
+            return None
+        return size * seconds_per_byte
+
+    def record(self, key: str, size: int, stage: Stage, seconds: float) -> None:
+        """Record the time taken by a stage for a session, discarding other stages if its files have changed size."""
+        with self._lock:
+            entry = self.entries.get(key, None)
+            existing_fields = entry.model_dump() if entry is not None and entry.size == size else dict()
+            self.entries[key] = SessionTiming(**{**existing_fields, "size": size, stage: seconds})
+            self._recorded_keys.pop(key, None)
+            self._recorded_keys[key] = None
+            self._is_modified = True
+
+    def save(self) -> None:
+        """Write the record to disk if it has been modified since it was loaded or last saved."""
+        with self._lock:
+            if not self._is_modified:
+                return
+
+            with hold_file_lock(file_path=self.file_path.with_name(f"{self.file_path.name}.lock")):
+                # Timings recorded here are moved to the end, after those saved by other processes in the meantime
+                entries = _read_entries(file_path=self.file_path)
+                for key in self._recorded_keys:
+                    entries.pop(key, None)
+                    entries[key] = self.entries[key]
+                entries = dict(list(entries.items())[-self.max_entries :])
+
+                # Replace the whole file at once so that a concurrent reader never sees a partially written record
+                data = {key: entry.model_dump() for key, entry in entries.items()}
+                write_text_atomically(file_path=self.file_path, data=json.dumps(obj=data))
+
+            self.entries = entries
+            self._recorded_keys = dict()
+            self._is_modified = False
+
+
+def _read_entries(file_path: pathlib.Path) -> dict[str, SessionTiming]:
+    """Read the timings of a record, or none if it does not exist or cannot be read."""
+    if not file_path.exists():
+        return dict()
+
+    with file_path.open(mode="r") as file_stream:
+        try:
+            entries = json.load(fp=file_stream)
+        except json.JSONDecodeError:
+            # A corrupted record only affects scheduling; start over rather than fail the run
+            return dict()
+
+    if not isinstance(entries, dict):
+        return dict()
+
+    # Timings written by an incompatible version are dropped rather than failing the run
+    valid_entries = dict()
+    for key, entry in entries.items():
+        try:
+            valid_entries[key] = SessionTiming.model_validate(entry)
+        except pydantic.ValidationError:
+            continue
+    return valid_entries
+
+
+@functools.cache
+def get_session_timings(cache_directory: pathlib.Path) -> SessionTimings:
+    """Load the session timings stored in a cache directory once per process."""
+    session_timings = SessionTimings.from_file_path(file_path=cache_directory / _SESSION_TIMINGS_FILE_NAME)
+    return session_timings
@@ -1,24 +1,28 @@
+import contextlib
 import pathlib
 import re
 import typing
 
 import h5py
+import numpy
+import pandas
 import pydantic
 import pynwb
 import pynwb.ecephys
 import pynwb.misc
 import typing_extensions
 
-from ._base_metadata_model import BaseMetadataContainerModel
+from ._base_metadata_model import BaseMetadataContainerModel, BaseMetadataModel
 from ._channels import ChannelTable
 from ._electrodes import ElectrodeTable
 from ._events import Events
 from ._general_metadata import GeneralMetadata
+from ._h5py_engine import _extract_with_h5py
 from ._model_globals import _VALID_ID_REGEX
 from ._participant import Participant
 from ._probes import ProbeTable
 from .._converters._run_config import RunConfig
-from .._tools import cache_read_nwb
+from .._tools import IoProfile, cache_read_nwb, get_metadata_cache
 from ..notifications import Notification
 from ..sanitization import Sanitization
 
@@ -123,60 +127,241 @@ class BidsSessionMetadata(BaseMetadataContainerModel):
         nwbfile_paths: list[pydantic.FilePath] | list[pydantic.HttpUrl] = pydantic.Field(min_length=1),
         run_config: RunConfig = pydantic.Field(default_factory=RunConfig),
     ) -> typing_extensions.Self:
-        # Differentiate local path from URL
-        if isinstance(next(iter(nwbfile_paths)), pathlib.Path):
-            nwbfiles = [cache_read_nwb(nwbfile_path) for nwbfile_path in nwbfile_paths]
-        else:
-            nwbfiles = [_stream_nwb(url=url) for url in typing.cast(list[pydantic.HttpUrl], nwbfile_paths)]
-
-        session_ids = {nwbfile.session_id for nwbfile in nwbfiles}
-        if len(session_ids) > 1:
-            message = "Multiple differing session IDs found - please check how this method was called."
-            raise ValueError(message)
-        session_id = next(iter(session_ids))
-
-        participant = Participant.from_nwbfiles(nwbfiles=nwbfiles)
-        general_metadata = GeneralMetadata.from_nwbfiles(nwbfiles=nwbfiles)
-        events = Events.from_nwbfiles(nwbfiles=nwbfiles)
-        probe_table = ProbeTable.from_nwbfiles(nwbfiles=nwbfiles, probe_name=run_config.probe)
-        electrode_table = ElectrodeTable.from_nwbfiles(nwbfiles=nwbfiles)
-        channel_table = ChannelTable.from_nwbfiles(nwbfiles=nwbfiles)
-        has_units = _has_units_table(nwbfiles=nwbfiles)
-        has_es_in_acquisition = _has_electrical_series_in_acquisition(nwbfiles=nwbfiles)
+        metadata_dictionary = _extract_metadata_dictionary(nwbfile_paths=nwbfile_paths, run_config=run_config)
+        session_metadata = cls._from_metadata_dictionary(
+            metadata_dictionary=metadata_dictionary, nwbfile_paths=nwbfile_paths, run_config=run_config
+        )
+        return session_metadata
 
+    @classmethod
+    def _from_metadata_dictionary(
+        cls,
+        metadata_dictionary: dict[str, typing.Any],
+        nwbfile_paths: list[pathlib.Path] | list[pydantic.HttpUrl],
+        run_config: RunConfig,
+    ) -> typing_extensions.Self:
+        """Assemble the session metadata from the picklable dictionary returned by `_extract_metadata_dictionary`."""
+        # Omit missing optional tables so that their model defaults apply
         dictionary = {
-            "session_id": session_id,
-            "participant": participant,
-            "general_metadata": general_metadata,
-            "run_config": run_config,
-            "has_units_table": has_units,
-            "has_electrical_series_in_acquisition": has_es_in_acquisition,
+            key: value
+            for key, value in metadata_dictionary.items()
+            if value is not None or key not in ("events", "probe_table", "electrode_table", "channel_table")
         }
-        if events is not None:
-            dictionary["events"] = events
-        if probe_table is not None:
-            dictionary["probe_table"] = probe_table
-        if electrode_table is not None:
-            dictionary["electrode_table"] = electrode_table
-        if channel_table is not None:
-            dictionary["channel_table"] = channel_table
+        dictionary["run_config"] = run_config
 
         session_metadata = cls(**dictionary)
         session_metadata._check_fields(file_paths=nwbfile_paths)
         return session_metadata
 
 
-def _stream_nwb(url: pydantic.HttpUrl) -> pynwb.NWBFile:
+def _extract_metadata_dictionary(
+    nwbfile_paths: list[pathlib.Path] | list[pydantic.HttpUrl], run_config: RunConfig
+) -> dict[str, typing.Any]:
+    """
+    Extract the metadata of a session as a dictionary of its fields, excluding the run configuration.
+
+    The result only contains picklable values, so this can be run in a separate process.
+    """
+    # Differentiate local path from URL
+    is_local = isinstance(next(iter(nwbfile_paths)), pathlib.Path)
+
+    # Without the cache, its directory is never even read (nor pruned)
+    if not (is_local and run_config.use_cache):
+        return _extract(nwbfile_paths=nwbfile_paths, run_config=run_config, is_local=is_local)
+
+    # Extraction is skipped entirely for local files that are unchanged since a previous run
+    metadata_cache = get_metadata_cache(cache_directory=run_config.cache_directory)
+    metadata_cache_key = metadata_cache.get_key(
+        nwbfile_paths=typing.cast(list[pathlib.Path], nwbfile_paths),
+        io_profile=run_config.io_profile,
+        probe=run_config.probe,
+        load_cached_namespaces=run_config.load_cached_namespaces,
+    )
+
+    cached_metadata = metadata_cache.load(key=metadata_cache_key)
+    if cached_metadata is not None:
+        try:
+            return _load_cached_metadata(cached_metadata=cached_metadata)
+        except Exception:  # noqa
+            # An entry written by an incompatible version is only a missed optimization; extract again instead
+            pass
+
+    metadata_dictionary = _extract(nwbfile_paths=nwbfile_paths, run_config=run_config, is_local=is_local)
+    metadata_cache.save(key=metadata_cache_key, metadata=_dump_cached_metadata(metadata_dictionary=metadata_dictionary))
+    return metadata_dictionary
+
+
+# The models among the values of a metadata dictionary, which the metadata cache stores as JSON
+_CACHED_MODEL_TYPES: dict[str, type[pydantic.BaseModel]] = {
+    "participant": Participant,
+    "general_metadata": GeneralMetadata,
+    "events": Events,
+    "probe_table": ProbeTable,
+    "electrode_table": ElectrodeTable,
+    "channel_table": ChannelTable,
+}
+
+
+def _dump_model(model: pydantic.BaseModel) -> dict[str, typing.Any]:
+    """Dump a metadata model as JSON, along with the notifications of it and its contents excluded from model dumps."""
+    data = model.model_dump(mode="json", exclude={"notifications"})
+    if isinstance(model, BaseMetadataModel):
+        data["notifications"] = [notification.model_dump(mode="json") for notification in model.notifications]
+    for name, value in model:
+        if isinstance(value, pydantic.BaseModel):
+            data[name] = _dump_model(model=value)
+        elif isinstance(value, list) and any(isinstance(item, pydantic.BaseModel) for item in value):
+            data[name] = [_dump_model(model=item) for item in value]
+    return data
+
+
+def _dump_data_frame(data_frame: pandas.DataFrame) -> dict[str, typing.Any]:
+    """Dump a data frame as JSON, keeping its dtypes, its floats exactly, and the arrays held by its cells."""
+    rows = [
+        [value.tolist() if isinstance(value, (numpy.ndarray, numpy.generic)) else value for value in row]
+        for row in data_frame.itertuples(index=False, name=None)
+    ]
+    return {
+        "columns": data_frame.columns.tolist(),
+        "dtypes": [str(dtype) for dtype in data_frame.dtypes],
+        "rows": rows,
+    }
+
+
+def _load_data_frame(data: dict[str, typing.Any]) -> pandas.DataFrame:
+    """Rebuild a data frame dumped by `_dump_data_frame`."""
+    data_frame = pandas.DataFrame(data=data["rows"], columns=data["columns"])
+    for column_name, dtype in zip(data["columns"], data["dtypes"]):
+        if dtype == "object":
+            data_frame[column_name] = data_frame[column_name].apply(
+                lambda value: numpy.asarray(value) if isinstance(value, list) else value
+            )
+        else:
+            data_frame[column_name] = data_frame[column_name].astype(dtype)
+    return data_frame
+
+
+def _dump_cached_metadata(metadata_dictionary: dict[str, typing.Any]) -> dict[str, typing.Any]:
+    """Convert the metadata extracted from a session into the JSON stored by the metadata cache."""
+    cached_metadata = dict(metadata_dictionary)
+    for key in _CACHED_MODEL_TYPES:
+        model = metadata_dictionary.get(key, None)
+        if model is None:
+            continue
+
+        # The rows of the events are only held by their data frame, whose cells may hold arrays
+        if isinstance(model, Events):
+            cached_metadata[key] = {
+                "data_frame": _dump_data_frame(data_frame=model._bids_events_data_frame),
+                "metadata": model._bids_events_metadata,
+                "notifications": [notification.model_dump(mode="json") for notification in model.notifications],
+            }
+        else:
+            cached_metadata[key] = _dump_model(model=model)
+    return cached_metadata
+
+
+def _load_cached_metadata(cached_metadata: dict[str, typing.Any]) -> dict[str, typing.Any]:
+    """Rebuild the metadata extracted from a session from the JSON stored by the metadata cache."""
+    metadata_dictionary = dict(cached_metadata)
+    for key, model_type in _CACHED_MODEL_TYPES.items():
+        data = cached_metadata.get(key, None)
+        if data is None:
+            continue
+
+        if model_type is Events:
+            events = Events._from_bids_events_data_frame(
+                bids_events_data_frame=_load_data_frame(data=data["data_frame"]), bids_events_metadata=data["metadata"]
+            )
+            events.notifications = [Notification.model_validate(notification) for notification in data["notifications"]]
+            metadata_dictionary[key] = events
+        else:
+            metadata_dictionary[key] = model_type.model_validate(data)
+    return metadata_dictionary
+
+
+def _extract(
+    nwbfile_paths: list[pathlib.Path] | list[pydantic.HttpUrl], run_config: RunConfig, is_local: bool
+) -> dict[str, typing.Any]:
+    """Extract the session metadata with the configured engine, falling back to PyNWB whenever needed."""
+    if is_local and run_config.extraction_engine == "h5py" and len(nwbfile_paths) == 1:
+        dictionary = _try_extract_with_h5py(
+            nwbfile_path=typing.cast(pathlib.Path, nwbfile_paths[0]),
+            probe_name=run_config.probe,
+            io_profile=run_config.io_profile,
+        )
+        if dictionary is not None:
+            return dictionary
+
+    return _extract_with_pynwb(nwbfile_paths=nwbfile_paths, run_config=run_config, is_local=is_local)
+
+
+def _try_extract_with_h5py(
+    nwbfile_path: pathlib.Path, probe_name: str | None, io_profile: IoProfile
+) -> dict[str, typing.Any] | None:
+    """Extract the session metadata through h5py alone, or return None if PyNWB is required for this file."""
+    try:
+        return _extract_with_h5py(nwbfile_path=nwbfile_path, probe_name=probe_name, io_profile=io_profile)
+    except Exception:  # noqa
+        # Anything unexpected is left to PyNWB, which either handles it or reports it as before
+        return None
+
+
+def _extract_with_pynwb(
+    nwbfile_paths: list[pathlib.Path] | list[pydantic.HttpUrl], run_config: RunConfig, is_local: bool
+) -> dict[str, typing.Any]:
+    """Extract the session metadata from NWB files fully read through PyNWB."""
+    if is_local:
+        # Held for the duration of extraction, so that other threads sharing the cache cannot close them meanwhile
+        with contextlib.ExitStack() as exit_stack:
+            nwbfiles = [
+                exit_stack.enter_context(
+                    cache_read_nwb.checkout(file_path=nwbfile_path, io_profile=run_config.io_profile)
+                )
+                for nwbfile_path in typing.cast(list[pathlib.Path], nwbfile_paths)
+            ]
+            return _extract_from_nwbfiles(nwbfiles=nwbfiles, run_config=run_config)
+
+    # All metadata is extracted eagerly, so streamed files can be closed as soon as extraction is done
+    with contextlib.ExitStack() as exit_stack:
+        nwbfiles = [
+            exit_stack.enter_context(_stream_nwb(url=url)) for url in typing.cast(list[pydantic.HttpUrl], nwbfile_paths)
+        ]
+        return _extract_from_nwbfiles(nwbfiles=nwbfiles, run_config=run_config)
+
+
+def _extract_from_nwbfiles(nwbfiles: list[pynwb.NWBFile], run_config: RunConfig) -> dict[str, typing.Any]:
+    session_ids = {nwbfile.session_id for nwbfile in nwbfiles}
+    if len(session_ids) > 1:
+        message = "Multiple differing session IDs found - please check how this method was called."
+        raise ValueError(message)
+
+    dictionary = {
+        "session_id": next(iter(session_ids)),
+        "participant": Participant.from_nwbfiles(nwbfiles=nwbfiles),
+        "general_metadata": GeneralMetadata.from_nwbfiles(nwbfiles=nwbfiles),
+        "events": Events.from_nwbfiles(nwbfiles=nwbfiles),
+        "probe_table": ProbeTable.from_nwbfiles(nwbfiles=nwbfiles, probe_name=run_config.probe),
+        "electrode_table": ElectrodeTable.from_nwbfiles(nwbfiles=nwbfiles),
+        "channel_table": ChannelTable.from_nwbfiles(nwbfiles=nwbfiles),
+        "has_units_table": _has_units_table(nwbfiles=nwbfiles),
+        "has_electrical_series_in_acquisition": _has_electrical_series_in_acquisition(nwbfiles=nwbfiles),
+    }
+    return dictionary
+
+
+@contextlib.contextmanager
+def _stream_nwb(url: pydantic.HttpUrl) -> typing.Iterator[pynwb.NWBFile]:
     """
-    Stream an NWB file from a URL using remfile.
+    Stream an NWB file from a URL using remfile, closing all handles upon exiting the context.
 
     Parameters
     ----------
     url : pydantic.HttpUrl
         The URL of the NWB file to stream.
 
-    Returns
-    -------
+    Yields
+    ------
     pynwb.NWBFile
         The streamed NWB file.
     """
@@ -187,6 +372,7 @@ def _stream_nwb(url: pydantic.HttpUrl) -> pynwb.NWBFile:
     try:
         h5py_file = h5py.File(name=rem_file, mode="r")
     except Exception as exception:
+        rem_file.close()
         message = (
             f"\nFailed to open NWB file from URL {url}: {exception}\n\n"
             "Possible that backend is not supported.\n"
@@ -194,6 +380,10 @@ def _stream_nwb(url: pydantic.HttpUrl) -> pynwb.NWBFile:
         )
         raise ValueError(message)
 
+    # Closing the IO also closes the h5py file it was given
     file_io = pynwb.NWBHDF5IO(file=h5py_file, mode="r")
-    nwbfile = file_io.read()
-    return nwbfile
+    try:
+        yield file_io.read()
+    finally:
+        file_io.close()
+        rem_file.close()
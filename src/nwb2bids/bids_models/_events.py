@@ -31,7 +31,7 @@ class Events(BaseMetadataModel):
         ),
     )
     _bids_events_data_frame: pandas.DataFrame = pydantic.PrivateAttr()
-    _nwbfiles: list[pynwb.NWBFile] = pydantic.PrivateAttr()
+    _bids_events_metadata: dict | None = pydantic.PrivateAttr()
 
     @classmethod
     @pydantic.validate_call
@@ -51,6 +51,17 @@ class Events(BaseMetadataModel):
         if nwb_events_data_frame is None:
             return None
 
+        # Read eagerly, since the NWB files may be closed by the time the JSON sidecar is written
+        bids_events_metadata = _get_events_metadata(nwbfile=nwbfile)
+        return cls._from_events_data_frame(
+            nwb_events_data_frame=nwb_events_data_frame, bids_events_metadata=bids_events_metadata
+        )
+
+    @classmethod
+    def _from_events_data_frame(
+        cls, nwb_events_data_frame: pandas.DataFrame, bids_events_metadata: dict | None
+    ) -> typing_extensions.Self:
+        """Form the BIDS events from the combined data frame of all NWB time intervals and their metadata."""
         # Collapse 'start_time' and 'stop_time' columns into 'onset' and 'duration' columns
         bids_events_data_frame = nwb_events_data_frame.copy()
         bids_events_data_frame["duration"] = bids_events_data_frame["stop_time"] - bids_events_data_frame["start_time"]
@@ -59,7 +70,15 @@ class Events(BaseMetadataModel):
         bids_events_data_frame = bids_events_data_frame.sort_values(
             by=["onset", "duration"], ascending=[True, False]
         ).reset_index(drop=True)
+        return cls._from_bids_events_data_frame(
+            bids_events_data_frame=bids_events_data_frame, bids_events_metadata=bids_events_metadata
+        )
 
+    @classmethod
+    def _from_bids_events_data_frame(
+        cls, bids_events_data_frame: pandas.DataFrame, bids_events_metadata: dict | None
+    ) -> typing_extensions.Self:
+        """Form the BIDS events from the data frame of their rows, as written to TSV, and their metadata."""
         dictionary: dict[str, typing.Any] = {
             "onset": bids_events_data_frame["onset"].tolist(),
             "duration": bids_events_data_frame["duration"].tolist(),
@@ -69,7 +88,7 @@ class Events(BaseMetadataModel):
 
         bids_events = cls(**dictionary)
         bids_events._bids_events_data_frame = bids_events_data_frame
-        bids_events._nwbfiles = nwbfiles
+        bids_events._bids_events_metadata = bids_events_metadata
         return bids_events
 
     @pydantic.validate_call
@@ -122,10 +141,8 @@ class Events(BaseMetadataModel):
             raise NotImplementedError(message)
         file_path = pathlib.Path(file_path)
 
-        fields_metadata = _get_events_metadata(nwbfile=self._nwbfiles[0])
-
         with file_path.open(mode="w") as file_stream:
-            json.dump(obj=fields_metadata, fp=file_stream, indent=4)
+            json.dump(obj=self._bids_events_metadata, fp=file_stream, indent=4)
 
 
 def _get_all_time_intervals(
@@ -0,0 +1,466 @@
+"""
+Metadata extraction by walking the HDF5 layout of NWB files directly, without constructing any PyNWB objects.
+
+Only the parts of the NWB schema needed for the BIDS metadata are read, such as `/general/subject`,
+`/general/extracellular_ephys/electrodes`, and the `TimeIntervals` tables. Any layout this engine does not handle
+raises an `_UnsupportedLayoutError`, upon which the caller falls back to a full read through PyNWB.
+"""
+
+import collections
+import pathlib
+import typing
+import warnings
+
+import h5py
+import numpy
+import pandas
+
+from ._channels import Channel, ChannelTable
+from ._electrodes import _NULL_LOCATION_PLACEHOLDERS, Electrode, ElectrodeTable
+from ._events import Events
+from ._general_metadata import GeneralMetadata
+from ._participant import Participant
+from ._probes import Probe, ProbeTable
+from .._tools import IoProfile, is_hdf5_file, open_h5py_file
+from ..notifications import Notification
+
+_SUPPORTED_NAMESPACES = {"core", "hdmf-common", "hdmf-experimental"}
+_ELECTRICAL_SERIES_TYPES = {"ElectricalSeries", "SpikeEventSeries"}
+_ELECTRODES_TABLE_PATH = "/general/extracellular_ephys/electrodes"
+# The order in which PyNWB constructs the top-level fields of an NWBFile that may contain dynamic tables
+_PYNWB_TOP_LEVEL_ORDER = ("acquisition", "analysis", "stimulus", "processing", "intervals", "scratch")
+
+
+class _UnsupportedLayoutError(Exception):
+    """Raised when an NWB file uses a layout that the h5py engine does not handle."""
+
+
+def _decode(value: typing.Any) -> typing.Any:
+    if isinstance(value, bytes):
+        return value.decode("utf-8")
+    return value
+
+
+def _read_string(group: h5py.Group, name: str) -> str | None:
+    """Read a scalar string dataset, or return None if it does not exist."""
+    dataset = group.get(name, None)
+    if dataset is None:
+        return None
+    if not isinstance(dataset, h5py.Dataset) or dataset.shape != ():
+        raise _UnsupportedLayoutError(f"Expected '{name}' in '{group.name}' to be a scalar dataset.")
+
+    return _decode(dataset[()])
+
+
+def _read_column(dataset: h5py.Dataset) -> list[typing.Any]:
+    """Read all values of a plain table column in the same form as `DynamicTable.to_dataframe`."""
+    neurodata_type = _decode(dataset.attrs.get("neurodata_type", "VectorData"))
+    if neurodata_type != "VectorData" or dataset.dtype.names is not None or h5py.check_ref_dtype(dataset.dtype):
+        raise _UnsupportedLayoutError(f"The column '{dataset.name}' is not a plain `VectorData`.")
+    if h5py.check_string_dtype(dataset.dtype) is not None:
+        return list(dataset.asstr()[:])
+
+    # Multidimensional columns become one array per row
+    values = dataset[:]
+    if values.ndim > 1:
+        return list(values)
+    return values.tolist() if values.dtype == object else list(values)
+
+
+class _H5pyNwbFile:
+    """A single NWB file opened through h5py, along with an index of its neurodata objects by type."""
+
+    def __init__(self, file_path: pathlib.Path, io_profile: IoProfile = "local") -> None:
+        # Same as the `container_source` of an NWBFile read through `cache_read_nwb`
+        self.source = str(file_path.resolve())
+        self.h5py_file = open_h5py_file(file_path=self.source, io_profile=io_profile)
+        self.neurodata_type_to_objects: dict[str, list[h5py.HLObject]] = collections.defaultdict(list)
+
+        # The caller never receives the instance if indexing fails, so the file must be closed here
+        try:
+            self._index_neurodata_objects()
+        except BaseException:  # noqa
+            self.close()
+            raise
+
+    def _index_neurodata_objects(self) -> None:
+        if _decode(self.h5py_file.attrs.get("neurodata_type", None)) != "NWBFile":
+            raise _UnsupportedLayoutError("The root of the file is not an `NWBFile`.")
+
+        # Cached specifications can be large, and are never neurodata objects themselves
+        for name, h5py_object in self.h5py_file.items():
+            if name == "specifications":
+                continue
+            self._index_neurodata_object(name=name, h5py_object=h5py_object)
+            if isinstance(h5py_object, h5py.Group):
+                h5py_object.visititems(self._index_neurodata_object)
+
+    def _index_neurodata_object(self, name: str, h5py_object: h5py.HLObject) -> None:
+        neurodata_type = _decode(h5py_object.attrs.get("neurodata_type", None))
+        if neurodata_type is None:
+            return
+
+        # Types from extensions may subclass core types, which only PyNWB can resolve from the cached namespaces
+        namespace = _decode(h5py_object.attrs.get("namespace", None))
+        if namespace not in _SUPPORTED_NAMESPACES:
+            raise _UnsupportedLayoutError(f"The neurodata type '{neurodata_type}' is from namespace '{namespace}'.")
+
+        self.neurodata_type_to_objects[neurodata_type].append(h5py_object)
+
+    def get_objects(self, neurodata_types: set[str]) -> list[h5py.HLObject]:
+        return [
+            h5py_object
+            for neurodata_type, h5py_objects in self.neurodata_type_to_objects.items()
+            if neurodata_type in neurodata_types
+            for h5py_object in h5py_objects
+        ]
+
+    def close(self) -> None:
+        self.h5py_file.close()
+
+
+def _get_device(electrode_group: h5py.Group) -> h5py.Group:
+    """Follow the link from an electrode group to its device."""
+    link = electrode_group.get("device", getlink=True)
+    if not isinstance(link, (h5py.SoftLink, h5py.HardLink)):
+        raise _UnsupportedLayoutError(f"The device of '{electrode_group.name}' is not stored within the same file.")
+
+    device = electrode_group["device"]
+    # Devices linked to a `DeviceModel` may store their manufacturer there instead
+    if "model" in device:
+        raise _UnsupportedLayoutError(f"The device '{device.name}' links to a `DeviceModel`.")
+    return device
+
+
+def _get_device_name(electrode_group: h5py.Group) -> str:
+    """Return the name of the device an electrode group links to, rather than the name of the link itself."""
+    link = electrode_group.get("device", getlink=True)
+    if isinstance(link, h5py.SoftLink):
+        return link.path.rsplit("/", maxsplit=1)[-1]
+    return electrode_group["device"].name.rsplit("/", maxsplit=1)[-1]
+
+
+def _read_electrodes_table(nwb_file: _H5pyNwbFile) -> dict[str, list[typing.Any]] | None:
+    """Read the columns of the electrodes table used for BIDS metadata, or return None if there is no table."""
+    electrodes_table = nwb_file.h5py_file.get(_ELECTRODES_TABLE_PATH, None)
+    if electrodes_table is None:
+        return None
+
+    column_names = [_decode(column_name) for column_name in electrodes_table.attrs.get("colnames", [])]
+    used_column_names = ["group", "x", "y", "z", "imp", "location", "channel_name", "inter_sample_shift"]
+    columns: dict[str, list[typing.Any]] = {"id": list(electrodes_table["id"][:])}
+    for column_name in used_column_names:
+        if column_name not in column_names:
+            continue
+        if f"{column_name}_index" in electrodes_table:
+            raise _UnsupportedLayoutError(f"The electrodes column '{column_name}' is ragged.")
+        if column_name == "group":
+            columns["group"] = [nwb_file.h5py_file[reference] for reference in electrodes_table["group"][:]]
+            continue
+        columns[column_name] = _read_column(dataset=electrodes_table[column_name])
+
+    return columns
+
+
+def _has_icephys_electrodes(nwb_file: _H5pyNwbFile) -> bool:
+    return len(nwb_file.get_objects(neurodata_types={"IntracellularElectrode"})) > 0
+
+
+def _extract_participant(nwb_file: _H5pyNwbFile) -> Participant:
+    """Mirrors `Participant.from_nwbfiles` for a single file."""
+    file_paths = [nwb_file.source]
+
+    subject = nwb_file.h5py_file.get("general/subject", None)
+    if subject is None:
+        notification = Notification.from_definition(identifier="MissingParticipant", source_file_paths=file_paths)
+        return Participant(notifications=[notification], participant_id="0")
+
+    participant = Participant(
+        participant_id=_read_string(group=subject, name="subject_id"),
+        species=_read_string(group=subject, name="species"),
+        sex=_read_string(group=subject, name="sex"),
+        strain=_read_string(group=subject, name="strain"),
+        notifications=[],
+    )
+    participant._check_fields(file_paths=file_paths)
+    return participant
+
+
+def _extract_general_metadata(nwb_file: _H5pyNwbFile, electrodes: dict[str, list] | None) -> GeneralMetadata:
+    """Mirrors `GeneralMetadata.from_nwbfiles` for a single file."""
+    dictionary: dict[str, str | int | float | None] = {
+        "PowerLineFrequency": "n/a",
+        "SamplingFrequency": -1.0,
+        "SoftwareFilters": "n/a",
+    }
+
+    institution = _read_string(group=nwb_file.h5py_file["general"], name="institution")
+    if institution is not None:
+        dictionary["InstitutionName"] = institution
+
+    acquisition = nwb_file.h5py_file.get("acquisition", dict())
+    all_acquisition_electrical_series = [
+        series
+        for series in acquisition.values()
+        if _decode(series.attrs.get("neurodata_type", None)) in _ELECTRICAL_SERIES_TYPES
+    ]
+    if len(all_acquisition_electrical_series) != 1:
+        return GeneralMetadata(**dictionary)
+    electrical_series = all_acquisition_electrical_series[0]
+
+    rate = electrical_series["starting_time"].attrs["rate"] if "starting_time" in electrical_series else None
+    if rate is not None:
+        dictionary["SamplingFrequency"] = rate
+        dictionary["RecordingDuration"] = electrical_series["data"].shape[0] / rate
+
+    region = electrical_series["electrodes"]
+    if electrodes is None or nwb_file.h5py_file[region.attrs["table"]].name != _ELECTRODES_TABLE_PATH:
+        raise _UnsupportedLayoutError(f"The electrodes of '{electrical_series.name}' are not the electrodes table.")
+
+    # PyNWB looks up the group of the first electrode by the label 0, which only succeeds if that is its ID
+    first_row = int(region[0])
+    if electrodes["id"][first_row] != 0:
+        raise _UnsupportedLayoutError("The first electrode of the electrical series does not have the ID 0.")
+
+    electrode_group = electrodes["group"][first_row]
+    device = _get_device(electrode_group=electrode_group)
+    if (manufacturer := _decode(device.attrs.get("manufacturer", None))) is not None and manufacturer != "":
+        dictionary["Manufacturer"] = manufacturer
+    if (model_number := _decode(device.attrs.get("model_number", None))) is not None and model_number != "":
+        dictionary["ManufacturersModelVersion"] = model_number
+
+    brain_region = _decode(electrode_group.attrs.get("location", None))
+    if brain_region is not None and brain_region not in ["", "unknown", "n/a"]:
+        dictionary["BodyPart"] = "BRAIN"
+        dictionary["BodyPartDetails"] = brain_region
+
+    return GeneralMetadata(**dictionary)
+
+
+def _extract_probe_table(
+    nwb_file: _H5pyNwbFile, electrodes: dict[str, list] | None, probe_name: str | None
+) -> ProbeTable | None:
+    """Mirrors `ProbeTable.from_nwbfiles` for a single file with only extracellular electrodes."""
+    if electrodes is None:
+        return None
+
+    name_to_device = {
+        _get_device_name(electrode_group=electrode_group): _get_device(electrode_group=electrode_group)
+        for electrode_group in electrodes["group"]
+    }
+
+    parts = probe_name.split("/", maxsplit=1) if probe_name else []
+    model_from_flag = parts[1] if len(parts) == 2 and parts[0] and parts[1] else None
+
+    probes = [
+        Probe(
+            probe_name=device_name,
+            type="n/a",
+            manufacturer=_decode(device.attrs.get("manufacturer", None)),
+            description=_decode(device.attrs.get("description", None)),
+            model=model_from_flag,
+        )
+        for device_name, device in name_to_device.items()
+    ]
+    return ProbeTable(probes=probes, modality="ecephys")
+
+
+def _extract_electrode_table(electrodes: dict[str, list] | None) -> ElectrodeTable | None:
+    """Mirrors `ElectrodeTable.from_nwbfiles` for a single file with only extracellular electrodes."""
+    if electrodes is None:
+        return None
+
+    electrode_models = []
+    for row, electrode_id in enumerate(electrodes["id"]):
+        electrode_group = electrodes["group"][row]
+        impedance_in_ohms = electrodes["imp"][row] if "imp" in electrodes else numpy.nan
+        location = str(electrodes["location"][row])
+        electrode_models.append(
+            Electrode(
+                name=f"e{str(electrode_id).zfill(3)}",
+                probe_name=_get_device_name(electrode_group=electrode_group),
+                x=electrodes["x"][row] if "x" in electrodes else numpy.nan,
+                y=electrodes["y"][row] if "y" in electrodes else numpy.nan,
+                z=electrodes["z"][row] if "z" in electrodes else numpy.nan,
+                # Impedance must be in kOhms for BEP32 but NWB specifies Ohms
+                impedance=impedance_in_ohms / 1e3 if not pandas.isna(impedance_in_ohms) else numpy.nan,
+                shank_id=electrode_group.name.rsplit("/", maxsplit=1)[-1],
+                location="n/a" if location in _NULL_LOCATION_PLACEHOLDERS else location,
+            )
+        )
+    return ElectrodeTable(electrodes=electrode_models, modality="ecephys")
+
+
+def _extract_channel_table(nwb_file: _H5pyNwbFile, electrodes: dict[str, list] | None) -> ChannelTable | None:
+    """Mirrors `ChannelTable.from_nwbfiles` for a single file with only extracellular electrodes."""
+    if electrodes is None:
+        return None
+
+    # PyNWB looks up the shift of each electrode by the label 0, which only succeeds if that is its ID
+    if "inter_sample_shift" in electrodes and any(electrode_id != 0 for electrode_id in electrodes["id"]):
+        raise _UnsupportedLayoutError("The electrodes table has an `inter_sample_shift` column with nonzero IDs.")
+
+    sampling_frequency = -1.0
+    stream_id = None
+    gain = None
+    all_electrical_series = nwb_file.get_objects(neurodata_types=_ELECTRICAL_SERIES_TYPES)
+    if len(all_electrical_series) > 1:
+        message = (
+            "Support for automatic extraction of rates/gains from multiple ElectricalSeries is not yet "
+            "implemented. Skipping `sampling_frequency`, `stream_id`, and `gain` extraction."
+        )
+        warnings.warn(message=message, stacklevel=2)
+
+    if len(all_electrical_series) == 1:
+        electrical_series = all_electrical_series[0]
+        rate = electrical_series["starting_time"].attrs["rate"] if "starting_time" in electrical_series else None
+        if rate is None:
+            message = (
+                "Support for automatic extraction of rate from ElectricalSeries with timestamps "
+                "is not yet implemented. Skipping `sampling_frequency`, `stream_id`, and `gain` extraction."
+            )
+            warnings.warn(message=message, stacklevel=2)
+
+        sampling_frequency = rate
+        stream_id = electrical_series.name.rsplit("/", maxsplit=1)[-1]
+        gain = electrical_series["data"].attrs.get("conversion", 1.0)
+
+    channels = [
+        Channel(
+            name=(
+                f"{electrodes['channel_name'][row]}"
+                if "channel_name" in electrodes
+                else f"ch{str(electrode_id).zfill(3)}"
+            ),
+            electrode_name=f"e{str(electrode_id).zfill(3)}",
+            type="n/a",
+            units="V",
+            sampling_frequency=sampling_frequency,
+            stream_id=stream_id,
+            gain=gain,
+            time_offset=electrodes["inter_sample_shift"][row] if "inter_sample_shift" in electrodes else None,
+        )
+        for row, electrode_id in enumerate(electrodes["id"])
+    ]
+    return ChannelTable(channels=channels, modality="ecephys")
+
+
+def _get_pynwb_object_order(h5py_object: h5py.HLObject) -> tuple[int, tuple[str, ...]]:
+    """
+    Sort key reproducing the reverse order of the `objects` of an NWBFile read through PyNWB.
+
+    PyNWB collects objects by a depth-first search that pops the children of each container in reverse order of
+    construction, which for files read from disk is alphabetical within each group after the top-level fields.
+    """
+    top_level_name, *remaining_parts = h5py_object.name.strip("/").split("/")
+    if top_level_name not in _PYNWB_TOP_LEVEL_ORDER:
+        raise _UnsupportedLayoutError(f"Unexpected location of '{h5py_object.name}'.")
+    return _PYNWB_TOP_LEVEL_ORDER.index(top_level_name), tuple(remaining_parts)
+
+
+def _extract_events(nwb_file: _H5pyNwbFile) -> Events | None:
+    """Mirrors `Events.from_nwbfiles` for a single file."""
+    time_intervals = nwb_file.get_objects(neurodata_types={"TimeIntervals"})
+    if len(time_intervals) == 0:
+        return None
+
+    time_intervals.sort(key=_get_pynwb_object_order, reverse=True)
+    time_interval_names = [time_interval.name.rsplit("/", maxsplit=1)[-1] for time_interval in time_intervals]
+    if len(set(time_interval_names)) != len(time_interval_names):
+        raise _UnsupportedLayoutError("Duplicate time interval names are reported through PyNWB instead.")
+
+    all_column_names = [
+        [_decode(column_name) for column_name in time_interval.attrs.get("colnames", [])]
+        for time_interval in time_intervals
+    ]
+    if any("nwb_table" in column_names for column_names in all_column_names):
+        raise _UnsupportedLayoutError("The reserved column 'nwb_table' is reported through PyNWB instead.")
+
+    # Index columns are datasets of the table just like the columns they index, so these are all true column names
+    true_column_names = {name for time_interval in time_intervals for name in time_interval.keys() if name != "id"}
+    skip_columns = {
+        skipped_column_name
+        for column_name in true_column_names
+        if f"{column_name}_index" in true_column_names
+        for skipped_column_name in (column_name, f"{column_name}_index")
+    }
+
+    all_data_frames = []
+    events_metadata: dict[str, typing.Any] = {
+        "onset": {"Description": "Onset of the event, measured from the beginning of the acquisition.", "Units": "s"},
+        "duration": {"Description": "Duration of the event (measured from onset).", "Units": "s"},
+    }
+    for time_interval, time_interval_name, column_names in zip(time_intervals, time_interval_names, all_column_names):
+        data_frame_columns = {"id": list(time_interval["id"][:])}
+        for column_name in column_names:
+            if column_name in skip_columns:
+                continue
+            dataset = time_interval[column_name]
+            data_frame_columns[column_name] = _read_column(dataset=dataset)
+            if column_name not in {"start_time", "stop_time"}:
+                events_metadata[column_name] = {"Description": _decode(dataset.attrs.get("description", None))}
+
+        data_frame = pandas.DataFrame(data=data_frame_columns).set_index("id")
+        data_frame["nwb_table"] = time_interval_name
+        all_data_frames.append(data_frame)
+
+    nwb_events_data_frame = pandas.concat(objs=all_data_frames, ignore_index=True)
+
+    common_nwb_table_hed = {"trials": "Experimental-trial", "epochs": "Time-block"}
+    events_metadata["nwb_table"] = {
+        "Description": "The name of the NWB table from which this event was extracted.",
+        "Levels": {name: f"The '{name}' table in the NWB file." for name in time_interval_names},
+        "HED": {name: common_nwb_table_hed.get(name, "Time-interval") for name in time_interval_names},
+    }
+    for time_interval, time_interval_name in zip(time_intervals, time_interval_names):
+        if description := _decode(time_interval.attrs.get("description", None)):
+            events_metadata[time_interval_name] = {"Description": description}
+
+    return Events._from_events_data_frame(
+        nwb_events_data_frame=nwb_events_data_frame, bids_events_metadata=events_metadata
+    )
+
+
+def _extract_with_h5py(
+    nwbfile_path: pathlib.Path, probe_name: str | None, io_profile: IoProfile = "local"
+) -> dict[str, typing.Any]:
+    """
+    Extract the fields of a `BidsSessionMetadata` from a single NWB file using only h5py.
+
+    Raises
+    ------
+    _UnsupportedLayoutError
+        If the file uses any layout that this engine does not handle.
+    """
+    if not is_hdf5_file(file_path=nwbfile_path.resolve()):
+        raise _UnsupportedLayoutError("The file is not an HDF5 file.")
+
+    nwb_file = _H5pyNwbFile(file_path=nwbfile_path, io_profile=io_profile)
+    try:
+        if _has_icephys_electrodes(nwb_file=nwb_file):
+            raise _UnsupportedLayoutError("Intracellular electrodes are only extracted through PyNWB.")
+
+        electrodes = _read_electrodes_table(nwb_file=nwb_file)
+        all_electrical_series = nwb_file.get_objects(neurodata_types=_ELECTRICAL_SERIES_TYPES)
+        units_tables = [
+            h5py_object
+            for h5py_object in nwb_file.get_objects(neurodata_types={"Units"})
+            if h5py_object.name == "/units" or h5py_object.parent.parent.name == "/processing"
+        ]
+        dictionary = {
+            "session_id": _read_string(group=nwb_file.h5py_file["general"], name="session_id"),
+            "participant": _extract_participant(nwb_file=nwb_file),
+            "general_metadata": _extract_general_metadata(nwb_file=nwb_file, electrodes=electrodes),
+            "events": _extract_events(nwb_file=nwb_file),
+            "probe_table": _extract_probe_table(nwb_file=nwb_file, electrodes=electrodes, probe_name=probe_name),
+            "electrode_table": _extract_electrode_table(electrodes=electrodes),
+            "channel_table": _extract_channel_table(nwb_file=nwb_file, electrodes=electrodes),
+            "has_units_table": len(units_tables) > 0,
+            "has_electrical_series_in_acquisition": any(
+                series.parent.name == "/acquisition" for series in all_electrical_series
+            ),
+        }
+    finally:
+        nwb_file.close()
+
+    return dictionary
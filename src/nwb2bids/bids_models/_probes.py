@@ -1,5 +1,8 @@
+import contextlib
 import json
+import os
 import pathlib
+import threading
 import typing
 import warnings
 
@@ -18,6 +21,48 @@ from ._model_utils import _build_json_sidecar
 from ..bids_models._base_metadata_model import BaseMetadataContainerModel, BaseMetadataModel
 from ..notifications import Notification
 
+# Successful lookups of the ProbeInterface library, kept only while at least one `cache_probe_lookups` is entered
+_probe_lookup_cache: dict[str, typing.Any] = dict()
+_probe_lookup_cache_depth = 0
+_probe_lookup_cache_lock = threading.Lock()
+
+
+@contextlib.contextmanager
+def cache_probe_lookups() -> typing.Iterator[None]:
+    """
+    Reuse the probes fetched from the ProbeInterface library for the duration of the context.
+
+    Contexts may be nested (such as a conversion run within a long-running service), and the cache is cleared once
+    the outermost one exits. Failed lookups are never cached.
+    """
+    global _probe_lookup_cache_depth
+    with _probe_lookup_cache_lock:
+        _probe_lookup_cache_depth += 1
+    try:
+        yield
+    finally:
+        with _probe_lookup_cache_lock:
+            _probe_lookup_cache_depth -= 1
+            if _probe_lookup_cache_depth == 0:
+                _probe_lookup_cache.clear()
+
+
+def _lookup_probe_data(term_url: str) -> typing.Any | None:
+    """Fetch the JSON of a probe from the ProbeInterface library, or return None if it could not be found."""
+    with _probe_lookup_cache_lock:
+        if term_url in _probe_lookup_cache:
+            return _probe_lookup_cache[term_url]
+
+    http_response = requests.get(term_url)
+    if not http_response.ok:
+        return None
+    probe_data = http_response.json()
+
+    with _probe_lookup_cache_lock:
+        if _probe_lookup_cache_depth > 0:
+            _probe_lookup_cache[term_url] = probe_data
+    return probe_data
+
 
 class Probe(BaseMetadataModel):
     probe_name: str = pydantic.Field(
@@ -350,17 +395,19 @@ class ProbeTable(BaseMetadataContainerModel):
             f"https://raw.githubusercontent.com/SpikeInterface/probeinterface_library"
             f"/refs/heads/main/{manufacturer}/{model}/{model}.json"
         )
-        http_response = requests.get(term_url)
-        if not http_response.ok:
+        probe_data = _lookup_probe_data(term_url=term_url)
+        if probe_data is None:
             notification = Notification.from_definition(identifier="ProbeNotFound")
             self._internal_notifications.append(notification)
             return None, None
-        probe_data = http_response.json()
 
         probes_directory = bids_directory / "probes"
         probes_directory.mkdir(exist_ok=True)
         output_path = probes_directory / f"{model}.json"
-        with output_path.open(mode="w") as file_stream:
+        # Sessions sharing a probe are written concurrently, so replace the file atomically rather than in place
+        temporary_output_path = output_path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with temporary_output_path.open(mode="w") as file_stream:
             json.dump(obj=probe_data, fp=file_stream, indent=4)
+        os.replace(src=temporary_output_path, dst=output_path)
 
         return term_url, model
@@ -222,6 +222,62 @@ notification_definitions.update(
             "category": Category.INTERNAL_ERROR,
             "severity": Severity.ERROR,
         },
+        "SessionExtractionFailure": {
+            "title": "Failed to extract metadata for a session",
+            "reason": (
+                "An error occurred while extracting the metadata of this session, so it was skipped and is not "
+                "included in the dataset-level files."
+            ),
+            "solution": (
+                "Review the traceback for issues with the source NWB files. If these appear valid, please raise an "
+                "issue on `nwb2bids`: https://github.com/con/nwb2bids/issues."
+            ),
+            "category": Category.INTERNAL_ERROR,
+            "severity": Severity.ERROR,
+        },
+        "SessionExtractionTimeout": {
+            "title": "Timed out extracting metadata for a session",
+            "reason": (
+                "Extracting the metadata of this session took longer than the session timeout, so its worker process "
+                "was killed and the session is not included in the dataset-level files. This is usually caused by a "
+                "read that hangs on an unresponsive network filesystem or remote server."
+            ),
+            "solution": (
+                "Check that the source NWB files are accessible, then convert again, increasing the session timeout if "
+                "the files are simply very large."
+            ),
+            "category": Category.INTERNAL_ERROR,
+            "severity": Severity.ERROR,
+        },
+        "SessionExtractionWorkerFailure": {
+            "title": "A worker process crashed while extracting metadata for a session",
+            "reason": (
+                "The worker process extracting the metadata of this session exited without reporting a result, so the "
+                "session is not included in the dataset-level files. This is usually caused by running out of memory "
+                "or by a crash within a compiled library such as HDF5."
+            ),
+            "solution": (
+                "Check the memory available to each worker and the standard error of the run, then convert again. If "
+                "the worker keeps crashing on the same files, please raise an issue on `nwb2bids`: "
+                "https://github.com/con/nwb2bids/issues."
+            ),
+            "category": Category.INTERNAL_ERROR,
+            "severity": Severity.ERROR,
+        },
+        "SessionConversionFailure": {
+            "title": "Failed to convert a session",
+            "reason": (
+                "An error occurred while writing this session to the BIDS dataset, so it may be only partially written "
+                "and is not included in the dataset-level files."
+            ),
+            "solution": (
+                "Review the traceback for issues with the source NWB files, then remove the partially written session "
+                "directory and convert again. If the files appear valid, please raise an issue on `nwb2bids`: "
+                "https://github.com/con/nwb2bids/issues."
+            ),
+            "category": Category.INTERNAL_ERROR,
+            "severity": Severity.ERROR,
+        },
     }
 )
 
@@ -37,6 +37,20 @@ def pytest_report_header(config: pytest.Config) -> str | None:
     return None
 
 
+@pytest.fixture(scope="session", autouse=True)
+def temporary_home_directory(tmp_path_factory: pytest.TempPathFactory) -> typing.Iterator[pathlib.Path]:
+    """
+    Point the home directory, and with it the default cache directory (`~/.nwb2bids`), at a temporary directory.
+
+    Keeps the file index, metadata cache, and session timings written by tests out of those of the user.
+    """
+    home_directory = tmp_path_factory.mktemp("home")
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setenv("HOME", str(home_directory))
+        monkeypatch.setenv("USERPROFILE", str(home_directory))
+        yield home_directory
+
+
 @pytest.fixture(scope="session")
 def container_image(request: pytest.FixtureRequest) -> str | None:
     """Returns the container image specified via --container-image, or None."""
@@ -103,6 +117,24 @@ def temporary_bids_directory(temporary_run_directory: pathlib.Path) -> pathlib.P
     return bids_directory
 
 
+@pytest.fixture(scope="session")
+def get_bids_file_paths() -> Callable[[pathlib.Path], set[pathlib.Path]]:
+    """
+    Returns a function listing the paths of all files and directories of a BIDS dataset, relative to its root.
+
+    The run state kept under `.nwb2bids` is excluded, so that datasets written by different runs can be compared.
+    """
+
+    def get(bids_directory: pathlib.Path) -> set[pathlib.Path]:
+        return {
+            file_path.relative_to(bids_directory)
+            for file_path in bids_directory.rglob(pattern="*")
+            if ".nwb2bids" not in file_path.relative_to(bids_directory).parts
+        }
+
+    return get
+
+
 @pytest.fixture(scope="session")
 def testing_files_directory(tmp_path_factory: pytest.TempPathFactory) -> pathlib.Path:
     """
@@ -633,8 +633,10 @@ def test_ecephys_convert_with_space_paxinos_watson(
     ["units_only_nwbfile_path", "units_in_processing_nwbfile_path"],
     ids=["top_level_units", "processing_module_units"],
 )
+@pytest.mark.parametrize("streaming", [False, True], ids=["batch", "streaming"])
 def test_units_without_electrodes_writes_derivative(
     nwbfile_fixture: str,
+    streaming: bool,
     request: pytest.FixtureRequest,
     temporary_bids_directory: pathlib.Path,
 ):
@@ -642,9 +644,13 @@ def test_units_without_electrodes_writes_derivative(
     When an NWB file has a units table but no electrodes table, the entire dataset must be
     written as a BIDS derivative: all sub- folders go under derivatives/nwb2bids/ and
     dataset_description.json must contain DatasetType 'derivative'.
+
+    When streaming, this is decided up front by the pre-classification pass instead.
     """
     nwbfile_path = request.getfixturevalue(nwbfile_fixture)
-    run_config = nwb2bids.RunConfig(bids_directory=temporary_bids_directory, use_session_labels=True)
+    run_config = nwb2bids.RunConfig(
+        bids_directory=temporary_bids_directory, use_session_labels=True, use_cache=False, streaming=streaming
+    )
     dataset_converter = nwb2bids.convert_nwb_dataset(nwb_paths=[nwbfile_path], run_config=run_config)
     assert not any(dataset_converter.notifications)
 
@@ -664,7 +670,9 @@ def test_units_without_electrodes_writes_derivative(
     assert sub_dirs_in_derivatives, "Expected at least one sub- directory inside derivatives/nwb2bids"
 
 
+@pytest.mark.parametrize("streaming", [False, True], ids=["batch", "streaming"])
 def test_units_with_raw_electrical_series_writes_raw(
+    streaming: bool,
     units_with_raw_electrical_series_nwbfile_path: pathlib.Path,
     temporary_bids_directory: pathlib.Path,
 ):
@@ -673,7 +681,9 @@ def test_units_with_raw_electrical_series_writes_raw(
     the dataset must NOT be treated as a derivative: sub- folders appear at the root and
     dataset_description.json must have DatasetType 'raw'.
     """
-    run_config = nwb2bids.RunConfig(bids_directory=temporary_bids_directory, use_session_labels=True)
+    run_config = nwb2bids.RunConfig(
+        bids_directory=temporary_bids_directory, use_session_labels=True, use_cache=False, streaming=streaming
+    )
     dataset_converter = nwb2bids.convert_nwb_dataset(
         nwb_paths=[units_with_raw_electrical_series_nwbfile_path], run_config=run_config
     )
@@ -0,0 +1,60 @@
+"""Integration tests for the primary `reindex_bids_dataset` function."""
+
+import json
+import pathlib
+import shutil
+
+import pandas
+
+import nwb2bids
+
+
+def test_reindex_bids_dataset(directory_with_multiple_nwbfiles: pathlib.Path, temporary_bids_directory: pathlib.Path):
+    run_config = nwb2bids.RunConfig(
+        bids_directory=temporary_bids_directory,
+        use_session_labels=True,
+        sanitization_config=nwb2bids.sanitization.SanitizationConfig(ses_labels=True),
+    )
+    nwb2bids.convert_nwb_dataset(nwb_paths=[directory_with_multiple_nwbfiles], run_config=run_config)
+
+    participants_tsv_file_path = temporary_bids_directory / "participants.tsv"
+    participants_json_file_path = temporary_bids_directory / "participants.json"
+    sessions_tsv_file_path = temporary_bids_directory / "sub-123" / "sub-123_sessions.tsv"
+    sessions_json_file_path = temporary_bids_directory / "sub-123" / "sub-123_sessions.json"
+    original_participants = pandas.read_csv(filepath_or_buffer=participants_tsv_file_path, sep="\t", dtype=str)
+    original_sessions = pandas.read_csv(filepath_or_buffer=sessions_tsv_file_path, sep="\t", dtype=str)
+    original_participants_json = json.loads(participants_json_file_path.read_text())
+    assert list(original_sessions["session_id"]) == ["ses-session+0", "ses-session+1"]
+
+    # Reindexing an untouched dataset should reproduce the same tables
+    nwb2bids.reindex_bids_dataset(bids_directory=temporary_bids_directory)
+    pandas.testing.assert_frame_equal(
+        left=pandas.read_csv(filepath_or_buffer=participants_tsv_file_path, sep="\t", dtype=str),
+        right=original_participants,
+    )
+    pandas.testing.assert_frame_equal(
+        left=pandas.read_csv(filepath_or_buffer=sessions_tsv_file_path, sep="\t", dtype=str), right=original_sessions
+    )
+    assert json.loads(participants_json_file_path.read_text()) == original_participants_json
+
+    # Manual edits: annotate the participant, remove a session, and add a session by hand
+    edited_participants = original_participants.assign(age="P90D")
+    edited_participants.to_csv(path_or_buf=participants_tsv_file_path, index=False, sep="\t")
+    shutil.rmtree(temporary_bids_directory / "sub-123" / "ses-session+0")
+    (temporary_bids_directory / "sub-123" / "ses-extra").mkdir()
+
+    nwb2bids.reindex_bids_dataset(bids_directory=temporary_bids_directory)
+
+    participants = pandas.read_csv(filepath_or_buffer=participants_tsv_file_path, sep="\t", dtype=str)
+    pandas.testing.assert_frame_equal(left=participants, right=edited_participants)
+
+    sessions = pandas.read_csv(filepath_or_buffer=sessions_tsv_file_path, sep="\t", dtype=str, keep_default_na=False)
+    assert list(sessions["session_id"]) == ["ses-extra", "ses-session+1"]
+    assert list(sessions["original_session_id"]) == ["n/a", "ses-session-1"]
+    assert set(json.loads(sessions_json_file_path.read_text())) == {"session_id", "original_session_id"}
+
+    # Once no subjects remain, neither do the tables listing them
+    shutil.rmtree(temporary_bids_directory / "sub-123")
+    nwb2bids.reindex_bids_dataset(bids_directory=temporary_bids_directory)
+    assert not participants_tsv_file_path.exists()
+    assert not participants_json_file_path.exists()
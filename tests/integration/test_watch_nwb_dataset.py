@@ -0,0 +1,75 @@
+"""Integration tests for the `watch_nwb_dataset` function."""
+
+import os
+import pathlib
+import shutil
+import threading
+
+import pandas
+import pytest
+
+import nwb2bids
+
+
+@pytest.mark.parametrize("use_polling", [False, True])
+def test_watch_nwb_dataset(
+    directory_with_mixed_session_counts: pathlib.Path,
+    temporary_run_directory: pathlib.Path,
+    temporary_bids_directory: pathlib.Path,
+    use_polling: bool,
+):
+    staging_directory = temporary_run_directory / "staging"
+    staging_directory.mkdir()
+    for file_name in ["subX_X1.nwb", "subX_X2.nwb"]:
+        shutil.copy(src=directory_with_mixed_session_counts / file_name, dst=staging_directory / file_name)
+        os.utime(path=staging_directory / file_name, times=(0, 0))
+
+    run_config = nwb2bids.RunConfig(bids_directory=temporary_bids_directory, use_session_labels=True, silent=True)
+    watching = nwb2bids.watch_nwb_dataset(
+        nwb_paths=[staging_directory],
+        run_config=run_config,
+        settle_seconds=1.0,
+        poll_interval=0.1,
+        use_polling=use_polling,
+    )
+    try:
+        # Files already present are converted once observed again unchanged
+        dataset_converter = next(watching)
+        assert {session_converter.session_id for session_converter in dataset_converter.session_converters} == {
+            "X1",
+            "X2",
+        }
+        assert dataset_converter._completed_session_ids == set()
+
+        # A file arriving is only converted once it has stopped being written to
+        source_file_path = directory_with_mixed_session_counts / "subY_Y1.nwb"
+        arriving_file_path = staging_directory / "subY_Y1.nwb"
+        content = source_file_path.read_bytes()
+        arriving_file_path.write_bytes(data=content[: len(content) // 2])
+        timer = threading.Timer(interval=0.3, function=arriving_file_path.write_bytes, kwargs={"data": content})
+        timer.start()
+        dataset_converter = next(watching)
+        timer.join()
+        assert dataset_converter._failed_session_ids == set()
+        assert dataset_converter._completed_session_ids == {"X1", "X2"}
+        assert [session_converter.session_id for session_converter in dataset_converter.session_converters] == [
+            "X1",
+            "X2",
+            "Y1",
+        ]
+        assert (temporary_bids_directory / "sub-subY" / "ses-Y1" / "ecephys").is_dir()
+
+        participants = pandas.read_csv(filepath_or_buffer=temporary_bids_directory / "participants.tsv", sep="\t")
+        assert list(participants["participant_id"]) == ["sub-subX", "sub-subY"]
+
+        # Only the session whose file changed is converted again
+        os.utime(path=staging_directory / "subX_X1.nwb", times=(60, 60))
+        dataset_converter = next(watching)
+        assert dataset_converter._completed_session_ids == {"X2", "Y1"}
+    finally:
+        watching.close()
+
+    sessions = pandas.read_csv(
+        filepath_or_buffer=temporary_bids_directory / "sub-subX" / "sub-subX_sessions.tsv", sep="\t"
+    )
+    assert list(sessions["session_id"]) == ["ses-X1", "ses-X2"]
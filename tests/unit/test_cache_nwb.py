@@ -0,0 +1,100 @@
+"""Unit tests for the bounded cache of NWB files opened for reading."""
+
+import pathlib
+
+import py
+
+import nwb2bids
+from nwb2bids._tools import NwbCacheInfo, NwbFileCache, read_nwbfile
+
+
+def test_nwb_file_cache_evicts_and_closes_least_recently_used(
+    minimal_nwbfile_path: pathlib.Path, ecephys_tutorial_nwbfile_path: pathlib.Path
+):
+    nwb_file_cache = NwbFileCache(maxsize=1)
+
+    first_nwbfile = nwb_file_cache(minimal_nwbfile_path)
+    assert nwb_file_cache(minimal_nwbfile_path) is first_nwbfile
+    first_h5py_file = first_nwbfile.get_read_io()._file
+    assert bool(first_h5py_file) is True
+
+    second_nwbfile = nwb_file_cache(ecephys_tutorial_nwbfile_path)
+    assert second_nwbfile.session_id == "A"
+
+    # A closed h5py file evaluates to False
+    assert bool(first_h5py_file) is False
+    assert nwb_file_cache.cache_info() == NwbCacheInfo(hits=1, misses=2, evictions=1, maxsize=1, currsize=1)
+
+    nwb_file_cache.cache_clear()
+    assert nwb_file_cache.cache_info() == NwbCacheInfo(hits=0, misses=0, evictions=0, maxsize=1, currsize=0)
+
+
+def test_nwb_file_cache_never_closes_checked_out_files(
+    minimal_nwbfile_path: pathlib.Path, ecephys_tutorial_nwbfile_path: pathlib.Path
+):
+    nwb_file_cache = NwbFileCache(maxsize=1)
+
+    with nwb_file_cache.checkout(file_path=minimal_nwbfile_path) as first_nwbfile:
+        first_h5py_file = first_nwbfile.get_read_io()._file
+
+        # Neither eviction, nor discarding, nor a change of namespaces closes a file still held by another thread
+        with nwb_file_cache.checkout(file_path=ecephys_tutorial_nwbfile_path) as second_nwbfile:
+            assert nwb_file_cache.cache_info().currsize == 2
+            nwb_file_cache.discard(file_path=ecephys_tutorial_nwbfile_path)
+            nwb_file_cache.configure(maxsize=1, max_memory=None, load_cached_namespaces=False)
+            assert bool(first_h5py_file) is True
+            assert second_nwbfile.session_id == "A"
+        assert bool(second_nwbfile.get_read_io()._file) is False
+        assert bool(first_h5py_file) is True
+        assert first_nwbfile.session_id == "456"
+
+    assert bool(first_h5py_file) is False
+    assert nwb_file_cache.cache_info().currsize == 0
+
+
+def test_nwb_file_cache_memory_budget_keeps_most_recent(
+    minimal_nwbfile_path: pathlib.Path, ecephys_tutorial_nwbfile_path: pathlib.Path
+):
+    nwb_file_cache = NwbFileCache(maxsize=None)
+    nwb_file_cache(minimal_nwbfile_path)
+    nwb_file_cache(ecephys_tutorial_nwbfile_path)
+
+    # Any process exceeds a budget of a single byte, but the most recently read file is never evicted
+    nwb_file_cache.configure(maxsize=None, max_memory=1)
+    cache_info = nwb_file_cache.cache_info()
+
+    if cache_info.evictions == 0:  # The resident memory cannot be determined on this system
+        assert cache_info.currsize == 2
+        return
+    assert cache_info.currsize == 1
+    assert nwb_file_cache(ecephys_tutorial_nwbfile_path).session_id == "A"
+    assert nwb_file_cache.cache_info().hits == 1
+
+
+def test_read_nwbfile_reuses_type_map_for_identical_namespaces(
+    minimal_nwbfile_path: pathlib.Path, ecephys_tutorial_nwbfile_path: pathlib.Path
+):
+    first_nwbfile = read_nwbfile(file_path=minimal_nwbfile_path)
+    second_nwbfile = read_nwbfile(file_path=ecephys_tutorial_nwbfile_path)
+
+    # Both files were written by the same version of PyNWB, so cache identical namespaces
+    first_type_map = first_nwbfile.get_read_io().manager.type_map
+    assert second_nwbfile.get_read_io().manager.type_map is first_type_map
+    assert second_nwbfile.session_id == "A"
+
+    core_nwbfile = read_nwbfile(file_path=ecephys_tutorial_nwbfile_path, load_cached_namespaces=False)
+    assert core_nwbfile.get_read_io().manager.type_map is not first_type_map
+    assert core_nwbfile.session_id == "A"
+
+    for nwbfile in (first_nwbfile, second_nwbfile, core_nwbfile):
+        nwbfile.get_read_io().close()
+
+
+def test_read_nwbfile_with_network_io_profile(tmpdir: py.path.local):
+    nwbfile_path = nwb2bids.testing.generate_ephys_tutorial(output_directory=pathlib.Path(tmpdir), mode="file")
+
+    nwbfile = read_nwbfile(file_path=nwbfile_path, io_profile="network")
+    use_file_locking, _ = nwbfile.get_read_io()._file.id.get_access_plist().get_file_locking()
+    assert use_file_locking == 0
+    assert nwbfile.session_id == "A"
+    nwbfile.get_read_io().close()
@@ -0,0 +1,87 @@
+import concurrent.futures
+import os
+import pathlib
+
+from nwb2bids._tools import FileIndex, MetadataCache, SessionTimings
+
+
+def test_file_index_save_merges_and_bounds_entries(temporary_run_directory: pathlib.Path):
+    nwbfile_paths = []
+    for index in range(3):
+        nwbfile_path = temporary_run_directory / f"file_{index}.nwb"
+        nwbfile_path.write_bytes(data=b"nwb")
+        nwbfile_paths.append(nwbfile_path)
+
+    # Two processes sharing the same index, each having loaded it before the other saved
+    index_file_path = temporary_run_directory / "file_index.json"
+    file_index = FileIndex.from_file_path(file_path=index_file_path)
+    other_file_index = FileIndex.from_file_path(file_path=index_file_path)
+    file_index.update(file_path=nwbfile_paths[0], session_id="A")
+    file_index.save()
+    other_file_index.update(file_path=nwbfile_paths[1], session_id="B")
+    other_file_index.save()
+
+    reloaded_file_index = FileIndex.from_file_path(file_path=index_file_path)
+    assert reloaded_file_index.get(file_path=nwbfile_paths[0]).session_id == "A"
+    assert reloaded_file_index.get(file_path=nwbfile_paths[1]).session_id == "B"
+
+    # The least recently used entries are dropped beyond the bound
+    bounded_file_index = FileIndex.from_file_path(file_path=index_file_path)
+    bounded_file_index.max_entries = 2
+    bounded_file_index.get(file_path=nwbfile_paths[0])
+    bounded_file_index.update(file_path=nwbfile_paths[2], session_id="C")
+    bounded_file_index.save()
+    assert list(FileIndex.from_file_path(file_path=index_file_path).entries) == [
+        str(nwbfile_paths[0].resolve()),
+        str(nwbfile_paths[2].resolve()),
+    ]
+
+
+def test_file_index_is_shared_across_threads(temporary_run_directory: pathlib.Path):
+    nwbfile_paths = []
+    for index in range(200):
+        nwbfile_path = temporary_run_directory / f"file_{index}.nwb"
+        nwbfile_path.write_bytes(data=b"nwb")
+        nwbfile_paths.append(nwbfile_path)
+
+    # Such as the workers of a threaded conversion updating the index of the process while another saves it
+    index_file_path = temporary_run_directory / "file_index.json"
+    file_index = FileIndex.from_file_path(file_path=index_file_path)
+
+    def _update_and_save(nwbfile_path: pathlib.Path) -> None:
+        file_index.update(file_path=nwbfile_path, session_id=nwbfile_path.stem)
+        file_index.save()
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(_update_and_save, nwbfile_paths))
+
+    reloaded_file_index = FileIndex.from_file_path(file_path=index_file_path)
+    assert len(reloaded_file_index.entries) == len(nwbfile_paths)
+    for nwbfile_path in nwbfile_paths:
+        assert reloaded_file_index.get(file_path=nwbfile_path).session_id == nwbfile_path.stem
+
+
+def test_session_timings_save_merges_and_bounds_entries(temporary_run_directory: pathlib.Path):
+    timings_file_path = temporary_run_directory / "session_timings.json"
+    session_timings = SessionTimings.from_file_path(file_path=timings_file_path)
+    other_session_timings = SessionTimings.from_file_path(file_path=timings_file_path)
+    session_timings.record(key="A", size=1, stage="extraction", seconds=1.0)
+    session_timings.save()
+    other_session_timings.record(key="B", size=1, stage="extraction", seconds=2.0)
+    other_session_timings.max_entries = 2
+    other_session_timings.record(key="C", size=1, stage="extraction", seconds=3.0)
+    other_session_timings.save()
+
+    assert list(SessionTimings.from_file_path(file_path=timings_file_path).entries) == ["B", "C"]
+
+
+def test_metadata_cache_prunes_least_recently_used_entries(temporary_run_directory: pathlib.Path):
+    metadata_cache = MetadataCache(directory=temporary_run_directory / "metadata_cache", max_entries=2)
+    for index, key in enumerate(["a", "b", "c"]):
+        metadata_cache.save(key=key, metadata={"session_id": key})
+        os.utime(path=metadata_cache.directory / f"{key}.json.gz", ns=(index * 10**9, index * 10**9))
+
+    # Loading an entry marks it as recently used
+    assert metadata_cache.load(key="a") == {"session_id": "a"}
+    metadata_cache.prune()
+    assert sorted(file_path.name for file_path in metadata_cache.directory.iterdir()) == ["a.json.gz", "c.json.gz"]
@@ -0,0 +1,189 @@
+import http.client
+import json
+import pathlib
+import socket
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+
+import nwb2bids
+from nwb2bids._core import _conversion_service
+
+
+def _request(url: str, headers: dict, payload: dict | None = None) -> tuple[int, dict | list]:
+    data = json.dumps(obj=payload).encode() if payload is not None else None
+    request = urllib.request.Request(url=url, data=data, headers={"Content-Type": "application/json", **headers})
+    try:
+        with urllib.request.urlopen(request, timeout=30) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as error:
+        return error.code, json.loads(error.read())
+
+
+@pytest.fixture(scope="function")
+def service_server():
+    with nwb2bids.ConversionService() as conversion_service:
+        server = conversion_service.create_server(port=0)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        yield server
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture(scope="function")
+def service_url(service_server) -> str:
+    return f"http://127.0.0.1:{service_server.server_address[1]}"
+
+
+@pytest.fixture(scope="function")
+def service_headers(service_server) -> dict:
+    return {"Authorization": f"Bearer {service_server.token}"}
+
+
+def test_conversion_service(
+    service_url: str,
+    service_headers: dict,
+    minimal_nwbfile_path: pathlib.Path,
+    temporary_bids_directory: pathlib.Path,
+):
+    payload = {
+        "nwb_paths": [str(minimal_nwbfile_path)],
+        "run_config": {"bids_directory": str(temporary_bids_directory)},
+    }
+    status, job = _request(url=f"{service_url}/jobs", payload=payload, headers=service_headers)
+    assert status == 202
+    assert job["status"] in ("queued", "running")
+    assert job["run_config"]["silent"] is True
+
+    deadline = time.monotonic() + 120
+    while job["status"] in ("queued", "running") and time.monotonic() < deadline:
+        time.sleep(0.1)
+        status, job = _request(url=f"{service_url}/jobs/{job['job_id']}", headers=service_headers)
+        assert status == 200
+    assert job["status"] == "succeeded", job["error"]
+    assert job["error"] is None
+    assert isinstance(job["notifications"], list)
+    assert (temporary_bids_directory / "participants.tsv").exists()
+
+    status, jobs = _request(url=f"{service_url}/jobs", headers=service_headers)
+    assert status == 200
+    assert [listed_job["job_id"] for listed_job in jobs] == [job["job_id"]]
+
+
+def test_conversion_service_invalid_requests(
+    service_url: str, service_headers: dict, temporary_run_directory: pathlib.Path
+):
+    status, response = _request(
+        url=f"{service_url}/jobs",
+        headers=service_headers,
+        payload={"nwb_paths": [str(temporary_run_directory / "missing.nwb")]},
+    )
+    assert status == 400
+    assert response["errors"][0]["loc"][0] == "nwb_paths"
+
+    for run_config in ({"unknown_field": True}, {"cache_directory": "/tmp"}, {"file_mode": "move"}):
+        status, response = _request(
+            url=f"{service_url}/jobs",
+            headers=service_headers,
+            payload={"nwb_paths": [str(temporary_run_directory)], "run_config": run_config},
+        )
+        assert status == 400, run_config
+        assert response["errors"][0]["loc"][0] == "run_config"
+
+    status, response = _request(url=f"{service_url}/jobs/unknown", headers=service_headers)
+    assert status == 404
+
+
+def test_conversion_service_rejects_unauthorized_requests(
+    service_server, service_url: str, service_headers: dict, temporary_run_directory: pathlib.Path
+):
+    payload = {"nwb_paths": [str(temporary_run_directory)]}
+    status, _ = _request(url=f"{service_url}/jobs", headers=dict(), payload=payload)
+    assert status == 401
+
+    status, _ = _request(url=f"{service_url}/jobs", headers={"Authorization": "Bearer wrong"})
+    assert status == 401
+
+    # Such as a page of another origin, which can only send simple requests without asking first
+    status, _ = _request(
+        url=f"{service_url}/jobs", headers={**service_headers, "Content-Type": "text/plain"}, payload=payload
+    )
+    assert status == 415
+
+    # Such as a page of another origin whose domain was rebound to the loopback address
+    status, _ = _request(url=f"{service_url}/jobs", headers={**service_headers, "Host": "attacker.example"})
+    assert status == 403
+
+    connection = http.client.HTTPConnection(host="127.0.0.1", port=service_server.server_address[1], timeout=30)
+    connection.putrequest(method="POST", url="/jobs")
+    for header, value in {**service_headers, "Content-Type": "application/json", "Content-Length": "abc"}.items():
+        connection.putheader(header, value)
+    connection.endheaders()
+    assert connection.getresponse().status == 411
+    connection.close()
+
+
+def test_conversion_service_forgets_oldest_finished_jobs(temporary_run_directory: pathlib.Path):
+    with nwb2bids.ConversionService(max_finished_jobs=2) as conversion_service:
+        run_config = nwb2bids.RunConfig(bids_directory=temporary_run_directory, silent=True)
+        # Nothing to convert in a missing directory, so each job fails at once
+        jobs = [
+            conversion_service.submit(nwb_paths=[temporary_run_directory / "missing"], run_config=run_config)
+            for _ in range(4)
+        ]
+
+        # Closing would cancel the jobs still queued
+        deadline = time.monotonic() + 60
+        while conversion_service.get_job(job_id=jobs[-1].job_id).status == "queued" and time.monotonic() < deadline:
+            time.sleep(0.05)
+    assert [job.job_id for job in conversion_service.list_jobs()] == [job.job_id for job in jobs[2:]]
+    assert {job.status for job in conversion_service.list_jobs()} == {"failed"}
+
+
+def test_conversion_service_close_cancels_queued_jobs(
+    temporary_run_directory: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+):
+    is_running = threading.Event()
+    may_finish = threading.Event()
+
+    def _convert_slowly(**kwargs):
+        is_running.set()
+        may_finish.wait(timeout=60)
+        raise RuntimeError("Interrupted conversion.")
+
+    monkeypatch.setattr(_conversion_service, "convert_nwb_dataset", _convert_slowly)
+    conversion_service = nwb2bids.ConversionService()
+    run_config = nwb2bids.RunConfig(bids_directory=temporary_run_directory, silent=True)
+    jobs = [conversion_service.submit(nwb_paths=[temporary_run_directory], run_config=run_config) for _ in range(3)]
+    assert is_running.wait(timeout=60)
+    assert conversion_service.running_job.job_id == jobs[0].job_id
+
+    # Closing waits only for the job already running, rather than running the whole backlog
+    closing_thread = threading.Thread(target=conversion_service.close)
+    closing_thread.start()
+    deadline = time.monotonic() + 60
+    while conversion_service.get_job(job_id=jobs[-1].job_id).status != "cancelled" and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert closing_thread.is_alive()
+    may_finish.set()
+    closing_thread.join(timeout=60)
+
+    assert not closing_thread.is_alive()
+    assert [job.status for job in conversion_service.list_jobs()] == ["failed", "cancelled", "cancelled"]
+    assert conversion_service.running_job is None
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="Unix sockets are not supported on this system.")
+def test_conversion_service_unix_socket_permissions(temporary_run_directory: pathlib.Path):
+    socket_path = temporary_run_directory / "nwb2bids.sock"
+    with nwb2bids.ConversionService() as conversion_service:
+        server = conversion_service.create_server(socket_path=socket_path)
+        try:
+            assert server.token is None
+            assert socket_path.stat().st_mode & 0o777 == 0o600
+        finally:
+            server.server_close()
@@ -1,12 +1,17 @@
 """Unit tests for the `DatasetConverter` class and its methods."""
 
+import concurrent.futures
 import json
 import pathlib
+import shutil
+from collections.abc import Callable
 
 import pandas
 import pytest
 
 import nwb2bids
+from nwb2bids._converters._dataset_converter import _merge_with_existing_table
+from nwb2bids.bids_models._bids_session_metadata import _extract_metadata_dictionary
 
 
 def test_dataset_converter_directory_initialization(
@@ -81,6 +86,469 @@ def test_dataset_converter_metadata_extraction(
     assert dataset_converter.session_converters == expected_session_converters
 
 
+def test_dataset_converter_parallel_metadata_extraction(
+    directory_with_multiple_subjects_and_multiple_sessions: pathlib.Path, temporary_bids_directory: pathlib.Path
+):
+    nwb_paths = [directory_with_multiple_subjects_and_multiple_sessions]
+
+    # Without the cache, since the workers would otherwise retrieve what was extracted serially
+    serial_run_config = nwb2bids.RunConfig(bids_directory=temporary_bids_directory, use_cache=False)
+    serial_dataset_converter = nwb2bids.DatasetConverter.from_nwb_paths(
+        nwb_paths=nwb_paths, run_config=serial_run_config
+    )
+    serial_dataset_converter.extract_metadata()
+    expected_session_metadata = [
+        session_converter.session_metadata.model_dump(exclude={"run_config", "sanitization"})
+        for session_converter in serial_dataset_converter.session_converters
+    ]
+
+    parallel_run_config = nwb2bids.RunConfig(bids_directory=temporary_bids_directory, use_cache=False, max_workers=2)
+    process_pool_dataset_converter = nwb2bids.DatasetConverter.from_nwb_paths(
+        nwb_paths=nwb_paths, run_config=parallel_run_config
+    )
+    process_pool_dataset_converter.extract_metadata()
+
+    # A session timeout runs each extraction in a worker process that can be killed
+    watchdog_run_config = nwb2bids.RunConfig(
+        bids_directory=temporary_bids_directory, use_cache=False, session_timeout=60.0
+    )
+    watchdog_dataset_converter = nwb2bids.DatasetConverter.from_nwb_paths(
+        nwb_paths=nwb_paths, run_config=watchdog_run_config
+    )
+    watchdog_dataset_converter.extract_metadata()
+
+    thread_pool_dataset_converter = nwb2bids.DatasetConverter.from_nwb_paths(
+        nwb_paths=nwb_paths, run_config=serial_run_config
+    )
+    with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+        thread_pool_dataset_converter.extract_metadata(executor=executor)
+
+    for dataset_converter in (
+        process_pool_dataset_converter,
+        watchdog_dataset_converter,
+        thread_pool_dataset_converter,
+    ):
+        assert not any(dataset_converter.notifications)
+        session_metadata = [
+            session_converter.session_metadata.model_dump(exclude={"run_config", "sanitization"})
+            for session_converter in dataset_converter.session_converters
+        ]
+        assert session_metadata == expected_session_metadata
+        assert [session_converter.modality for session_converter in dataset_converter.session_converters] == [
+            session_converter.modality for session_converter in serial_dataset_converter.session_converters
+        ]
+
+
+def test_dataset_converter_concurrent_session_writes(
+    directory_with_multiple_subjects_and_multiple_sessions: pathlib.Path,
+    temporary_run_directory: pathlib.Path,
+    get_bids_file_paths: Callable[[pathlib.Path], set[pathlib.Path]],
+):
+    nwb_paths = [directory_with_multiple_subjects_and_multiple_sessions]
+
+    file_paths_by_max_write_workers = dict()
+    for max_write_workers in (1, 4):
+        bids_directory = temporary_run_directory / f"bids_{max_write_workers}"
+        bids_directory.mkdir()
+        run_config = nwb2bids.RunConfig(
+            bids_directory=bids_directory, file_mode="symlink", max_write_workers=max_write_workers
+        )
+        dataset_converter = nwb2bids.DatasetConverter.from_nwb_paths(nwb_paths=nwb_paths, run_config=run_config)
+        dataset_converter.convert_to_bids_dataset()
+        assert not any(dataset_converter.notifications)
+
+        file_paths_by_max_write_workers[max_write_workers] = get_bids_file_paths(bids_directory)
+
+    assert file_paths_by_max_write_workers[4] == file_paths_by_max_write_workers[1]
+    assert pathlib.Path("participants.tsv") in file_paths_by_max_write_workers[4]
+    assert pathlib.Path("sub-subA") / "sub-subA_sessions.tsv" in file_paths_by_max_write_workers[4]
+
+
+def test_dataset_converter_concurrent_converters_into_one_dataset(
+    directory_with_multiple_subjects_and_multiple_sessions: pathlib.Path, temporary_bids_directory: pathlib.Path
+):
+    # Each converter writes the sessions of one subject, and must keep those written by the other
+    nwbfile_paths = sorted(directory_with_multiple_subjects_and_multiple_sessions.glob(pattern="*.nwb"))
+    dataset_converters = [
+        nwb2bids.DatasetConverter.from_nwb_paths(
+            nwb_paths=[nwbfile_path for nwbfile_path in nwbfile_paths if f"subject_{subject}_" in nwbfile_path.name],
+            run_config=nwb2bids.RunConfig(bids_directory=temporary_bids_directory, file_mode="symlink"),
+        )
+        for subject in ("A", "B")
+    ]
+    assert dataset_converters[0].run_config.run_id != dataset_converters[1].run_config.run_id
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+        futures = [
+            executor.submit(dataset_converter.convert_to_bids_dataset) for dataset_converter in dataset_converters
+        ]
+        for future in futures:
+            future.result()
+    for dataset_converter in dataset_converters:
+        assert not any(dataset_converter.notifications)
+        assert dataset_converter.run_config.notifications_json_file_path.exists()
+
+    participants = pandas.read_csv(filepath_or_buffer=temporary_bids_directory / "participants.tsv", sep="\t")
+    assert set(participants["participant_id"]) == {"sub-subA", "sub-subB"}
+    assert set(participants["species"]) == {"Mus musculus"}
+    for subject in ("A", "B"):
+        sessions_tsv_file_path = temporary_bids_directory / f"sub-sub{subject}" / f"sub-sub{subject}_sessions.tsv"
+        sessions = pandas.read_csv(filepath_or_buffer=sessions_tsv_file_path, sep="\t")
+        assert list(sessions["session_id"]) == [f"ses-sub{subject}session1", f"ses-sub{subject}session2"]
+    assert not any(path.name.endswith(".tmp") for path in temporary_bids_directory.rglob(pattern="*"))
+
+
+def test_merge_with_existing_table_keeps_first_of_repeated_ids(temporary_run_directory: pathlib.Path):
+    # Such as a participants table edited by hand, with a row copied by mistake
+    participants_tsv_file_path = temporary_run_directory / "participants.tsv"
+    participants_tsv_file_path.write_text(
+        "participant_id\tspecies\tnotes\nsub-A\tMus musculus\tfirst\nsub-A\tMus musculus\tcopy\n"
+    )
+    data_frame = pandas.DataFrame(data={"participant_id": ["sub-B", "sub-A"], "species": ["Rattus", "Homo sapiens"]})
+
+    merged_data_frame = _merge_with_existing_table(
+        data_frame=data_frame,
+        file_path=participants_tsv_file_path,
+        id_column="participant_id",
+        required_column_order=["participant_id", "species"],
+    )
+    assert merged_data_frame.to_dict(orient="list") == {
+        "participant_id": ["sub-A", "sub-B"],
+        "species": ["Homo sapiens", "Rattus"],
+        "notes": ["first", None],
+    }
+
+
+def test_dataset_converter_longest_first_scheduling(
+    directory_with_multiple_subjects_and_multiple_sessions: pathlib.Path,
+    temporary_run_directory: pathlib.Path,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    cache_directory = temporary_run_directory / "cache"
+    cache_directory.mkdir()
+    bids_directory = temporary_run_directory / "bids"
+    bids_directory.mkdir()
+    run_config = nwb2bids.RunConfig(bids_directory=bids_directory, cache_directory=cache_directory)
+    nwb_paths = [directory_with_multiple_subjects_and_multiple_sessions]
+    dataset_converter = nwb2bids.DatasetConverter.from_nwb_paths(nwb_paths=nwb_paths, run_config=run_config)
+    dataset_converter.convert_to_bids_dataset()
+    assert not any(dataset_converter.notifications)
+
+    # Nothing was recorded before the first run, so only the actual times are known
+    session_ids = {session_converter.session_id for session_converter in dataset_converter.session_converters}
+    timings_report = json.loads(run_config.timings_json_file_path.read_text())
+    assert set(timings_report.keys()) == {"extraction", "conversion"}
+    for stage_report in timings_report.values():
+        assert set(stage_report["sessions"].keys()) == session_ids
+        assert stage_report["estimated_seconds"] is None
+        assert all(session["actual_seconds"] is not None for session in stage_report["sessions"].values())
+
+    # A session that took far longer than the others on an earlier run is started first on the next one
+    session_converters = dataset_converter.session_converters
+    slowest_session_converter = session_converters[-1]
+    session_timings = nwb2bids._tools.get_session_timings(cache_directory=cache_directory)
+    session_timings.record(
+        key=session_timings.get_key(nwbfile_paths=slowest_session_converter.nwbfile_paths),
+        size=sum(nwbfile_path.stat().st_size for nwbfile_path in slowest_session_converter.nwbfile_paths),
+        stage="conversion",
+        seconds=1_000.0,
+    )
+    conversion_schedule = nwb2bids._converters._scheduling.StageSchedule.from_run_config(
+        stage="conversion", run_config=run_config
+    )
+    scheduled_session_converters = conversion_schedule.order(session_converters=session_converters)
+    assert scheduled_session_converters[0] is slowest_session_converter
+    assert conversion_schedule.estimated_seconds is not None
+
+    # Extraction is only scheduled longest-first when it waits for all sessions to be discovered
+    session_timings.record(
+        key=session_timings.get_key(nwbfile_paths=slowest_session_converter.nwbfile_paths),
+        size=sum(nwbfile_path.stat().st_size for nwbfile_path in slowest_session_converter.nwbfile_paths),
+        stage="extraction",
+        seconds=1_000.0,
+    )
+    other_bids_directory = temporary_run_directory / "other_bids"
+    other_bids_directory.mkdir()
+    run_config = nwb2bids.RunConfig(
+        bids_directory=other_bids_directory, cache_directory=cache_directory, extract_during_discovery=False
+    )
+    extract_metadata = nwb2bids.SessionConverter.extract_metadata
+    extracted_session_ids = []
+
+    def _record_extraction_order(self: nwb2bids.SessionConverter) -> None:
+        extracted_session_ids.append(self.session_id)
+        extract_metadata(self)
+
+    monkeypatch.setattr(nwb2bids.SessionConverter, "extract_metadata", _record_extraction_order)
+    nwb2bids.convert_nwb_dataset(nwb_paths=nwb_paths, run_config=run_config)
+    assert extracted_session_ids[0] == slowest_session_converter.session_id
+
+
+@pytest.mark.parametrize("fail_fast", [False, True])
+def test_dataset_converter_session_failure_isolation(
+    directory_with_multiple_subjects_and_multiple_sessions: pathlib.Path,
+    temporary_bids_directory: pathlib.Path,
+    monkeypatch: pytest.MonkeyPatch,
+    fail_fast: bool,
+):
+    extract_metadata = nwb2bids.SessionConverter.extract_metadata
+    convert_to_bids_session = nwb2bids.SessionConverter.convert_to_bids_session
+
+    def _fail_to_extract_metadata(self: nwb2bids.SessionConverter) -> None:
+        if self.session_id == "subBsession2":
+            raise ValueError("Unreadable session.")
+        extract_metadata(self)
+
+    def _fail_to_convert_to_bids_session(self: nwb2bids.SessionConverter) -> None:
+        if self.session_id == "subAsession1":
+            raise NotImplementedError("Unsupported session.")
+        convert_to_bids_session(self)
+
+    monkeypatch.setattr(nwb2bids.SessionConverter, "extract_metadata", _fail_to_extract_metadata)
+    monkeypatch.setattr(nwb2bids.SessionConverter, "convert_to_bids_session", _fail_to_convert_to_bids_session)
+
+    run_config = nwb2bids.RunConfig(
+        bids_directory=temporary_bids_directory,
+        use_cache=False,
+        use_session_labels=True,
+        fail_fast=fail_fast,
+    )
+    nwb_paths = [directory_with_multiple_subjects_and_multiple_sessions]
+    dataset_converter = nwb2bids.DatasetConverter.from_nwb_paths(nwb_paths=nwb_paths, run_config=run_config)
+    dataset_converter.convert_to_bids_dataset()
+
+    identifiers = {notification.identifier for notification in dataset_converter.notifications}
+    if fail_fast:
+        assert "MetadataExtractionFailure" in identifiers
+        assert not (temporary_bids_directory / "participants.tsv").exists()
+        return
+
+    assert "MetadataExtractionFailure" not in identifiers
+    session_id_to_identifiers = {
+        session_converter.session_id: {notification.identifier for notification in session_converter.notifications}
+        for session_converter in dataset_converter.session_converters
+    }
+    assert "SessionExtractionFailure" in session_id_to_identifiers["subBsession2"]
+    assert "SessionConversionFailure" in session_id_to_identifiers["subAsession1"]
+
+    # The remaining sessions were still converted, and only these are listed in the dataset-level files
+    participants = pandas.read_csv(filepath_or_buffer=temporary_bids_directory / "participants.tsv", sep="\t")
+    assert list(participants["participant_id"]) == ["sub-subA", "sub-subB"]
+    for participant_id, session_id in (("sub-subA", "ses-subAsession2"), ("sub-subB", "ses-subBsession1")):
+        sessions_tsv_file_path = temporary_bids_directory / participant_id / f"{participant_id}_sessions.tsv"
+        sessions = pandas.read_csv(filepath_or_buffer=sessions_tsv_file_path, sep="\t")
+        assert list(sessions["session_id"]) == [session_id]
+        assert (temporary_bids_directory / participant_id / session_id / "ecephys").is_dir()
+
+
+def test_dataset_converter_retries_failed_session_joined_by_late_file(
+    minimal_nwbfile_path: pathlib.Path,
+    temporary_run_directory: pathlib.Path,
+    temporary_bids_directory: pathlib.Path,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    nwb_directory = temporary_run_directory / "nwb_files"
+    nwb_directory.mkdir()
+    for file_name in ["first_part.nwb", "second_part.nwb"]:
+        shutil.copy(src=minimal_nwbfile_path, dst=nwb_directory / file_name)
+
+    # The session fails to extract from its first file alone, which it is extracted from as soon as it is discovered;
+    # multiple files per session are not supported yet, so the late file then stands in for the whole session
+    def _fail_to_extract_metadata_of_first_part(self: nwb2bids.SessionConverter) -> None:
+        if len(self.nwbfile_paths) == 1:
+            raise ValueError("Unreadable first part.")
+        metadata_dictionary = _extract_metadata_dictionary(
+            nwbfile_paths=self.nwbfile_paths[1:], run_config=self.run_config
+        )
+        self._load_metadata_dictionary(metadata_dictionary=metadata_dictionary)
+
+    monkeypatch.setattr(nwb2bids.SessionConverter, "extract_metadata", _fail_to_extract_metadata_of_first_part)
+
+    run_config = nwb2bids.RunConfig(bids_directory=temporary_bids_directory, use_cache=False)
+    dataset_converter = nwb2bids.DatasetConverter.from_nwb_paths(
+        nwb_paths=[nwb_directory], run_config=run_config, extract_metadata=True
+    )
+
+    # Once the late second file joins the session, it is extracted again rather than silently left out
+    assert [session_converter.session_id for session_converter in dataset_converter._successful_session_converters] == [
+        "456"
+    ]
+    session_converter = dataset_converter.session_converters[0]
+    assert len(session_converter.nwbfile_paths) == 2
+    assert session_converter.session_metadata is not None
+    assert not any(
+        notification.identifier == "SessionExtractionFailure" for notification in session_converter.notifications
+    )
+    dataset_converter.close()
+
+
+def test_dataset_converter_resume_interrupted_conversion(
+    directory_with_multiple_subjects_and_multiple_sessions: pathlib.Path,
+    temporary_bids_directory: pathlib.Path,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    convert_to_bids_session = nwb2bids.SessionConverter.convert_to_bids_session
+    converted_session_ids = []
+    interrupted_session_ids = []
+
+    def _record_convert_to_bids_session(self: nwb2bids.SessionConverter) -> None:
+        # The first run is killed while writing its third session
+        if len(converted_session_ids) == 2 and not interrupted_session_ids:
+            interrupted_session_ids.append(self.session_id)
+            raise KeyboardInterrupt("Interrupted conversion.")
+        converted_session_ids.append(self.session_id)
+        convert_to_bids_session(self)
+
+    monkeypatch.setattr(nwb2bids.SessionConverter, "convert_to_bids_session", _record_convert_to_bids_session)
+
+    nwb_paths = [directory_with_multiple_subjects_and_multiple_sessions]
+    run_config = nwb2bids.RunConfig(
+        bids_directory=temporary_bids_directory, file_mode="symlink", max_write_workers=1, run_id="interrupted"
+    )
+    with pytest.raises(expected_exception=KeyboardInterrupt):
+        nwb2bids.convert_nwb_dataset(nwb_paths=nwb_paths, run_config=run_config)
+    assert not (temporary_bids_directory / "participants.tsv").exists()
+
+    journal_lines = run_config.journal_file_path.read_text().splitlines()
+    journaled_session_ids = {json.loads(line)["session"]["session_id"] for line in journal_lines}
+    assert len(journaled_session_ids) >= 2
+    assert interrupted_session_ids[0] not in journaled_session_ids
+
+    # A session whose outputs went missing since is converted again
+    missing_session_id = sorted(journaled_session_ids)[0]
+    journal_entry = next(
+        json.loads(line) for line in journal_lines if json.loads(line)["session"]["session_id"] == missing_session_id
+    )
+    (temporary_bids_directory / journal_entry["output_file_paths"][0]).unlink()
+
+    converted_session_ids.clear()
+    resume_run_config = run_config.model_copy(update={"resume": True})
+    dataset_converter = nwb2bids.convert_nwb_dataset(nwb_paths=nwb_paths, run_config=resume_run_config)
+    assert not any(dataset_converter.notifications)
+    all_session_ids = ["subAsession1", "subAsession2", "subBsession1", "subBsession2"]
+    unfinished_session_ids = set(all_session_ids) - journaled_session_ids
+    assert sorted(converted_session_ids) == sorted(unfinished_session_ids | {missing_session_id})
+
+    participants = pandas.read_csv(filepath_or_buffer=temporary_bids_directory / "participants.tsv", sep="\t")
+    assert list(participants["participant_id"]) == ["sub-subA", "sub-subB"]
+    for participant_id in ("subA", "subB"):
+        sessions_tsv_file_path = (
+            temporary_bids_directory / f"sub-{participant_id}" / f"sub-{participant_id}_sessions.tsv"
+        )
+        sessions = pandas.read_csv(filepath_or_buffer=sessions_tsv_file_path, sep="\t")
+        expected_session_ids = [f"ses-{participant_id}session1", f"ses-{participant_id}session2"]
+        assert sorted(sessions["session_id"]) == expected_session_ids
+
+
+def test_dataset_converter_streaming_conversion(
+    directory_with_mixed_session_counts: pathlib.Path,
+    temporary_run_directory: pathlib.Path,
+    get_bids_file_paths: Callable[[pathlib.Path], set[pathlib.Path]],
+):
+    nwb_paths = [directory_with_mixed_session_counts]
+
+    batch_bids_directory = temporary_run_directory / "batch"
+    batch_bids_directory.mkdir()
+    run_config = nwb2bids.RunConfig(bids_directory=batch_bids_directory, file_mode="symlink")
+    nwb2bids.convert_nwb_dataset(nwb_paths=nwb_paths, run_config=run_config)
+
+    streaming_bids_directory = temporary_run_directory / "streaming"
+    streaming_bids_directory.mkdir()
+    run_config = nwb2bids.RunConfig(bids_directory=streaming_bids_directory, file_mode="symlink", streaming=True)
+    dataset_converter = nwb2bids.convert_nwb_dataset(nwb_paths=nwb_paths, run_config=run_config)
+    assert not any(dataset_converter.notifications)
+
+    # Written sessions only keep the metadata needed for the dataset-level files
+    assert len(dataset_converter.session_converters) == 5
+    for session_converter in dataset_converter.session_converters:
+        assert session_converter.session_metadata is not None
+        assert session_converter.session_metadata.electrode_table is None
+        assert session_converter.session_metadata.events is None
+
+    # Decided up front, the `ses-` labels (applied to all, since most subjects have multiple sessions) and the
+    # dataset-level files are the same as when all sessions are held until the end
+    batch_file_paths = get_bids_file_paths(batch_bids_directory)
+    assert get_bids_file_paths(streaming_bids_directory) == batch_file_paths
+    assert pathlib.Path("sub-subZ/ses-Z1") in batch_file_paths
+    for relative_file_path in batch_file_paths:
+        if relative_file_path.suffix in (".tsv", ".json"):
+            batch_text = (batch_bids_directory / relative_file_path).read_text()
+            assert (streaming_bids_directory / relative_file_path).read_text() == batch_text
+
+
+def test_dataset_converter_sharded_conversion(
+    directory_with_multiple_subjects_and_multiple_sessions: pathlib.Path,
+    temporary_run_directory: pathlib.Path,
+    get_bids_file_paths: Callable[[pathlib.Path], set[pathlib.Path]],
+):
+    nwb_paths = [directory_with_multiple_subjects_and_multiple_sessions]
+
+    unsharded_bids_directory = temporary_run_directory / "unsharded"
+    unsharded_bids_directory.mkdir()
+    run_config = nwb2bids.RunConfig(bids_directory=unsharded_bids_directory, file_mode="symlink")
+    nwb2bids.convert_nwb_dataset(nwb_paths=nwb_paths, run_config=run_config)
+
+    sharded_bids_directory = temporary_run_directory / "sharded"
+    sharded_bids_directory.mkdir()
+    with pytest.raises(expected_exception=ValueError, match="No shard manifests were found"):
+        nwb2bids.DatasetConverter.from_shard_manifests(
+            run_config=nwb2bids.RunConfig(bids_directory=sharded_bids_directory)
+        )
+
+    for shard_index in range(3):
+        run_config = nwb2bids.RunConfig(
+            bids_directory=sharded_bids_directory, file_mode="symlink", shard=(shard_index, 3)
+        )
+        if shard_index == 1:
+            with pytest.raises(
+                expected_exception=ValueError, match="the manifests of shards 1, 2 \\(of 3\\) are missing"
+            ):
+                nwb2bids.DatasetConverter.from_shard_manifests(run_config=run_config)
+
+        dataset_converter = nwb2bids.convert_nwb_dataset(nwb_paths=nwb_paths, run_config=run_config)
+        assert not any(dataset_converter.notifications)
+        assert not (sharded_bids_directory / "participants.tsv").exists()
+
+    run_config = nwb2bids.RunConfig(bids_directory=sharded_bids_directory)
+    with nwb2bids.DatasetConverter.from_shard_manifests(run_config=run_config) as dataset_converter:
+        dataset_converter.write_dataset_files()
+    assert len(dataset_converter.session_converters) == 4
+
+    assert get_bids_file_paths(sharded_bids_directory) == get_bids_file_paths(unsharded_bids_directory)
+    for relative_file_path in (
+        pathlib.Path("participants.tsv"),
+        pathlib.Path("sub-subA") / "sub-subA_sessions.tsv",
+        pathlib.Path("sub-subB") / "sub-subB_sessions.tsv",
+    ):
+        sharded_text = (sharded_bids_directory / relative_file_path).read_text()
+        assert sharded_text == (unsharded_bids_directory / relative_file_path).read_text()
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_dataset_converter_sharded_conversion_decides_derivative_across_shards(
+    minimal_nwbfile_path: pathlib.Path,
+    units_only_nwbfile_path: pathlib.Path,
+    temporary_bids_directory: pathlib.Path,
+    streaming: bool,
+):
+    # The raw session falls into the first shard, while the derived one falls into the last
+    nwb_paths = [minimal_nwbfile_path, units_only_nwbfile_path]
+    for shard_index in range(3):
+        run_config = nwb2bids.RunConfig(
+            bids_directory=temporary_bids_directory, file_mode="symlink", shard=(shard_index, 3), streaming=streaming
+        )
+        dataset_converter = nwb2bids.convert_nwb_dataset(nwb_paths=nwb_paths, run_config=run_config)
+        assert not any(dataset_converter.notifications)
+
+    run_config = nwb2bids.RunConfig(bids_directory=temporary_bids_directory)
+    with nwb2bids.DatasetConverter.from_shard_manifests(run_config=run_config) as dataset_converter:
+        dataset_converter.write_dataset_files()
+
+    derivatives_bids_directory = temporary_bids_directory / "derivatives" / "nwb2bids"
+    assert not any(path.name.startswith("sub-") for path in temporary_bids_directory.iterdir())
+    assert len(list(derivatives_bids_directory.rglob(pattern="*.nwb"))) == 2
+
+
 def test_dataset_converter_write_dataset_description(
     minimal_nwbfile_path: pathlib.Path,
     temporary_bids_directory: pathlib.Path,
@@ -0,0 +1,161 @@
+"""Unit tests for the local discovery of NWB files."""
+
+import os
+import pathlib
+import shutil
+import subprocess
+import threading
+
+import pytest
+
+import nwb2bids
+from nwb2bids._converters._discovery_utils import _prefetch_in_background, _walk_nwb_files
+from nwb2bids._converters._path_filters import _get_path_filter
+
+
+@pytest.fixture(scope="function")
+def nested_directory(temporary_run_directory: pathlib.Path) -> pathlib.Path:
+    structure = {
+        "top.nwb": "",
+        "not_nwb.txt": "",
+        "sub-a": {"ses-1": {"a.nwb": ""}},
+        ".hidden": {"hidden.nwb": ""},
+        ".git": {"annex": {"objects": {"key.nwb": ""}}},
+    }
+    nwb2bids.testing.create_file_tree(directory=temporary_run_directory, structure=structure)
+    return temporary_run_directory
+
+
+def test_walk_nwb_files_prunes_hidden_directories(nested_directory: pathlib.Path):
+    found_file_paths = {
+        file_path.relative_to(nested_directory).as_posix() for file_path in _walk_nwb_files(directory=nested_directory)
+    }
+
+    assert found_file_paths == {"top.nwb", "sub-a/ses-1/a.nwb"}
+
+
+def test_walk_nwb_files_always_prunes_git(nested_directory: pathlib.Path):
+    found_file_paths = {
+        file_path.relative_to(nested_directory).as_posix()
+        for file_path in _walk_nwb_files(directory=nested_directory, ignore_hidden=False)
+    }
+
+    assert found_file_paths == {"top.nwb", "sub-a/ses-1/a.nwb", ".hidden/hidden.nwb"}
+
+
+@pytest.fixture(scope="function")
+def multi_lab_directory(temporary_run_directory: pathlib.Path) -> pathlib.Path:
+    structure = {
+        "lab_a": {"sub-01": {"a.nwb": ""}, "scratch": {"tmp.nwb": ""}},
+        "lab_b": {"sub-02": {"b.nwb": ""}},
+    }
+    nwb2bids.testing.create_file_tree(directory=temporary_run_directory, structure=structure)
+    return temporary_run_directory
+
+
+@pytest.mark.parametrize(
+    "include, exclude, expected_file_paths",
+    [
+        (("lab_a/**",), (), {"lab_a/sub-01/a.nwb", "lab_a/scratch/tmp.nwb"}),
+        (("re:^lab_a/sub-",), (), {"lab_a/sub-01/a.nwb"}),
+        ((), ("**/scratch",), {"lab_a/sub-01/a.nwb", "lab_b/sub-02/b.nwb"}),
+        (("**/*.nwb",), ("re:^lab_b/",), {"lab_a/sub-01/a.nwb", "lab_a/scratch/tmp.nwb"}),
+    ],
+)
+def test_walk_nwb_files_filters_paths(
+    multi_lab_directory: pathlib.Path,
+    include: tuple[str, ...],
+    exclude: tuple[str, ...],
+    expected_file_paths: set[str],
+):
+    path_filter = _get_path_filter(include=include, exclude=exclude)
+    found_file_paths = {
+        file_path.relative_to(multi_lab_directory).as_posix()
+        for file_path in _walk_nwb_files(directory=multi_lab_directory, path_filter=path_filter)
+    }
+
+    assert found_file_paths == expected_file_paths
+
+
+def test_walk_nwb_files_prunes_directories_by_anchored_prefix(
+    multi_lab_directory: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+):
+    scanned_directories = []
+    original_scandir = os.scandir
+
+    def record_scandir(path):
+        scanned_directories.append(pathlib.Path(path).relative_to(multi_lab_directory).as_posix())
+        return original_scandir(path)
+
+    monkeypatch.setattr("nwb2bids._converters._discovery_utils.os.scandir", record_scandir)
+    path_filter = _get_path_filter(include=("lab_a/sub-*/*.nwb",), exclude=())
+    found_file_paths = list(_walk_nwb_files(directory=multi_lab_directory, path_filter=path_filter))
+
+    assert [file_path.name for file_path in found_file_paths] == ["a.nwb"]
+    assert set(scanned_directories) == {".", "lab_a", "lab_a/sub-01"}
+
+
+@pytest.mark.skipif(shutil.which("git-annex") is None, reason="git-annex is not installed.")
+def test_walk_nwb_files_resolves_annexed_content_in_batch(
+    minimal_nwbfile_path: pathlib.Path,
+    ecephys_tutorial_nwbfile_path: pathlib.Path,
+    temporary_run_directory: pathlib.Path,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    repository_directory = temporary_run_directory / "repository"
+    (repository_directory / "sub-a").mkdir(parents=True)
+    shutil.copy(src=minimal_nwbfile_path, dst=repository_directory / "sub-a" / "retrieved.nwb")
+    shutil.copy(src=ecephys_tutorial_nwbfile_path, dst=repository_directory / "dropped.nwb")
+
+    commands = [
+        "git init --quiet",
+        "git config user.name test",
+        "git config user.email test@example.com",
+        "git annex init --quiet",
+        "git annex add --quiet .",
+        "git commit --quiet -m add",
+        "git annex drop --force --quiet dropped.nwb",
+    ]
+    for command in commands:
+        subprocess.run(args=command, shell=True, cwd=repository_directory, check=True, capture_output=True)
+
+    # Only the dropped file (a broken symlink) should require the per-file check
+    per_file_checked_paths = []
+    original_content_is_retrieved = nwb2bids._converters._discovery_utils._content_is_retrieved
+
+    def record_per_file_check(entry):
+        per_file_checked_paths.append(entry.name)
+        return original_content_is_retrieved(entry=entry)
+
+    monkeypatch.setattr("nwb2bids._converters._discovery_utils._content_is_retrieved", record_per_file_check)
+    found_file_paths = {
+        file_path.relative_to(repository_directory).as_posix()
+        for file_path in _walk_nwb_files(directory=repository_directory)
+    }
+
+    assert found_file_paths == {"sub-a/retrieved.nwb"}
+    assert per_file_checked_paths == ["dropped.nwb"]
+
+
+def test_prefetch_in_background_stops_when_abandoned():
+    produced_items = []
+
+    def _produce_forever():
+        item = 0
+        while True:
+            produced_items.append(item)
+            yield item
+            item += 1
+
+    # Only the producer of this stream is followed, since other tests may have left their own behind
+    existing_threads = set(threading.enumerate())
+    prefetched_stream = _prefetch_in_background(iterable=_produce_forever(), max_prefetched_items=5)
+    assert [next(prefetched_stream) for _ in range(3)] == [0, 1, 2]
+    (producer,) = [thread for thread in threading.enumerate() if thread not in existing_threads]
+    assert producer.name == "nwb2bids-discovery"
+
+    # Such as a caller that stops discovering after a failure; the producer is bounded, then told to stop
+    prefetched_stream.close()
+    producer.join(timeout=10)
+    assert not producer.is_alive()
+    assert len(produced_items) <= 3 + 5 + 1
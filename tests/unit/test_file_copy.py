@@ -0,0 +1,118 @@
+import errno
+import os
+import pathlib
+import shutil
+import sys
+import time
+
+import pytest
+
+from nwb2bids._tools import BandwidthLimiter, _file_copy, copy_file
+
+
+@pytest.fixture(scope="function")
+def source_file_path(temporary_run_directory: pathlib.Path) -> pathlib.Path:
+    source_file_path = temporary_run_directory / "source.nwb"
+    source_file_path.write_bytes(data=os.urandom(3 * 1024 * 1024 + 17))
+    source_file_path.chmod(mode=0o640)
+    return source_file_path
+
+
+def test_copy_file(source_file_path: pathlib.Path, temporary_run_directory: pathlib.Path):
+    target_file_path = temporary_run_directory / "target.nwb"
+    target_file_path.write_bytes(data=b"left behind by an interrupted run" * 10**6)
+
+    method = copy_file(source_file_path=source_file_path, target_file_path=target_file_path)
+    expected_methods = ("reflink", "copy_file_range", "sendfile") if sys.platform.startswith("linux") else ("native",)
+    assert method in expected_methods
+    assert target_file_path.read_bytes() == source_file_path.read_bytes()
+    assert target_file_path.stat().st_mode == source_file_path.stat().st_mode
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="Only Linux copies within the kernel.")
+def test_copy_file_falls_back_on_unsupported_methods(
+    source_file_path: pathlib.Path, temporary_run_directory: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+):
+    def _unsupported(*args, **kwargs):
+        raise OSError(errno.EXDEV, os.strerror(errno.EXDEV))
+
+    monkeypatch.setattr(_file_copy, "_reflink", lambda **kwargs: False)
+    monkeypatch.setattr(os, "copy_file_range", _unsupported, raising=False)
+    target_file_path = temporary_run_directory / "sendfile_target.nwb"
+    assert copy_file(source_file_path=source_file_path, target_file_path=target_file_path) == "sendfile"
+    assert target_file_path.read_bytes() == source_file_path.read_bytes()
+
+    monkeypatch.setattr(os, "sendfile", _unsupported)
+    target_file_path = temporary_run_directory / "buffered_target.nwb"
+    assert copy_file(source_file_path=source_file_path, target_file_path=target_file_path) == "buffered"
+    assert target_file_path.read_bytes() == source_file_path.read_bytes()
+
+
+def test_copy_file_bandwidth_limit(
+    source_file_path: pathlib.Path, temporary_run_directory: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+):
+    # Reflinks copy no data, so they are not paced
+    monkeypatch.setattr(_file_copy, "_reflink", lambda **kwargs: False)
+    bandwidth_limiter = BandwidthLimiter(bytes_per_second=4 * 1024 * 1024)
+
+    start_time = time.perf_counter()
+    for index in range(2):
+        target_file_path = temporary_run_directory / f"target_{index}.nwb"
+        copy_file(
+            source_file_path=source_file_path, target_file_path=target_file_path, bandwidth_limiter=bandwidth_limiter
+        )
+        assert target_file_path.read_bytes() == source_file_path.read_bytes()
+    elapsed_seconds = time.perf_counter() - start_time
+
+    # The first chunk is let through at once; the remaining bytes of both copies are paced at the limit
+    copied_bytes = 2 * source_file_path.stat().st_size
+    assert elapsed_seconds >= (copied_bytes - 1024 * 1024) / bandwidth_limiter.bytes_per_second
+
+
+def test_copy_file_over_symbolic_link_to_source(source_file_path: pathlib.Path, temporary_run_directory: pathlib.Path):
+    # Such as a BIDS dataset written in symlink mode, then converted again in copy mode
+    source_content = source_file_path.read_bytes()
+    target_file_path = temporary_run_directory / "target.nwb"
+    target_file_path.symlink_to(target=source_file_path)
+    with pytest.raises(expected_exception=shutil.SameFileError):
+        copy_file(source_file_path=source_file_path, target_file_path=target_file_path)
+    assert source_file_path.read_bytes() == source_content
+
+    # A link to any other file is replaced rather than followed
+    other_file_path = temporary_run_directory / "other.nwb"
+    other_file_path.write_bytes(data=b"other")
+    target_file_path.unlink()
+    target_file_path.symlink_to(target=other_file_path)
+    copy_file(source_file_path=source_file_path, target_file_path=target_file_path)
+    assert not target_file_path.is_symlink()
+    assert target_file_path.read_bytes() == source_content
+    assert other_file_path.read_bytes() == b"other"
+    assert [file_path.name for file_path in temporary_run_directory.iterdir() if file_path.name.startswith(".")] == []
+
+    # As is a dangling link, such as one written in symlink mode to a source that has since moved
+    target_file_path.unlink()
+    target_file_path.symlink_to(target=temporary_run_directory / "moved.nwb")
+    copy_file(source_file_path=source_file_path, target_file_path=target_file_path)
+    assert not target_file_path.is_symlink()
+    assert target_file_path.read_bytes() == source_content
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="Only Linux copies within the kernel.")
+def test_copy_file_reserves_bandwidth_once_per_chunk(
+    source_file_path: pathlib.Path, temporary_run_directory: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+):
+    def _unsupported(*args, **kwargs):
+        raise OSError(errno.EXDEV, os.strerror(errno.EXDEV))
+
+    monkeypatch.setattr(_file_copy, "_reflink", lambda **kwargs: False)
+    monkeypatch.setattr(os, "copy_file_range", _unsupported, raising=False)
+    monkeypatch.setattr(os, "sendfile", _unsupported)
+
+    reserved_byte_counts = []
+    bandwidth_limiter = BandwidthLimiter(bytes_per_second=10**12)
+    monkeypatch.setattr(
+        bandwidth_limiter, "consume", lambda number_of_bytes: reserved_byte_counts.append(number_of_bytes)
+    )
+    target_file_path = temporary_run_directory / "target.nwb"
+    copy_file(source_file_path=source_file_path, target_file_path=target_file_path, bandwidth_limiter=bandwidth_limiter)
+    assert sum(reserved_byte_counts) == source_file_path.stat().st_size
@@ -0,0 +1,103 @@
+"""Unit tests for extracting session metadata directly through h5py."""
+
+import pathlib
+
+import py
+import pytest
+
+import nwb2bids
+from nwb2bids.bids_models import _h5py_engine
+from nwb2bids.bids_models._h5py_engine import _extract_with_h5py, _UnsupportedLayoutError
+
+
+def _extract_session_metadata(
+    nwbfile_path: pathlib.Path, bids_directory: pathlib.Path, extraction_engine: str
+) -> tuple[str, tuple[str, str] | None]:
+    # Without the cache, since the second engine would otherwise retrieve what the first one extracted
+    run_config = nwb2bids.RunConfig(bids_directory=bids_directory, extraction_engine=extraction_engine, use_cache=False)
+    session_metadata = nwb2bids.bids_models.BidsSessionMetadata.from_nwbfile_paths(
+        nwbfile_paths=[nwbfile_path], run_config=run_config
+    )
+
+    dump = session_metadata.model_dump(exclude={"run_config", "sanitization"})
+    # PyNWB collects the unique devices into a set, so their order is arbitrary
+    if dump["probe_table"] is not None:
+        dump["probe_table"]["probes"].sort(key=lambda probe: probe["probe_name"])
+
+    events = None
+    if session_metadata.events is not None:
+        events = (
+            session_metadata.events._bids_events_data_frame.to_csv(),
+            str(session_metadata.events._bids_events_metadata),
+        )
+    # Custom event columns may hold arrays, which cannot be compared directly
+    return repr(dump), events
+
+
+@pytest.mark.parametrize(
+    "nwbfile_path_fixture",
+    [
+        "minimal_nwbfile_path",
+        "ecephys_tutorial_nwbfile_path",
+        "ecephys_minimal_nwbfile_path",
+        "multiple_events_nwbfile_path",
+        "trials_with_numpy_column_nwbfile_path",
+        "problematic_nwbfile_path_1",
+        "problematic_nwbfile_path_4",
+        "units_in_processing_nwbfile_path",
+        "units_with_raw_electrical_series_nwbfile_path",
+    ],
+)
+def test_h5py_engine_matches_pynwb(
+    nwbfile_path_fixture: str, request: pytest.FixtureRequest, temporary_bids_directory: pathlib.Path
+):
+    nwbfile_path = request.getfixturevalue(nwbfile_path_fixture)
+
+    # Ensure the comparison does not pass by silently falling back to PyNWB
+    _extract_with_h5py(nwbfile_path=nwbfile_path, probe_name=None)
+
+    pynwb_metadata = _extract_session_metadata(
+        nwbfile_path=nwbfile_path, bids_directory=temporary_bids_directory, extraction_engine="pynwb"
+    )
+    h5py_metadata = _extract_session_metadata(
+        nwbfile_path=nwbfile_path, bids_directory=temporary_bids_directory, extraction_engine="h5py"
+    )
+    assert h5py_metadata == pynwb_metadata
+
+
+def test_h5py_engine_falls_back_to_pynwb(tmpdir: py.path.local, temporary_bids_directory: pathlib.Path):
+    icephys_nwbfile_path = nwb2bids.testing.generate_ephys_tutorial(
+        output_directory=pathlib.Path(tmpdir), mode="file", modality="icephys"
+    )
+
+    with pytest.raises(_UnsupportedLayoutError):
+        _extract_with_h5py(nwbfile_path=icephys_nwbfile_path, probe_name=None)
+
+    pynwb_metadata = _extract_session_metadata(
+        nwbfile_path=icephys_nwbfile_path, bids_directory=temporary_bids_directory, extraction_engine="pynwb"
+    )
+    h5py_metadata = _extract_session_metadata(
+        nwbfile_path=icephys_nwbfile_path, bids_directory=temporary_bids_directory, extraction_engine="h5py"
+    )
+    assert h5py_metadata == pynwb_metadata
+    assert "'modality': 'icephys'" in h5py_metadata[0]
+
+
+def test_h5py_engine_closes_file_with_unsupported_namespace(tmpdir: py.path.local, monkeypatch: pytest.MonkeyPatch):
+    nwbfile_path = nwb2bids.testing.generate_ephys_tutorial(output_directory=pathlib.Path(tmpdir), mode="file")
+
+    opened_h5py_files = []
+    original_open_h5py_file = _h5py_engine.open_h5py_file
+
+    def _open_h5py_file(**kwargs):
+        opened_h5py_files.append(original_open_h5py_file(**kwargs))
+        return opened_h5py_files[-1]
+
+    # Such as a file whose every neurodata type is from an extension, which is only found while indexing the file
+    monkeypatch.setattr(_h5py_engine, "open_h5py_file", _open_h5py_file)
+    monkeypatch.setattr(_h5py_engine, "_SUPPORTED_NAMESPACES", set())
+    with pytest.raises(_UnsupportedLayoutError):
+        _extract_with_h5py(nwbfile_path=nwbfile_path, probe_name=None)
+
+    assert len(opened_h5py_files) == 1
+    assert not opened_h5py_files[0]
@@ -0,0 +1,50 @@
+"""Unit tests for the lightweight HDF5 probe of session and subject identifiers."""
+
+import pathlib
+
+import pynwb
+import pytest
+
+from nwb2bids._tools import is_hdf5_file, probe_nwb_identifiers
+
+
+@pytest.mark.parametrize(
+    "fixture_name",
+    [
+        "minimal_nwbfile_path",
+        "ecephys_tutorial_nwbfile_path",
+        "problematic_nwbfile_path_3",
+        "problematic_nwbfile_path_missing_session_id",
+    ],
+)
+def test_probe_nwb_identifiers_matches_pynwb(fixture_name: str, request: pytest.FixtureRequest):
+    nwbfile_path: pathlib.Path = request.getfixturevalue(fixture_name)
+
+    identifiers = probe_nwb_identifiers(file_path=nwbfile_path)
+    assert identifiers is not None
+
+    with pynwb.NWBHDF5IO(path=nwbfile_path, mode="r") as file_stream:
+        nwbfile = file_stream.read()
+        expected_subject_id = nwbfile.subject.subject_id if nwbfile.subject is not None else None
+        assert identifiers == (nwbfile.session_id, expected_subject_id)
+
+
+def test_probe_nwb_identifiers_ambiguous_on_non_hdf5(temporary_run_directory: pathlib.Path):
+    not_hdf5_file_path = temporary_run_directory / "not_hdf5.nwb"
+    not_hdf5_file_path.write_text(data="This is not an HDF5 file.")
+
+    assert probe_nwb_identifiers(file_path=not_hdf5_file_path) is None
+
+
+def test_is_hdf5_file(minimal_nwbfile_path: pathlib.Path, temporary_run_directory: pathlib.Path):
+    assert is_hdf5_file(file_path=minimal_nwbfile_path)
+
+    # HDF5 files may begin with a user block, after which the superblock is found
+    user_block_file_path = temporary_run_directory / "user_block.nwb"
+    user_block_file_path.write_bytes(data=b"\0" * 512 + minimal_nwbfile_path.read_bytes())
+    assert is_hdf5_file(file_path=user_block_file_path)
+
+    not_hdf5_file_path = temporary_run_directory / "not_hdf5.nwb"
+    not_hdf5_file_path.write_text(data="This is not an HDF5 file.")
+    assert not is_hdf5_file(file_path=not_hdf5_file_path)
+    assert not is_hdf5_file(file_path=temporary_run_directory)
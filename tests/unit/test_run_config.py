@@ -78,3 +78,28 @@ def test_run_config_archive_target_invalid_value_raises(temporary_bids_directory
     """Test that archive_target rejects invalid values."""
     with pytest.raises(expected_exception=pydantic.ValidationError):
         nwb2bids.RunConfig(bids_directory=temporary_bids_directory, archive_target="invalid")
+
+
+def test_run_config_invalid_exclude_regex_raises(temporary_bids_directory: pathlib.Path):
+    """Test that include and exclude patterns with invalid regular expressions are rejected."""
+    with pytest.raises(expected_exception=pydantic.ValidationError, match="The regular expression of the pattern"):
+        nwb2bids.RunConfig(bids_directory=temporary_bids_directory, exclude=("re:lab_(a",))
+
+
+def test_run_config_shard(temporary_bids_directory: pathlib.Path):
+    """Test that shards are accepted as INDEX/COUNT strings and that out-of-range indices are rejected."""
+    run_config = nwb2bids.RunConfig(bids_directory=temporary_bids_directory, shard="3/8")
+    assert run_config.shard == (3, 8)
+
+    with pytest.raises(expected_exception=pydantic.ValidationError, match="must be less than the shard count"):
+        nwb2bids.RunConfig(bids_directory=temporary_bids_directory, shard="8/8")
+    with pytest.raises(expected_exception=pydantic.ValidationError, match="is not of the form INDEX/COUNT"):
+        nwb2bids.RunConfig(bids_directory=temporary_bids_directory, shard="3")
+
+
+def test_run_config_resume_requires_run_id(temporary_bids_directory: pathlib.Path):
+    with pytest.raises(expected_exception=pydantic.ValidationError, match="requires its ID to be given as `run_id`"):
+        nwb2bids.RunConfig(bids_directory=temporary_bids_directory, resume=True)
+
+    run_config = nwb2bids.RunConfig(bids_directory=temporary_bids_directory, resume=True, run_id="interrupted")
+    assert run_config.resume
@@ -1,9 +1,12 @@
 """Unit tests for the `SessionConverter` class and its methods."""
 
 import json
+import os
 import pathlib
+import shutil
 
 import pandas
+import pytest
 
 import nwb2bids
 
@@ -212,3 +215,197 @@ def test_session_converter_write_events_metadata(
         "trials": {"Description": "A mock trials table."},
     }
     assert sessions_json == expected_sessions_json
+
+
+def test_session_converter_reuses_file_index(
+    ecephys_tutorial_nwbfile_path: pathlib.Path,
+    temporary_bids_directory: pathlib.Path,
+    temporary_run_directory: pathlib.Path,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    cache_directory = temporary_run_directory / "cache"
+    cache_directory.mkdir()
+    run_config = nwb2bids.RunConfig(bids_directory=temporary_bids_directory, cache_directory=cache_directory)
+    dataset_converter = nwb2bids.DatasetConverter.from_nwb_paths(
+        nwb_paths=[ecephys_tutorial_nwbfile_path], run_config=run_config
+    )
+    dataset_converter.extract_metadata()
+
+    file_index_json = json.loads((cache_directory / "file_index.json").read_text())
+    entry = file_index_json[str(ecephys_tutorial_nwbfile_path.resolve())]
+    assert entry["session_id"] == "A"
+    assert entry["subject_id"] == "001"
+    assert entry["modality"] == "ecephys"
+
+    def fail_on_open(*args, **kwargs):
+        raise AssertionError("The NWB file should not have been opened when its index entry is valid.")
+
+    monkeypatch.setattr("nwb2bids._converters._session_converter._read_identifiers", fail_on_open)
+    session_converters = nwb2bids.SessionConverter.from_nwb_paths(
+        nwb_paths=[ecephys_tutorial_nwbfile_path], run_config=run_config
+    )
+    assert len(session_converters) == 1
+    assert session_converters[0].session_id == "A"
+    assert session_converters[0].modality == "ecephys"
+
+
+def test_session_converter_file_index_disabled(
+    minimal_nwbfile_path: pathlib.Path,
+    temporary_bids_directory: pathlib.Path,
+    temporary_run_directory: pathlib.Path,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    cache_directory = temporary_run_directory / "cache"
+    cache_directory.mkdir()
+    run_config = nwb2bids.RunConfig(
+        bids_directory=temporary_bids_directory, cache_directory=cache_directory, use_cache=False
+    )
+    session_converters = nwb2bids.SessionConverter.from_nwb_paths(
+        nwb_paths=[minimal_nwbfile_path], run_config=run_config
+    )
+
+    assert len(session_converters) == 1
+    assert not (cache_directory / "file_index.json").exists()
+
+    # Nor is the metadata cache read, let alone pruned
+    def fail_on_metadata_cache(*args, **kwargs):
+        raise AssertionError("The metadata cache should not have been opened when the cache is disabled.")
+
+    monkeypatch.setattr("nwb2bids.bids_models._bids_session_metadata.get_metadata_cache", fail_on_metadata_cache)
+    session_converters[0].extract_metadata()
+    assert session_converters[0].session_metadata is not None
+    session_converters[0].close()
+
+
+def test_session_converter_reuses_cached_metadata(
+    ecephys_tutorial_nwbfile_path: pathlib.Path,
+    temporary_bids_directory: pathlib.Path,
+    temporary_run_directory: pathlib.Path,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    nwbfile_path = temporary_run_directory / "ecephys.nwb"
+    shutil.copy(src=ecephys_tutorial_nwbfile_path, dst=nwbfile_path)
+    cache_directory = temporary_run_directory / "cache"
+    cache_directory.mkdir()
+    run_config = nwb2bids.RunConfig(bids_directory=temporary_bids_directory, cache_directory=cache_directory)
+
+    session_converter = nwb2bids.SessionConverter.from_nwb_paths(nwb_paths=[nwbfile_path], run_config=run_config)[0]
+    session_converter.extract_metadata()
+    extracted_session_metadata = session_converter.session_metadata
+    session_converter.close()
+    assert len(list((cache_directory / "metadata_cache").glob("*.json.gz"))) == 1
+
+    def fail_on_extraction(*args, **kwargs):
+        raise AssertionError("The NWB file should not have been read when its cached metadata is valid.")
+
+    with monkeypatch.context() as patch:
+        patch.setattr("nwb2bids.bids_models._bids_session_metadata._extract", fail_on_extraction)
+        cached_session_converter = nwb2bids.SessionConverter.from_nwb_paths(
+            nwb_paths=[nwbfile_path], run_config=run_config
+        )[0]
+        cached_session_converter.extract_metadata()
+
+    assert cached_session_converter.session_metadata == extracted_session_metadata
+    assert cached_session_converter.notifications == session_converter.notifications
+
+    # Any change to the file invalidates its cached metadata
+    os.utime(path=nwbfile_path, ns=(0, 0))
+    with monkeypatch.context() as patch:
+        patch.setattr("nwb2bids.bids_models._bids_session_metadata._extract", fail_on_extraction)
+        changed_session_converter = nwb2bids.SessionConverter.from_nwb_paths(
+            nwb_paths=[nwbfile_path], run_config=run_config
+        )[0]
+        with pytest.raises(AssertionError, match="should not have been read"):
+            changed_session_converter.extract_metadata()
+
+
+@pytest.mark.parametrize(
+    "nwbfile_path_fixture", ["trials_with_numpy_column_nwbfile_path", "multiple_events_nwbfile_path"]
+)
+def test_session_converter_cached_events_match_extracted_events(
+    nwbfile_path_fixture: str,
+    temporary_run_directory: pathlib.Path,
+    request: pytest.FixtureRequest,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    nwbfile_path = temporary_run_directory / "events.nwb"
+    shutil.copy(src=request.getfixturevalue(nwbfile_path_fixture), dst=nwbfile_path)
+    cache_directory = temporary_run_directory / "cache"
+    cache_directory.mkdir()
+
+    written_files = []
+    for index in range(2):
+        bids_directory = temporary_run_directory / f"bids_{index}"
+        bids_directory.mkdir()
+        run_config = nwb2bids.RunConfig(bids_directory=bids_directory, cache_directory=cache_directory)
+        with monkeypatch.context() as patch:
+            if index == 1:
+                patch.setattr("nwb2bids.bids_models._bids_session_metadata._extract", None)
+            session_converter = nwb2bids.SessionConverter.from_nwb_paths(
+                nwb_paths=[nwbfile_path], run_config=run_config
+            )[0]
+            session_converter.extract_metadata()
+        session_converter.write_events_files()
+        written_files.append(
+            {file_path.name: file_path.read_bytes() for file_path in bids_directory.rglob("*_events.*")}
+        )
+        session_converter.close()
+
+    assert len(written_files[0]) == 2
+    assert written_files[1] == written_files[0]
+
+
+def test_session_converter_streaming_reconciles_late_files(
+    minimal_nwbfile_path: pathlib.Path, temporary_bids_directory: pathlib.Path, temporary_run_directory: pathlib.Path
+):
+    nwb_directory = temporary_run_directory / "nwb_files"
+    nwb_directory.mkdir()
+    for file_name in ["first_part.nwb", "second_part.nwb"]:
+        shutil.copy(src=minimal_nwbfile_path, dst=nwb_directory / file_name)
+
+    run_config = nwb2bids.RunConfig(bids_directory=temporary_bids_directory, use_cache=False)
+    session_converter_stream = nwb2bids.SessionConverter.iter_from_nwb_paths(
+        nwb_paths=[nwb_directory], run_config=run_config
+    )
+
+    # Extract metadata as soon as the session is yielded, before the second file has been grouped into it
+    streamed_session_converters = []
+    for session_converter in session_converter_stream:
+        assert len(session_converter.nwbfile_paths) == 1
+        session_converter.extract_metadata()
+        streamed_session_converters.append(session_converter)
+
+    assert len(streamed_session_converters) == 1
+    assert {file_path.name for file_path in streamed_session_converters[0].nwbfile_paths} == {
+        "first_part.nwb",
+        "second_part.nwb",
+    }
+    assert streamed_session_converters[0].session_metadata is None
+    assert streamed_session_converters[0].notifications == []
+
+    session_converters = nwb2bids.SessionConverter.from_nwb_paths(nwb_paths=[nwb_directory], run_config=run_config)
+    assert [session_converter.session_id for session_converter in session_converters] == ["456"]
+    assert sorted(session_converters[0].nwbfile_paths) == sorted(streamed_session_converters[0].nwbfile_paths)
+
+
+def test_session_converter_context_manager_closes_files(
+    minimal_nwbfile_path: pathlib.Path, temporary_bids_directory: pathlib.Path
+):
+    run_config = nwb2bids.RunConfig(bids_directory=temporary_bids_directory)
+    session_converters = nwb2bids.SessionConverter.from_nwb_paths(
+        nwb_paths=[minimal_nwbfile_path], run_config=run_config
+    )
+    with session_converters[0] as session_converter:
+        session_converter.extract_metadata()
+        h5py_file = nwb2bids._tools.cache_read_nwb(minimal_nwbfile_path).get_read_io()._file
+        assert bool(h5py_file) is True
+
+    # A closed h5py file evaluates to False, and the extracted metadata is released along with it
+    assert bool(h5py_file) is False
+    assert session_converter.session_metadata is None
+
+    # The metadata is simply extracted again if needed
+    session_converter.extract_metadata()
+    assert session_converter.session_metadata is not None
+    assert session_converter.session_metadata.session_id == "456"
+    session_converter.close()
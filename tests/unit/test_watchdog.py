@@ -0,0 +1,35 @@
+import math
+import os
+import time
+
+import pytest
+
+from nwb2bids._converters._watchdog import SessionTimeoutError, WatchdogExecutor, WorkerProcessError
+
+
+def test_watchdog_executor_kills_and_replaces_hung_workers():
+    with WatchdogExecutor(max_workers=1, timeout=1.0) as executor:
+        future = executor.submit(time.sleep, 60)
+        with pytest.raises(expected_exception=SessionTimeoutError, match="exceeding the session timeout of 1.0"):
+            future.result()
+        assert 1.0 <= future.exception().elapsed_seconds < 60
+
+        # Later calls run in a fresh worker, and exceptions raised within workers are passed on
+        assert executor.submit(math.sqrt, 16).result() == 4.0
+        with pytest.raises(expected_exception=ValueError, match="math domain error"):
+            executor.submit(math.sqrt, -1).result()
+
+
+def test_watchdog_executor_reports_crashed_workers():
+    with WatchdogExecutor(max_workers=1, timeout=60.0) as executor:
+        # Such as a worker killed for running out of memory, which leaves no exception to pass on
+        with pytest.raises(expected_exception=WorkerProcessError, match="while running the call, with exit code 3"):
+            executor.submit(os._exit, 3).result()
+
+        # Only the call that crashed fails; later calls run in a fresh worker
+        assert executor.submit(math.sqrt, 16).result() == 4.0
+
+    # A worker whose initializer raises never starts, which fails each call instead of hanging
+    with WatchdogExecutor(max_workers=1, timeout=60.0, initializer=math.sqrt, initargs=(-1,)) as executor:
+        with pytest.raises(expected_exception=WorkerProcessError, match="while starting"):
+            executor.submit(math.sqrt, 16).result()
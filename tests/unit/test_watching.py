@@ -0,0 +1,31 @@
+import errno
+import os
+import pathlib
+import sys
+
+import pytest
+
+from nwb2bids._converters._watching import _InotifyWatcher
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="Only Linux notifies changes through inotify.")
+def test_inotify_watcher_falls_back_to_polling(temporary_run_directory: pathlib.Path, monkeypatch: pytest.MonkeyPatch):
+    watcher = _InotifyWatcher(nwb_paths=[temporary_run_directory], poll_interval=0.1)
+    try:
+        # Only the files notified as changed are reported
+        nwbfile_path = temporary_run_directory / "file.nwb"
+        nwbfile_path.write_bytes(data=b"")
+        assert watcher.wait(timeout=1.0) == {nwbfile_path}
+        assert watcher.wait(timeout=0.1) == set()
+
+        # Such as once the limit on the number of watches of the user is reached
+        def _exhaust_watches(directory: str) -> None:
+            raise OSError(errno.ENOSPC, os.strerror(errno.ENOSPC), directory)
+
+        monkeypatch.setattr(watcher, "_watch_tree", _exhaust_watches)
+        (temporary_run_directory / "subdirectory").mkdir()
+        with pytest.warns(expected_warning=UserWarning, match="polling every 0.1 seconds instead"):
+            assert watcher.wait(timeout=1.0) is None
+        assert watcher.wait(timeout=None) is None
+    finally:
+        watcher.close()